@@ -13,9 +13,32 @@ Main responsibilities:
 - Configure application-wide logging (INFO-level with timestamps).
 - Define structured settings for:
   * `LLMSettings`: generic parameters for language models.
-  * `OpenAISettings`: API key, default model, embedding model.
+  * `OpenAISettings`: API key, default model, embedding model,
+    embedding batch limits and rate limits.
+  * `AnthropicSettings` / `LlamaSettings`: API key, default model (and
+    server URL for Llama) of the other `LLMFactory` providers.
+  * `LocalSettings`: seed, model names and simulated latencies of the
+    offline embedding and completion stand-ins.
+  * `ProviderSettings`: which provider (the APIs or "local") serves
+    embeddings and completions.
   * `DatabaseSettings`: connection URL for Timescale/pgvector.
-  * `VectorStoreSettings`: embedding table name, dimension, and partitioning.
+  * `VectorStoreSettings`: embedding table name, dimension, partitioning,
+    DiskANN index parameters (`DiskAnnSettings`), hybrid search defaults,
+    the location of the in-process BM25 index, the storage backend
+    (TimescaleDB or the in-process NumPy matrix), the promoted metadata
+    columns and the filtered search strategy.
+  * `EmbeddingCacheSettings`: location and size bound of the on-disk
+    embedding cache.
+  * `QueryCacheSettings`: size and TTL of the in-process query-embedding
+    cache.
+  * `AnswerCacheSettings`: location, similarity threshold, size bound and
+    TTL of the semantic cache of synthesized answers.
+  * `ResponseCacheSettings`: location, size bound and TTL of the
+    persistent cache of synthesized responses.
+  * `ContextSettings`: token budget, tokenizer and deduplication threshold
+    of the context sent to the Synthesizer.
+  * `IngestionSettings`: chunk size, queue depth, checkpoint location and
+    document date keys of the streaming ingestion pipeline.
 - Provide a single entrypoint `get_settings()` that returns a cached
   `Settings` object (ensuring consistent configuration across modules).
 
@@ -33,7 +56,7 @@ import logging
 import os
 from datetime import timedelta
 from functools import lru_cache
-from typing import Optional
+from typing import Dict, List, Optional
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -61,6 +84,8 @@ class LLMSettings(BaseModel):
     temperature: float = 0.0
     max_tokens: Optional[int] = None
     max_retries: int = 3
+    # Completions in flight at once in `LLMFactory.create_completions_batch`.
+    max_concurrency: int = 8
 
 
 class OpenAISettings(LLMSettings):
@@ -69,28 +94,248 @@ class OpenAISettings(LLMSettings):
     api_key: str = Field(default_factory=lambda: os.getenv("OPENAI_API_KEY"))
     default_model: str = Field(default="gpt-4o")
     embedding_model: str = Field(default="text-embedding-3-small")
+    # Per-request limits of the embeddings endpoint (inputs and total tokens).
+    embedding_batch_size: int = 2048
+    embedding_batch_max_tokens: int = 300_000
+    # Account quota and concurrency used by the async EmbeddingScheduler.
+    embedding_requests_per_minute: int = 3_000
+    embedding_tokens_per_minute: int = 1_000_000
+    embedding_max_concurrency: int = 8
+    embedding_max_retries: int = 6
+
+
+class AnthropicSettings(LLMSettings):
+    """Anthropic-specific settings extending LLMSettings."""
+
+    api_key: str = Field(default_factory=lambda: os.getenv("ANTHROPIC_API_KEY"))
+    default_model: str = Field(default="claude-3-5-sonnet-latest")
+    # The Messages API requires an explicit output limit.
+    max_tokens: Optional[int] = 1024
+
+
+class LlamaSettings(LLMSettings):
+    """Settings for Llama models behind an OpenAI-compatible server (e.g. Ollama)."""
+
+    api_key: str = Field(default_factory=lambda: os.getenv("LLAMA_API_KEY", "ollama"))
+    base_url: str = Field(
+        default_factory=lambda: os.getenv("LLAMA_BASE_URL", "http://localhost:11434/v1")
+    )
+    default_model: str = Field(default="llama3.1")
+
+
+class LocalSettings(LLMSettings):
+    """Settings for the offline, deterministic embedding and completion stand-ins."""
+
+    # Distinct model names, so cache entries never mix with real embeddings/responses.
+    default_model: str = "local-canned-v1"
+    embedding_model: str = "local-hashing-v1"
+    embedding_seed: int = Field(default_factory=lambda: int(os.getenv("LOCAL_EMBEDDING_SEED", "0")))
+    # Simulated API latency: per request, plus per input text.
+    embedding_latency_seconds: float = Field(
+        default_factory=lambda: float(os.getenv("LOCAL_EMBEDDING_LATENCY_SECONDS", "0.05"))
+    )
+    embedding_latency_per_input_seconds: float = 0.0001
+    # Simulated completion latency: time to first token, then generation speed.
+    completion_latency_seconds: float = Field(
+        default_factory=lambda: float(os.getenv("LOCAL_COMPLETION_LATENCY_SECONDS", "0.3"))
+    )
+    tokens_per_second: float = 100.0
+
+
+class ProviderSettings(BaseModel):
+    """Provider of embeddings ("openai" or "local") and of completions (an LLMFactory provider)."""
+
+    embeddings: str = Field(default_factory=lambda: os.getenv("EMBEDDING_PROVIDER", "openai"))
+    llm: str = Field(default_factory=lambda: os.getenv("LLM_PROVIDER", "openai"))
 
 
 class DatabaseSettings(BaseModel):
     """Database connection settings."""
 
     service_url: str = Field(default_factory=lambda: os.getenv("TIMESCALE_SERVICE_URL"))
+    # Upper bound of the connection pool shared by an AsyncVectorStore.
+    max_connections: int = 20
+
+
+class DiskAnnSettings(BaseModel):
+    """
+    Build and query parameters of the StreamingDiskANN index.
+
+    `None` keeps the pgvectorscale default. Build parameters apply when the
+    index is (re)created; query parameters apply to every search and can be
+    overridden per query.
+    """
+
+    num_neighbors: Optional[int] = None
+    search_list_size: Optional[int] = None
+    max_alpha: Optional[float] = None
+    storage_layout: Optional[str] = None  # "memory_optimized" (SBQ) or "plain"
+    num_bits_per_dimension: Optional[int] = None
+    query_search_list_size: Optional[int] = None
+    query_rescore: Optional[int] = None
 
 
 class VectorStoreSettings(BaseModel):
     """Settings for the VectorStore."""
 
     table_name: str = "embeddings"
-    embedding_dimensions: int = 1536
-    time_partition_interval: timedelta = timedelta(days=7)
+    # text-embedding-3 models can return shorter vectors (e.g. 512 or 256).
+    embedding_dimensions: int = Field(
+        default_factory=lambda: int(os.getenv("EMBEDDING_DIMENSIONS", "1536"))
+    )
+    # Width of the hypertable chunks over the id's time component, i.e. the
+    # document date: the corpus spans decades, so chunks are a year wide by
+    # default. Only applies when the table is created.
+    time_partition_interval: timedelta = Field(
+        default_factory=lambda: timedelta(
+            days=int(os.getenv("TIME_PARTITION_INTERVAL_DAYS", "365"))
+        )
+    )
+    diskann: DiskAnnSettings = Field(default_factory=DiskAnnSettings)
+    # Full-text search configuration and hybrid (RRF) fusion defaults.
+    text_search_config: str = "french"
+    hybrid_lexical_weight: float = 0.5
+    hybrid_candidates: int = 50
+    hybrid_rrf_k: int = 60
+    # Optional compressed ANN index over the full-precision column: None
+    # (DiskANN on `embedding`), "halfvec" or "binary" (pgvector HNSW
+    # expression indexes); candidates are re-ranked with the full vectors.
+    quantization: Optional[str] = None
+    quantized_rescore_factor: int = 4
+    # Two-stage search: re-rank rescore_factor * limit ANN candidates
+    # exactly in NumPy (None: single stage). Overridable per query.
+    rescore_factor: Optional[int] = None
+    # In-process BM25 index; "bm25" makes it the lexical side of hybrid search.
+    bm25_index_path: Path = BASE_DIR.parent / ".cache" / "bm25"
+    hybrid_lexical_source: str = "database"
+    # "timescale" (default) or "numpy" for the in-process exact-search backend.
+    backend: str = Field(default_factory=lambda: os.getenv("VECTOR_STORE_BACKEND", "timescale"))
+    local_index_path: Path = BASE_DIR.parent / ".cache" / "vectors"
+    # Scan matrix of the numpy backend: "float32", "float16" or "int8".
+    local_index_dtype: str = "float32"
+    # Metadata keys copied into typed, indexed columns ("text" or "date") by
+    # `VectorStore.create_metadata_indexes`; filters on them use the columns.
+    promoted_metadata: Dict[str, str] = {
+        "category": "text",
+        "document_type": "text",
+        "date_created": "date",
+        "effective_date": "date",
+    }
+    # Filtered searches: "auto" scans the filtered rows exactly when the
+    # planner expects at most exact_scan_max_rows of them and uses the ANN
+    # index otherwise; "ann" or "exact" force one path.
+    filtered_search: str = "auto"
+    exact_scan_max_rows: int = 20_000
+    # The planner's row estimate of each distinct filter is reused for this
+    # long, so "auto" costs one EXPLAIN per filter, not one per search.
+    row_estimate_ttl_seconds: float = 600.0
+    # `VectorStore.bulk_load` drops the ANN index (and rebuilds it once at the
+    # end) only after this many rows were written, or at the first write into
+    # an empty table; smaller refreshes keep the index and update it in place.
+    bulk_load_min_rows: int = 10_000
+
+
+class EmbeddingCacheSettings(BaseModel):
+    """Settings for the persistent embedding cache."""
+
+    enabled: bool = Field(
+        default_factory=lambda: os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+    )
+    path: Path = Field(
+        default_factory=lambda: Path(
+            os.getenv("EMBEDDING_CACHE_PATH", BASE_DIR.parent / ".cache" / "embeddings.sqlite")
+        )
+    )
+    max_bytes: int = 1024**3
+
+
+class QueryCacheSettings(BaseModel):
+    """Settings for the in-process query-embedding cache on the search path."""
+
+    enabled: bool = True
+    max_size: int = 2048
+    ttl_seconds: Optional[float] = 24 * 3600
+    # Fall back to the persistent embedding cache before calling the API.
+    use_persistent_cache: bool = True
+
+
+class AnswerCacheSettings(BaseModel):
+    """Settings for the semantic cache of synthesized answers."""
+
+    enabled: bool = Field(
+        default_factory=lambda: os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+    )
+    path: Path = Field(
+        default_factory=lambda: Path(
+            os.getenv("ANSWER_CACHE_PATH", BASE_DIR.parent / ".cache" / "answers.sqlite")
+        )
+    )
+    # Minimum cosine similarity between two questions to reuse an answer.
+    similarity_threshold: float = 0.95
+    max_entries: int = 5000
+    ttl_seconds: Optional[float] = 7 * 24 * 3600
+
+
+class ResponseCacheSettings(BaseModel):
+    """Settings for the persistent cache of synthesized responses (temperature 0 only)."""
+
+    enabled: bool = Field(
+        default_factory=lambda: os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+    )
+    path: Path = Field(
+        default_factory=lambda: Path(
+            os.getenv("RESPONSE_CACHE_PATH", BASE_DIR.parent / ".cache" / "responses.sqlite")
+        )
+    )
+    max_entries: int = 10_000
+    ttl_seconds: Optional[float] = 30 * 24 * 3600
+
+
+class ContextSettings(BaseModel):
+    """Settings for packing search results into the Synthesizer prompt."""
+
+    # Token budget of the context block and the tokenizer used to count it.
+    # Sized so the default retrieval (limit=5) fits whole: rag_dataset chunks
+    # are ~1.3k tokens on average, ~1.8k at the 75th percentile. A lower
+    # budget saves prompt tokens but drops the lowest-ranked chunks.
+    max_tokens: int = 5 * 2000
+    tokenizer_model: str = "gpt-4o"
+    # Share of a chunk's word 5-grams found in a better-ranked chunk above
+    # which it is dropped as overlapping.
+    overlap_threshold: float = 0.9
+    # Smallest truncated chunk worth keeping when the budget runs out.
+    min_chunk_tokens: int = 64
+
+
+class IngestionSettings(BaseModel):
+    """Settings for the streaming ingestion pipeline."""
+
+    chunk_size: int = 256
+    queue_size: int = 2
+    concurrent: bool = True
+    checkpoint_dir: Path = BASE_DIR.parent / ".cache" / "ingest"
+    # Metadata keys holding the document date encoded in record ids, by priority.
+    # Records with none of them get the 1900-01-01 sentinel (ingestion.RECORD_TIME):
+    # they are left out of any time_range that does not reach back to 1900.
+    document_date_keys: List[str] = ["effective_date", "date_created"]
 
 
 class Settings(BaseModel):
     """Main settings class combining all sub-settings."""
 
     openai: OpenAISettings = Field(default_factory=OpenAISettings)
+    anthropic: AnthropicSettings = Field(default_factory=AnthropicSettings)
+    llama: LlamaSettings = Field(default_factory=LlamaSettings)
+    local: LocalSettings = Field(default_factory=LocalSettings)
+    providers: ProviderSettings = Field(default_factory=ProviderSettings)
     database: DatabaseSettings = Field(default_factory=DatabaseSettings)
     vector_store: VectorStoreSettings = Field(default_factory=VectorStoreSettings)
+    embedding_cache: EmbeddingCacheSettings = Field(default_factory=EmbeddingCacheSettings)
+    query_cache: QueryCacheSettings = Field(default_factory=QueryCacheSettings)
+    answer_cache: AnswerCacheSettings = Field(default_factory=AnswerCacheSettings)
+    context: ContextSettings = Field(default_factory=ContextSettings)
+    response_cache: ResponseCacheSettings = Field(default_factory=ResponseCacheSettings)
+    ingestion: IngestionSettings = Field(default_factory=IngestionSettings)
 
 
 @lru_cache()
@@ -0,0 +1,411 @@
+"""
+async_vector_store.py
+===================================================================
+Asynchronous vector database interface for RAG services
+-------------------------------------------------------------------
+
+This module defines `AsyncVectorStore`, the asyncio counterpart of
+`VectorStore` for services that must serve many queries concurrently from
+one worker process.
+
+Main responsibilities:
+- Expose the same `search` / `upsert` / `delete` surface as `VectorStore`,
+  as coroutines.
+- Use the Timescale Vector async client (asyncpg) with one bounded
+  connection pool shared by every request (`DatabaseSettings.max_connections`).
+- Embed with `AsyncOpenAI`, bounded by `OpenAISettings.embedding_max_concurrency`,
+  reusing the query-embedding cache and the persistent embedding cache.
+- Let embedding requests and database queries of different searches overlap
+  on the event loop instead of needing one thread per in-flight query.
+- Stay consistent with `VectorStore`: filtered searches (promoted columns
+  and exact-scan strategy), quantized indexes, two-stage rescoring,
+  projections and bulk COPY upserts reuse its SQL builders (`$n`
+  placeholders), and every statement runs on the asyncpg pool, so the
+  number of connections never exceeds `max_connections`. Only the numpy
+  backend, which needs no connection, is delegated to `VectorStore` in a
+  worker thread.
+
+Typical usage:
+--------------
+```python
+vec = AsyncVectorStore()
+results = await asyncio.gather(*(vec.search(q, limit=5) for q in questions))
+await vec.close()
+"""
+
+import asyncio
+import io
+import logging
+import time
+from datetime import datetime
+from typing import Any, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from app.config.settings import get_settings
+from app.database.embedding_cache import EmbeddingCache, normalize_text
+from app.database.local_embeddings import embedding_model, embeddings_client
+from app.database.pg_copy import encode_copy_binary
+from app.database.quantization import embedding_request_options
+from app.database.query_cache import QueryEmbeddingCache
+from app.database.search_results import SearchResult, rescore_results
+from app.database.vector_store import COPY_BATCH_SIZE, VectorStore
+from app.utils.tokens import batch_by_tokens
+from timescale_vector import client
+
+
+class AsyncVectorStore:
+    """An asyncio interface to the vector store with pooled connections."""
+
+    def __init__(self):
+        """Initialize the store with settings, AsyncOpenAI and the async Timescale Vector client."""
+        self.settings = get_settings()
+        self.openai_client = embeddings_client(self.settings, asynchronous=True)
+        self.embedding_model = embedding_model(self.settings)
+        self.vector_settings = self.settings.vector_store
+        self.vec_client = client.Async(
+            self.settings.database.service_url,
+            self.vector_settings.table_name,
+            self.vector_settings.embedding_dimensions,
+            time_partition_interval=self.vector_settings.time_partition_interval,
+            max_db_connections=self.settings.database.max_connections,
+        )
+        self._embedding_slots = asyncio.Semaphore(
+            self.settings.openai.embedding_max_concurrency
+        )
+        cache_settings = self.settings.embedding_cache
+        self.embedding_cache = (
+            EmbeddingCache(cache_settings.path, max_bytes=cache_settings.max_bytes)
+            if cache_settings.enabled
+            else None
+        )
+        query_cache_settings = self.settings.query_cache
+        self.query_cache = (
+            QueryEmbeddingCache(
+                max_size=query_cache_settings.max_size,
+                ttl_seconds=query_cache_settings.ttl_seconds,
+            )
+            if query_cache_settings.enabled
+            else None
+        )
+        # Synchronous store whose SQL builders (and caches of promoted
+        # columns and row estimates) are shared, created on first use. It
+        # never opens a connection of its own to Postgres.
+        self._sync_store: Optional[VectorStore] = None
+
+    @property
+    def sync_store(self) -> VectorStore:
+        """The `VectorStore` (same settings) building the SQL, and running the numpy backend."""
+        if self._sync_store is None:
+            self._sync_store = VectorStore()
+        return self._sync_store
+
+    async def _fetch(
+        self,
+        query: str,
+        params: List[Any],
+        query_params: Optional[client.QueryParams] = None,
+    ) -> List[Tuple[Any, ...]]:
+        """
+        Run a `$n` statement on the asyncpg pool, like `VectorStore._execute`.
+
+        Index query parameters are applied with `SET LOCAL` in the statement's
+        transaction.
+        """
+        async with await self.vec_client.connect() as conn:
+            async with conn.transaction():
+                if query_params is not None:
+                    for statement in query_params.get_statements():
+                        await conn.execute(statement)
+                rows = await conn.fetch(query, *params)
+        return [tuple(row) for row in rows]
+
+    async def _load_promoted_columns(self) -> None:
+        """Look up the promoted metadata columns of the table, once, for the SQL builders."""
+        store = self.sync_store
+        if store._promoted is None:
+            rows = await self._fetch(
+                "SELECT column_name FROM information_schema.columns WHERE table_name = $1",
+                [self.vector_settings.table_name],
+            )
+            store._set_promoted_columns(row[0] for row in rows)
+
+    async def _exact_scan_preferred(
+        self,
+        metadata_filter: Union[dict, List[dict]] = None,
+        predicates: Optional[client.Predicates] = None,
+        time_range: Optional[Tuple[datetime, datetime]] = None,
+    ) -> bool:
+        """`VectorStore._exact_scan_preferred`, asking the planner on the asyncpg pool."""
+        store = self.sync_store
+        preferred, explain, params, key = store._exact_scan_decision(
+            metadata_filter, predicates, time_range
+        )
+        if preferred is not None:
+            return preferred
+        plan = (await self._fetch(explain, params))[0][0]
+        return store._record_row_estimate(key, plan)
+
+    async def get_embeddings(self, texts: List[str], use_cache: bool = True) -> np.ndarray:
+        """
+        Generate embeddings for many texts, like `VectorStore.get_embeddings`.
+
+        Cache lookups run in a worker thread; missing texts are sent in
+        token-aware batches, concurrently.
+
+        Args:
+            texts: The input texts to generate embeddings for.
+            use_cache: Read and populate the persistent embedding cache.
+
+        Returns:
+            A float32 array of shape (len(texts), embedding_dimensions).
+        """
+        texts = [normalize_text(text) for text in texts]
+        dimensions = self.vector_settings.embedding_dimensions
+        embeddings = np.empty((len(texts), dimensions), dtype=np.float32)
+        cache = self.embedding_cache if use_cache else None
+
+        missing = list(range(len(texts)))
+        if cache is not None:
+            keys = [cache.make_key(self.embedding_model, dimensions, text) for text in texts]
+            missing = []
+            for i, vector in enumerate(await asyncio.to_thread(cache.get_many, keys)):
+                if vector is None:
+                    missing.append(i)
+                else:
+                    embeddings[i] = vector
+
+        if missing:
+            unique_texts = list(dict.fromkeys(texts[i] for i in missing))
+            new_embeddings = np.empty((len(unique_texts), dimensions), dtype=np.float32)
+            await asyncio.gather(
+                *(
+                    self._embed_batch(unique_texts, start, end, new_embeddings)
+                    for start, end, _ in batch_by_tokens(
+                        unique_texts,
+                        max_inputs=self.settings.openai.embedding_batch_size,
+                        max_tokens=self.settings.openai.embedding_batch_max_tokens,
+                        model=self.embedding_model,
+                    )
+                )
+            )
+            positions = {text: row for row, text in enumerate(unique_texts)}
+            for i in missing:
+                embeddings[i] = new_embeddings[positions[texts[i]]]
+            if cache is not None:
+                await asyncio.to_thread(
+                    cache.put_many,
+                    [cache.make_key(self.embedding_model, dimensions, t) for t in unique_texts],
+                    new_embeddings,
+                )
+        return embeddings
+
+    async def _embed_batch(
+        self, texts: List[str], start: int, end: int, embeddings: np.ndarray
+    ) -> None:
+        """Embed `texts[start:end]` into `embeddings[start:end]`."""
+        async with self._embedding_slots:
+            response = await self.openai_client.embeddings.create(
+                input=texts[start:end],
+                model=self.embedding_model,
+                **embedding_request_options(
+                    self.embedding_model, self.vector_settings.embedding_dimensions
+                ),
+            )
+        for item in response.data:
+            embeddings[start + item.index] = item.embedding
+
+    async def get_query_embedding(self, query_text: str) -> np.ndarray:
+        """Return the embedding of a search query, from the query cache when possible."""
+        if self.query_cache is not None:
+            embedding = self.query_cache.get(query_text)
+            if embedding is not None:
+                return embedding
+        embedding = (
+            await self.get_embeddings(
+                [query_text], use_cache=self.settings.query_cache.use_persistent_cache
+            )
+        )[0]
+        if self.query_cache is not None:
+            self.query_cache.put(query_text, embedding)
+        return embedding
+
+    async def create_tables(self) -> None:
+        """Create the necessary tables in the database"""
+        if self.vector_settings.backend != "timescale":
+            return
+        await self.vec_client.create_tables()
+
+    async def upsert(self, df: pd.DataFrame, bulk: bool = False) -> None:
+        """
+        Insert or update records in the database from a pandas DataFrame.
+
+        Args:
+            df: A pandas DataFrame containing the data to insert or update.
+                Expected columns: id, metadata, contents, embedding
+            bulk: Stream the records with binary COPY into a staging table and
+                merge them with a single INSERT ... ON CONFLICT, like
+                `VectorStore.copy_upsert`.
+        """
+        if self.vector_settings.backend != "timescale":
+            await asyncio.to_thread(self.sync_store.upsert, df, True)
+            return
+        if bulk:
+            await self.copy_upsert(
+                df["id"].tolist(),
+                df["metadata"].tolist(),
+                df["contents"].tolist(),
+                np.stack(df["embedding"].to_numpy()).astype(np.float32, copy=False),
+            )
+            return
+        records = df.to_records(index=False)
+        await self.vec_client.upsert(list(records))
+        logging.info(
+            f"Inserted {len(df)} records into {self.vector_settings.table_name}"
+        )
+
+    async def copy_upsert(
+        self,
+        ids: List[str],
+        metadata: List[dict],
+        contents: List[str],
+        embeddings: np.ndarray,
+        batch_size: int = COPY_BATCH_SIZE,
+    ) -> None:
+        """
+        Bulk-load records with binary COPY on one pooled connection, like `VectorStore.copy_upsert`.
+
+        When `ids` holds duplicates, the last record of each id wins.
+        """
+        start_time = time.time()
+        store = self.sync_store
+        ids, metadata, contents, embeddings = store._last_records(ids, metadata, contents, embeddings)
+        async with await self.vec_client.connect() as conn:
+            async with conn.transaction():
+                await conn.execute(store._staging_table_sql())
+                for start in range(0, len(ids), batch_size):
+                    end = start + batch_size
+                    payload = encode_copy_binary(
+                        ids[start:end], metadata[start:end], contents[start:end], embeddings[start:end]
+                    )
+                    await conn.copy_to_table(
+                        "embeddings_staging", source=io.BytesIO(payload), format="binary"
+                    )
+                await conn.execute(store._merge_staging_sql())
+        logging.info(
+            f"Bulk-loaded {len(ids)} records into {self.vector_settings.table_name} "
+            f"in {time.time() - start_time:.3f} seconds"
+        )
+
+    async def search(
+        self,
+        query_text: str,
+        limit: int = 5,
+        metadata_filter: Union[dict, List[dict]] = None,
+        predicates: Optional[client.Predicates] = None,
+        time_range: Optional[Tuple[datetime, datetime]] = None,
+        return_dataframe: bool = True,
+        query_embedding: Optional[np.ndarray] = None,
+        search_list_size: Optional[int] = None,
+        rescore: Optional[int] = None,
+        include_content: bool = True,
+        include_embedding: bool = True,
+        as_records: bool = False,
+        rescore_factor: Optional[int] = None,
+    ) -> Union[List[Tuple[Any, ...]], pd.DataFrame, List[SearchResult]]:
+        """
+        Query the vector database for similar embeddings based on input text.
+
+        Accepts the same arguments and returns the same results as
+        `VectorStore.search`, with the same SQL, run on the asyncpg pool. With
+        the numpy backend, `VectorStore.search` runs in a worker thread.
+        """
+        if query_embedding is None:
+            query_embedding = await self.get_query_embedding(query_text)
+
+        store = self.sync_store
+        if store.backend is not None:
+            return await asyncio.to_thread(
+                self.sync_store.search,
+                query_text,
+                limit=limit,
+                metadata_filter=metadata_filter,
+                predicates=predicates,
+                time_range=time_range,
+                return_dataframe=return_dataframe,
+                query_embedding=query_embedding,
+                search_list_size=search_list_size,
+                rescore=rescore,
+                include_content=include_content,
+                include_embedding=include_embedding,
+                as_records=as_records,
+                rescore_factor=rescore_factor,
+            )
+
+        start_time = time.time()
+        rescore_factor = rescore_factor or self.vector_settings.rescore_factor
+        query_params = store._query_params(search_list_size, rescore, limit, rescore_factor)
+        if metadata_filter or predicates:
+            await self._load_promoted_columns()
+        exact = await self._exact_scan_preferred(metadata_filter, predicates, time_range)
+        query, params = store._search_sql(
+            query_embedding,
+            limit,
+            metadata_filter,
+            predicates,
+            time_range,
+            include_content,
+            include_embedding,
+            rescore_factor,
+            exact,
+        )
+        results = await self._fetch(query, params, None if exact else query_params)
+        if rescore_factor and not exact:
+            results = rescore_results(results, query_embedding, limit, include_embedding)
+        elapsed_time = time.time() - start_time
+
+        logging.info(f"Vector search completed in {elapsed_time:.3f} seconds")
+
+        return store._format_results(
+            results, return_dataframe, as_records, include_content, include_embedding
+        )
+
+    async def delete(
+        self,
+        ids: List[str] = None,
+        metadata_filter: dict = None,
+        delete_all: bool = False,
+    ) -> None:
+        """
+        Delete records from the vector database, like `VectorStore.delete`.
+
+        Raises:
+            ValueError: If no deletion criteria are provided or if multiple criteria are provided.
+        """
+        if sum(bool(x) for x in (ids, metadata_filter, delete_all)) != 1:
+            raise ValueError(
+                "Provide exactly one of: ids, metadata_filter, or delete_all"
+            )
+        if self.vector_settings.backend != "timescale":
+            await asyncio.to_thread(self.sync_store.delete, ids, metadata_filter, delete_all)
+            return
+
+        if delete_all:
+            await self.vec_client.delete_all()
+            logging.info(f"Deleted all records from {self.vector_settings.table_name}")
+        elif ids:
+            await self.vec_client.delete_by_ids(ids)
+            logging.info(
+                f"Deleted {len(ids)} records from {self.vector_settings.table_name}"
+            )
+        elif metadata_filter:
+            await self.vec_client.delete_by_metadata(metadata_filter)
+            logging.info(
+                f"Deleted records matching metadata filter from {self.vector_settings.table_name}"
+            )
+
+    async def close(self) -> None:
+        """Close the database pool and the HTTP client."""
+        if self.vec_client.pool is not None:
+            await self.vec_client.pool.close()
+        await self.openai_client.close()
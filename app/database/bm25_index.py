@@ -0,0 +1,219 @@
+"""
+bm25_index.py
+===================================================================
+In-process BM25 inverted index for lexical retrieval
+-------------------------------------------------------------------
+
+This module defines `BM25Index`, a compact in-memory inverted index that
+scores documents with Okapi BM25 without any database round trip. It backs
+low-latency lexical retrieval and offline evaluation, and can be used by
+`VectorStore` as the lexical candidate source of hybrid search.
+
+Main responsibilities:
+- Tokenize French legal text: lower-casing, accent folding, elision and
+  stop-word removal, light plural stripping, and decree/article numbers such
+  as "2-77-862" kept as single tokens.
+- Store postings CSR-style in NumPy arrays: `indptr` (per term), `doc_ids`
+  and `term_freqs` (per posting), plus document lengths and IDF weights.
+- Score a query with a handful of vectorized operations (`np.bincount` over
+  the concatenated postings of the query terms) and select the top-k with
+  `np.argpartition`.
+- Persist to a directory of `.npy` files that are memory-mapped on load, so
+  startup does not depend on the corpus size.
+
+Typical usage:
+--------------
+```python
+index = BM25Index.build(ids, texts)
+index.save(".cache/bm25")
+
+index = BM25Index.load(".cache/bm25")
+ids, scores = index.search("Article 8 du décret n°2-77-862", limit=10)
+"""
+
+import json
+import re
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+FRENCH_STOPWORDS = frozenset(
+    """
+    a au aux avec ce ces c d dans de des du elle en et eux il ils je j la le les leur
+    leurs l lui m ma mais me meme mes moi mon n ne nos notre nous on ou par pas pour
+    qu que qui s sa se ses son sur t ta te tes toi ton tu un une vos votre vous y
+    est sont ete etre avoir a ont cette cet celui celle ceux dont
+    """.split()
+)
+
+_TOKEN_RE = re.compile(r"[0-9a-z]+(?:[-/.][0-9a-z]+)*")
+
+ARRAY_FILES = ("indptr", "doc_ids", "term_freqs", "doc_lengths", "idf")
+
+
+def fold_accents(text: str) -> str:
+    """Lower-case `text` and strip diacritics ("Décret" -> "decret")."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split French text into index terms.
+
+    Compound tokens containing a digit ("2-77-862", "12/2005") are kept whole;
+    other compounds are split into words. Stop words are dropped and a final
+    plural "s"/"x" is stripped from longer words.
+    """
+    tokens = []
+    for token in _TOKEN_RE.findall(fold_accents(text)):
+        parts = [token] if any(c.isdigit() for c in token) else re.split(r"[-/.]", token)
+        for part in parts:
+            if not part or part in FRENCH_STOPWORDS:
+                continue
+            if len(part) > 4 and part[-1] in "sx" and not part[-2].isdigit():
+                part = part[:-1]
+            tokens.append(part)
+    return tokens
+
+
+class BM25Index:
+    """An Okapi BM25 inverted index with CSR postings."""
+
+    def __init__(
+        self,
+        ids: List[str],
+        vocabulary: Dict[str, int],
+        indptr: np.ndarray,
+        doc_ids: np.ndarray,
+        term_freqs: np.ndarray,
+        doc_lengths: np.ndarray,
+        idf: np.ndarray,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ):
+        self.ids = ids
+        self.vocabulary = vocabulary
+        self.indptr = indptr
+        self.doc_ids = doc_ids
+        self.term_freqs = term_freqs
+        self.doc_lengths = doc_lengths
+        self.idf = idf
+        self.k1 = k1
+        self.b = b
+        avg_length = float(doc_lengths.mean()) if len(doc_lengths) else 1.0
+        # Per-document part of the BM25 denominator, computed once.
+        self._length_norm = (
+            k1 * (1.0 - b + b * np.asarray(doc_lengths, dtype=np.float32) / avg_length)
+        ).astype(np.float32)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def build(
+        cls, ids: Sequence[str], texts: Sequence[str], k1: float = 1.2, b: float = 0.75
+    ) -> "BM25Index":
+        """
+        Build an index over `texts`.
+
+        Args:
+            ids: Record ids, one per text (returned by `search`).
+            texts: Document texts.
+            k1: BM25 term-frequency saturation.
+            b: BM25 length normalization.
+
+        Returns:
+            The built index.
+        """
+        vocabulary: Dict[str, int] = {}
+        term_ids, posting_docs, posting_freqs = [], [], []
+        doc_lengths = np.zeros(len(texts), dtype=np.float32)
+        for doc, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths[doc] = len(tokens)
+            for term, freq in Counter(tokens).items():
+                term_ids.append(vocabulary.setdefault(term, len(vocabulary)))
+                posting_docs.append(doc)
+                posting_freqs.append(freq)
+
+        term_ids = np.asarray(term_ids, dtype=np.int64)
+        order = np.argsort(term_ids, kind="stable")
+        counts = np.bincount(term_ids, minlength=len(vocabulary))
+        indptr = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        n_docs = len(texts)
+        idf = np.log(1.0 + (n_docs - counts + 0.5) / (counts + 0.5)).astype(np.float32)
+        return cls(
+            list(map(str, ids)),
+            vocabulary,
+            indptr,
+            np.asarray(posting_docs, dtype=np.int32)[order],
+            np.asarray(posting_freqs, dtype=np.float32)[order],
+            doc_lengths,
+            idf,
+            k1=k1,
+            b=b,
+        )
+
+    def scores(self, query: str) -> np.ndarray:
+        """Return the BM25 score of every document for `query`."""
+        term_ids = sorted(
+            {self.vocabulary[t] for t in tokenize(query) if t in self.vocabulary}
+        )
+        if not term_ids:
+            return np.zeros(len(self.ids), dtype=np.float32)
+        starts = self.indptr[term_ids]
+        ends = self.indptr[np.asarray(term_ids) + 1]
+        docs = np.concatenate([self.doc_ids[s:e] for s, e in zip(starts, ends)])
+        freqs = np.concatenate([self.term_freqs[s:e] for s, e in zip(starts, ends)])
+        weights = np.repeat(self.idf[term_ids], ends - starts)
+        contributions = weights * freqs * (self.k1 + 1.0) / (freqs + self._length_norm[docs])
+        return np.bincount(docs, weights=contributions, minlength=len(self.ids)).astype(
+            np.float32
+        )
+
+    def search(self, query: str, limit: int = 10) -> Tuple[List[str], np.ndarray]:
+        """
+        Return the ids and scores of the best-matching documents.
+
+        Args:
+            query: The query text.
+            limit: Maximum number of results.
+
+        Returns:
+            (ids, scores) in decreasing score order; documents that match no
+            query term are never returned.
+        """
+        scores = self.scores(query)
+        matched = np.flatnonzero(scores > 0)
+        if len(matched) > limit:
+            matched = matched[np.argpartition(-scores[matched], limit - 1)[:limit]]
+        top = matched[np.argsort(-scores[matched], kind="stable")]
+        return [self.ids[i] for i in top], scores[top]
+
+    def save(self, directory: Union[str, Path]) -> None:
+        """Write the index to `directory` (one `.npy` per array plus `index.json`)."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in ARRAY_FILES:
+            np.save(directory / f"{name}.npy", np.ascontiguousarray(getattr(self, name)))
+        (directory / "index.json").write_text(
+            json.dumps(
+                {"ids": self.ids, "vocabulary": self.vocabulary, "k1": self.k1, "b": self.b},
+                ensure_ascii=False,
+            ),
+            encoding="utf-8",
+        )
+
+    @classmethod
+    def load(cls, directory: Union[str, Path]) -> "BM25Index":
+        """Load an index saved with `save`, memory-mapping its arrays."""
+        directory = Path(directory)
+        meta = json.loads((directory / "index.json").read_text(encoding="utf-8"))
+        arrays = {
+            name: np.load(directory / f"{name}.npy", mmap_mode="r") for name in ARRAY_FILES
+        }
+        return cls(meta["ids"], meta["vocabulary"], k1=meta["k1"], b=meta["b"], **arrays)
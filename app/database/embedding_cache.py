@@ -0,0 +1,267 @@
+"""
+embedding_cache.py
+===================================================================
+Persistent, content-addressed embedding cache
+-------------------------------------------------------------------
+
+This module defines `EmbeddingCache`, a local SQLite store of embedding
+vectors used by `VectorStore` so that re-ingesting or re-evaluating an
+unchanged corpus does not pay for the same embeddings twice.
+
+Main responsibilities:
+- Address entries by SHA-256 of (embedding model, dimensions, normalized
+  text), so a change of model or dimensionality never returns stale vectors.
+- Store vectors as raw float32 blobs.
+- Bound the cache size in bytes with least-recently-used eviction.
+- Count hits and misses for the current process.
+- Allow concurrent use from several processes (WAL journal, busy timeout,
+  short write transactions) and from several threads of one process.
+
+The connection handling, transactions, chunked `IN (...)` statements, LRU
+eviction and counters live in `SQLiteCache`, the base class of every
+SQLite cache of the application (see also `ResponseCache` and
+`SemanticAnswerCache`), so each cache only defines its schema and key.
+
+Typical usage:
+--------------
+```python
+cache = EmbeddingCache("embeddings.sqlite", max_bytes=512 * 1024**2)
+keys = [cache.make_key(model, 1536, normalize_text(t)) for t in texts]
+vectors = cache.get_many(keys)  # list of np.ndarray or None
+cache.put_many(keys, new_vectors)
+print(cache.stats())
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+# Keep well below SQLite's host-parameter limit.
+SQLITE_MAX_PARAMS = 500
+# Share of the budget eviction goes down to, so we do not evict on every insert.
+EVICTION_TARGET = 0.9
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text before embedding: NFC, collapsed whitespace, no newlines."""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+class SQLiteCache:
+    """
+    Base of the SQLite-backed caches.
+
+    Holds one connection per process (WAL journal, busy timeout, reopened
+    after a fork) shared by the threads of the process under `_lock`, and
+    the hit/miss counters. Subclasses create their tables in `_create_schema`.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Args:
+            path: Location of the SQLite file; parent directories are created.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        """Create the cache's tables and indexes (called on every new connection)."""
+        raise NotImplementedError
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this process's connection, reopening it after a fork."""
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(
+                self.path, timeout=30.0, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._create_schema(conn)
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    @staticmethod
+    @contextmanager
+    def _transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+        """Run the block in a write transaction, rolled back if it fails."""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _chunks(values: Sequence[Any]) -> Iterator[Tuple[str, List[Any]]]:
+        """Yield `values` in chunks small enough for one `IN (...)`, with their placeholders."""
+        values = list(values)
+        for i in range(0, len(values), SQLITE_MAX_PARAMS):
+            chunk = values[i : i + SQLITE_MAX_PARAMS]
+            yield ",".join("?" * len(chunk)), chunk
+
+    @staticmethod
+    def _least_recently_used(
+        conn: sqlite3.Connection, table: str, key: str, max_entries: int
+    ) -> List[Any]:
+        """
+        Return the keys to evict from `table` when it holds more than `max_entries` rows.
+
+        Eviction goes down to `EVICTION_TARGET` of `max_entries`, least
+        recently used (`last_access`) first.
+        """
+        count = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        if count <= max_entries:
+            return []
+        excess = count - int(max_entries * EVICTION_TARGET)
+        return [
+            row[0]
+            for row in conn.execute(
+                f"SELECT {key} FROM {table} ORDER BY last_access LIMIT ?", (excess,)
+            )
+        ]
+
+    def _counters(self) -> Dict[str, float]:
+        """Return the hit/miss counters of this process."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class EmbeddingCache(SQLiteCache):
+    """An on-disk LRU cache of float32 embedding vectors backed by SQLite."""
+
+    def __init__(self, path: Union[str, Path], max_bytes: int = 1024**3):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: Location of the SQLite file; parent directories are created.
+            max_bytes: Upper bound on the total size of stored vectors.
+        """
+        super().__init__(path)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def make_key(model: str, dimensions: int, text: str) -> bytes:
+        """Return the content address of `text` embedded with `model` at `dimensions`."""
+        return hashlib.sha256(f"{model}\x00{dimensions}\x00{text}".encode("utf-8")).digest()
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key BLOB PRIMARY KEY, vector BLOB NOT NULL, "
+            "nbytes INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_last_access ON embeddings (last_access)"
+        )
+
+    def get_many(self, keys: Sequence[bytes]) -> List[Optional[np.ndarray]]:
+        """
+        Look up vectors by key and mark the hits as recently used.
+
+        Args:
+            keys: Keys built with `make_key`.
+
+        Returns:
+            A list aligned with `keys` holding a float32 vector or None.
+        """
+        found: Dict[bytes, np.ndarray] = {}
+        unique_keys = list(dict.fromkeys(keys))
+        with self._lock:
+            conn = self._connect()
+            for placeholders, chunk in self._chunks(unique_keys):
+                rows = conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+            if found:
+                now = time.time()
+                with self._transaction(conn):
+                    conn.executemany(
+                        "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                        [(now, key) for key in found],
+                    )
+        results = [found.get(key) for key in keys]
+        hits = sum(vector is not None for vector in results)
+        self.hits += hits
+        self.misses += len(keys) - hits
+        return results
+
+    def put_many(self, keys: Sequence[bytes], vectors: np.ndarray) -> None:
+        """
+        Store vectors under their keys, then evict old entries if over budget.
+
+        Args:
+            keys: Keys built with `make_key`.
+            vectors: A 2-D array with one row per key.
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        now = time.time()
+        rows = [
+            (key, vector.tobytes(), vector.nbytes, now)
+            for key, vector in zip(keys, vectors)
+        ]
+        with self._lock:
+            conn = self._connect()
+            with self._transaction(conn):
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector, nbytes, last_access) "
+                    "VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Delete least recently used entries until the cache is under budget."""
+        total = conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM embeddings").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - int(self.max_bytes * EVICTION_TARGET)
+        freed = 0
+        stale = []
+        for key, nbytes in conn.execute(
+            "SELECT key, nbytes FROM embeddings ORDER BY last_access"
+        ):
+            stale.append((key,))
+            freed += nbytes
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM embeddings WHERE key = ?", stale)
+        logging.info(f"Evicted {len(stale)} embeddings ({freed} bytes) from {self.path}")
+
+    def clear(self) -> None:
+        """Remove every cached vector."""
+        with self._lock:
+            self._connect().execute("DELETE FROM embeddings")
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters for this process and the cache's current size."""
+        with self._lock:
+            entries, size = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(nbytes), 0) FROM embeddings"
+            ).fetchone()
+        return {**self._counters(), "entries": entries, "bytes": size}
@@ -0,0 +1,280 @@
+"""
+embedding_scheduler.py
+===================================================================
+Rate-limit-aware concurrent embedding scheduler
+-------------------------------------------------------------------
+
+This module defines `EmbeddingScheduler`, an asyncio-based companion to
+`VectorStore.get_embeddings` for large ingestion jobs. Instead of sending
+one batch at a time, it keeps many batches in flight while staying within
+the account's quota.
+
+Main responsibilities:
+- Split texts into token-aware batches (same limits as `get_embeddings`).
+- Throttle requests with two token buckets: requests per minute and
+  tokens per minute.
+- Honour `retry-after` / `retry-after-ms` hints on 429 responses, pause all
+  workers for that long and halve the number of requests in flight, then
+  grow it back one step per successful request (AIMD).
+- Retry failed batches with exponential backoff; every batch writes into
+  its own rows of the output matrix, so row order is always preserved.
+
+Typical usage:
+--------------
+```python
+scheduler = EmbeddingScheduler()
+embeddings = scheduler.run(texts)  # (len(texts), dim) float32
+
+# or, from async code
+embeddings = await scheduler.embed(texts)
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import List, Optional
+
+import numpy as np
+from app.config.settings import get_settings
+from app.database.local_embeddings import embedding_model as provider_embedding_model
+from app.database.local_embeddings import embeddings_client
+from app.database.quantization import embedding_request_options
+from app.utils.tokens import batch_by_tokens
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    AsyncOpenAI,
+    InternalServerError,
+    RateLimitError,
+)
+
+RETRYABLE_ERRORS = (
+    RateLimitError,
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+)
+
+
+class TokenBucket:
+    """A token bucket refilled continuously at `capacity` tokens per minute."""
+
+    def __init__(self, capacity: int):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        """Wait until `amount` tokens are available and consume them."""
+        # A single request larger than the bucket would otherwise wait forever.
+        amount = min(float(amount), self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def drain(self) -> None:
+        """Empty the bucket, e.g. after the provider reported a rate limit."""
+        self._refill()
+        self.tokens = 0.0
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    A concurrency limit that shrinks on rate limits and grows on success.
+
+    Acts like an `asyncio.Semaphore` whose size moves between 1 and `maximum`
+    (additive increase, multiplicative decrease).
+    """
+
+    def __init__(self, maximum: int):
+        self.maximum = maximum
+        self.limit = maximum
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+
+    async def __aenter__(self) -> "AdaptiveConcurrencyLimiter":
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    async def increase(self) -> None:
+        async with self._condition:
+            if self.limit < self.maximum:
+                self.limit += 1
+                self._condition.notify_all()
+
+    async def decrease(self) -> None:
+        async with self._condition:
+            self.limit = max(1, self.limit // 2)
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """
+    Extract the server's retry hint from an OpenAI error, if any.
+
+    Args:
+        error: The exception raised by the OpenAI client.
+
+    Returns:
+        The number of seconds to wait, or None if the response carries no hint.
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        # retry-after may also be an HTTP date; fall back to our own backoff.
+        return None
+    return None
+
+
+class EmbeddingScheduler:
+    """Embed large text collections concurrently within the account's rate limits."""
+
+    def __init__(
+        self,
+        client: Optional[AsyncOpenAI] = None,
+        embedding_model: Optional[str] = None,
+        embedding_dimensions: Optional[int] = None,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            client: An AsyncOpenAI client; by default one of the configured
+                embeddings provider is created with client-side retries
+                disabled, as the scheduler retries itself.
+            embedding_model: The embedding model (default: from settings).
+            embedding_dimensions: Width of the output matrix (default: from settings).
+        """
+        settings = get_settings()
+        self.openai_settings = settings.openai
+        self.client = client or embeddings_client(settings, asynchronous=True, max_retries=0)
+        self.embedding_model = embedding_model or provider_embedding_model(settings)
+        self.embedding_dimensions = (
+            embedding_dimensions or settings.vector_store.embedding_dimensions
+        )
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Generate embeddings for `texts` with many batches in flight.
+
+        Args:
+            texts: The input texts.
+
+        Returns:
+            A float32 array of shape (len(texts), embedding_dimensions) whose
+            rows follow the order of `texts`.
+        """
+        s = self.openai_settings
+        texts = [text.replace("\n", " ") for text in texts]
+        embeddings = np.empty((len(texts), self.embedding_dimensions), dtype=np.float32)
+
+        # Buckets and limiter bind to the running event loop, so they are per call.
+        self._requests = TokenBucket(s.embedding_requests_per_minute)
+        self._tokens = TokenBucket(s.embedding_tokens_per_minute)
+        self._limiter = AdaptiveConcurrencyLimiter(s.embedding_max_concurrency)
+        self._paused_until = 0.0
+
+        batches = list(
+            batch_by_tokens(
+                texts,
+                max_inputs=s.embedding_batch_size,
+                max_tokens=s.embedding_batch_max_tokens,
+                model=self.embedding_model,
+            )
+        )
+        start_time = time.time()
+        await asyncio.gather(
+            *(
+                self._embed_batch(texts, start, end, n_tokens, embeddings)
+                for start, end, n_tokens in batches
+            )
+        )
+        elapsed_time = time.time() - start_time
+        logging.info(
+            f"{len(texts)} embeddings generated in {elapsed_time:.3f} seconds "
+            f"({len(batches)} batches, up to {s.embedding_max_concurrency} in flight)"
+        )
+        return embeddings
+
+    def run(self, texts: List[str]) -> np.ndarray:
+        """Synchronous wrapper around `embed` for scripts without an event loop."""
+        return asyncio.run(self.embed(texts))
+
+    async def _embed_batch(
+        self,
+        texts: List[str],
+        start: int,
+        end: int,
+        n_tokens: int,
+        embeddings: np.ndarray,
+    ) -> None:
+        """Embed `texts[start:end]` into `embeddings[start:end]`, retrying on failure."""
+        max_retries = self.openai_settings.embedding_max_retries
+        for attempt in range(max_retries + 1):
+            await self._wait_for_pause()
+            async with self._limiter:
+                await self._requests.acquire(1)
+                await self._tokens.acquire(n_tokens)
+                try:
+                    response = await self.client.embeddings.create(
+                        input=texts[start:end],
+                        model=self.embedding_model,
+                        **embedding_request_options(
+                            self.embedding_model, self.embedding_dimensions
+                        ),
+                    )
+                except RETRYABLE_ERRORS as e:
+                    error = e
+                else:
+                    for item in response.data:
+                        embeddings[start + item.index] = item.embedding
+                    await self._limiter.increase()
+                    return
+
+            if attempt == max_retries:
+                raise error
+
+            delay = retry_after_seconds(error)
+            if delay is None:
+                delay = min(60.0, 2**attempt) * (0.5 + random.random())
+            if isinstance(error, RateLimitError):
+                # Slow every worker down, not just the one that was rejected.
+                await self._limiter.decrease()
+                self._requests.drain()
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            logging.warning(
+                f"Embedding batch [{start}:{end}] failed ({type(error).__name__}), "
+                f"retrying in {delay:.1f} seconds (attempt {attempt + 1}/{max_retries})"
+            )
+            await asyncio.sleep(delay)
+
+    async def _wait_for_pause(self) -> None:
+        """Sleep while a provider-requested cool-down is in effect."""
+        remaining = self._paused_until - time.monotonic()
+        if remaining > 0:
+            await asyncio.sleep(remaining)
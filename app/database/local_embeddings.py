@@ -0,0 +1,184 @@
+"""
+local_embeddings.py
+===================================================================
+Deterministic offline stand-in for the embeddings API
+-------------------------------------------------------------------
+
+This module defines `LocalEmbeddingsClient` and `AsyncLocalEmbeddingsClient`,
+drop-in replacements for the `OpenAI` / `AsyncOpenAI` clients as far as
+`embeddings.create` is concerned, so ingestion and search can be
+benchmarked or load-tested without network access or API spend.
+
+Main responsibilities:
+- Embed texts with a hashing random projection: every index term (see
+  `bm25_index.tokenize`) is hashed to a few signed coordinates of the
+  output vector, weighted by 1 + log(tf), and the vector is L2-normalized.
+  The same text always gets the same vector (for a given seed and
+  dimension), and texts sharing terms get close vectors, so searches
+  return meaningful neighbours.
+- Simulate the API latency: a fixed delay per request plus a delay per
+  input text.
+- Return responses shaped like the OpenAI SDK ones (`response.data[i]`
+  with `index` and `embedding`).
+
+Selected with `EMBEDDING_PROVIDER=local` (see `ProviderSettings`):
+`embeddings_client` and `embedding_model` return the client and model
+name the vector stores and the EmbeddingScheduler should use.
+
+Typical usage:
+--------------
+```python
+client = LocalEmbeddingsClient(dimensions=256, latency_seconds=0.05)
+response = client.embeddings.create(input=["Droits de port"], model="local-hashing")
+vector = response.data[0].embedding
+"""
+
+import asyncio
+import hashlib
+import math
+import time
+from collections import Counter
+from types import SimpleNamespace
+from typing import Any, List, Optional
+
+import numpy as np
+from app.config.settings import LocalSettings, Settings
+from app.database.bm25_index import tokenize
+from openai import AsyncOpenAI, OpenAI
+
+# Signed coordinates every term is projected to.
+HASHES_PER_TERM = 4
+
+
+def hashing_embeddings(texts: List[str], dimensions: int, seed: int = 0) -> np.ndarray:
+    """
+    Embed `texts` with a signed hashing projection of their index terms.
+
+    Returns:
+        A float32 array of shape (len(texts), dimensions) of unit rows (a text
+        without any index term gets a vector derived from its raw bytes).
+    """
+    embeddings = np.zeros((len(texts), dimensions), dtype=np.float32)
+    # blake2b takes a 16-byte salt.
+    salt = seed.to_bytes(16, "big", signed=True)
+    for row, text in enumerate(texts):
+        counts = Counter(tokenize(text)) or Counter([text])
+        for term, tf in counts.items():
+            digest = hashlib.blake2b(
+                term.encode("utf-8"), digest_size=8 * HASHES_PER_TERM, salt=salt
+            ).digest()
+            weight = 1.0 + math.log(tf)
+            for k in range(HASHES_PER_TERM):
+                value = int.from_bytes(digest[8 * k : 8 * k + 8], "big")
+                sign = 1.0 if value & 1 else -1.0
+                embeddings[row, (value >> 1) % dimensions] += sign * weight
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.maximum(norms, np.finfo(np.float32).tiny)
+
+
+def _response(texts: List[str], dimensions: int, seed: int) -> SimpleNamespace:
+    """Build an OpenAI-shaped embeddings response."""
+    embeddings = hashing_embeddings(texts, dimensions, seed)
+    return SimpleNamespace(
+        data=[SimpleNamespace(index=i, embedding=vector) for i, vector in enumerate(embeddings)],
+        model="local-hashing",
+    )
+
+
+class _Embeddings:
+    def __init__(self, owner: "LocalEmbeddingsClient"):
+        self._owner = owner
+
+    def create(
+        self, input: List[str], model: str, dimensions: Optional[int] = None, **kwargs: Any
+    ) -> SimpleNamespace:
+        owner = self._owner
+        texts = [input] if isinstance(input, str) else list(input)
+        time.sleep(owner.latency_seconds + owner.latency_per_input_seconds * len(texts))
+        return _response(texts, dimensions or owner.dimensions, owner.seed)
+
+
+class _AsyncEmbeddings(_Embeddings):
+    async def create(
+        self, input: List[str], model: str, dimensions: Optional[int] = None, **kwargs: Any
+    ) -> SimpleNamespace:
+        owner = self._owner
+        texts = [input] if isinstance(input, str) else list(input)
+        await asyncio.sleep(owner.latency_seconds + owner.latency_per_input_seconds * len(texts))
+        return _response(texts, dimensions or owner.dimensions, owner.seed)
+
+
+class LocalEmbeddingsClient:
+    """An offline `OpenAI` client stand-in exposing `embeddings.create`."""
+
+    def __init__(
+        self,
+        dimensions: int,
+        seed: int = 0,
+        latency_seconds: float = 0.0,
+        latency_per_input_seconds: float = 0.0,
+    ):
+        """
+        Args:
+            dimensions: Output size when the request does not pass `dimensions`.
+            seed: Changes the projection (and so every vector).
+            latency_seconds: Simulated delay per request.
+            latency_per_input_seconds: Simulated delay per input text.
+        """
+        self.dimensions = dimensions
+        self.seed = seed
+        self.latency_seconds = latency_seconds
+        self.latency_per_input_seconds = latency_per_input_seconds
+        self.embeddings = self._embeddings_resource()
+
+    @classmethod
+    def from_settings(cls, settings: LocalSettings, dimensions: int) -> "LocalEmbeddingsClient":
+        """Create the client described by `settings`."""
+        return cls(
+            dimensions,
+            seed=settings.embedding_seed,
+            latency_seconds=settings.embedding_latency_seconds,
+            latency_per_input_seconds=settings.embedding_latency_per_input_seconds,
+        )
+
+    def _embeddings_resource(self) -> _Embeddings:
+        return _Embeddings(self)
+
+    def close(self) -> None:
+        """Nothing to release; mirrors the SDK client."""
+
+
+class AsyncLocalEmbeddingsClient(LocalEmbeddingsClient):
+    """An offline `AsyncOpenAI` client stand-in exposing `embeddings.create`."""
+
+    def _embeddings_resource(self) -> _Embeddings:
+        return _AsyncEmbeddings(self)
+
+    async def close(self) -> None:
+        """Nothing to release; mirrors the SDK client."""
+
+
+def embedding_model(settings: Settings) -> str:
+    """Return the embedding model name of the configured embeddings provider."""
+    if settings.providers.embeddings == "local":
+        return settings.local.embedding_model
+    return settings.openai.embedding_model
+
+
+def embeddings_client(settings: Settings, asynchronous: bool = False, **kwargs: Any) -> Any:
+    """
+    Create a client of the configured embeddings provider.
+
+    Args:
+        settings: The application settings.
+        asynchronous: Return an `AsyncOpenAI`-like client.
+        **kwargs: Extra arguments of the OpenAI client (e.g. `max_retries`).
+    """
+    provider = settings.providers.embeddings
+    if provider == "local":
+        local_cls = AsyncLocalEmbeddingsClient if asynchronous else LocalEmbeddingsClient
+        return local_cls.from_settings(settings.local, settings.vector_store.embedding_dimensions)
+    if provider == "openai":
+        openai_cls = AsyncOpenAI if asynchronous else OpenAI
+        return openai_cls(api_key=settings.openai.api_key, **kwargs)
+    raise ValueError(f"Unsupported embeddings provider: {provider}")
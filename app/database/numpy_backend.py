@@ -0,0 +1,374 @@
+"""
+numpy_backend.py
+===================================================================
+In-process exact-search backend on a memory-mapped NumPy matrix
+-------------------------------------------------------------------
+
+This module defines `NumpyBackend`, a `VectorBackend` for corpora that fit
+in RAM (the customs dataset is about a thousand chunks). It answers
+searches without any database: one matrix product against the normalized
+embedding matrix, then `np.argpartition` for the top-k.
+
+Main responsibilities:
+- Keep L2-normalized float32 embeddings in a `.npy` file that is
+  memory-mapped on load, with ids, metadata and contents in a JSON file
+  alongside.
+- Optionally scan a compressed copy of the matrix instead (float16, or
+  int8 with one scale per vector: 2x / 4x less memory), then rescore the
+  best `rescore_factor * limit` candidates exactly with the float32 rows,
+  which stay on disk and are only paged in for those candidates.
+- Answer one or many queries with cosine distances, the same metric as
+  pgvector's `<=>`.
+- Apply `metadata_filter`, `predicates` and `time_range` with the same
+  semantics as the SQL path (see `vector_backend`).
+- Upsert and delete by id or metadata, persisting each change atomically.
+
+Embeddings are stored normalized, so the `embedding` column of results is
+the unit-length vector rather than the raw model output.
+
+Typical usage:
+--------------
+```python
+backend = NumpyBackend(".cache/vectors", dimensions=1536, dtype="float16")
+backend.upsert(ids, metadata, contents, embeddings)
+rows = backend.search(query_embeddings, limit=5)[0]
+"""
+
+import json
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+import numpy as np
+from app.database.quantization import int8_similarities, quantize_int8
+from app.database.vector_backend import VectorBackend, matches_filters
+from timescale_vector import client
+
+EMBEDDINGS_FILE = "embeddings.npy"
+RECORDS_FILE = "records.json"
+SCALES_FILE = "scales.npy"
+SCAN_DTYPES = ("float32", "float16", "int8")
+
+
+def normalize_rows(embeddings: np.ndarray) -> np.ndarray:
+    """Return float32 copies of the rows of `embeddings` scaled to unit length."""
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+    return embeddings / np.maximum(norms, np.finfo(np.float32).tiny)
+
+
+class NumpyBackend(VectorBackend):
+    """Exact cosine search over a memory-mapped embedding matrix."""
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        dimensions: int,
+        dtype: str = "float32",
+        rescore_factor: int = 4,
+    ):
+        """
+        Open (or prepare) the store in `directory`.
+
+        Args:
+            directory: Where the embedding matrix and records are stored.
+            dimensions: Embedding dimensionality.
+            dtype: Type of the scanned matrix, "float32" (exact), "float16"
+                or "int8" (compressed, followed by exact rescoring).
+            rescore_factor: With a compressed matrix, number of candidates
+                rescored exactly per requested result.
+        """
+        if dtype not in SCAN_DTYPES:
+            raise ValueError(f"Unsupported embedding dtype: {dtype}")
+        self.directory = Path(directory)
+        self.dimensions = dimensions
+        self.dtype = dtype
+        self.rescore_factor = rescore_factor
+        self._lock = threading.Lock()
+        self.ids: List[str] = []
+        self.metadata: List[Dict[str, Any]] = []
+        self.contents: List[str] = []
+        self.embeddings = np.empty((0, dimensions), dtype=np.float32)
+        self.codes: Optional[np.ndarray] = None
+        self.scales: Optional[np.ndarray] = None
+        self._positions: Dict[str, int] = {}
+        self._load()
+
+    @property
+    def quantized(self) -> bool:
+        """Whether searches scan a compressed copy of the matrix."""
+        return self.dtype != "float32"
+
+    @property
+    def codes_file(self) -> str:
+        """File name of the compressed matrix."""
+        return f"embeddings.{self.dtype}.npy"
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _load(self) -> None:
+        """Memory-map the saved matrix and read the records, if any."""
+        matrix_path = self.directory / EMBEDDINGS_FILE
+        records_path = self.directory / RECORDS_FILE
+        if not (matrix_path.exists() and records_path.exists()):
+            return
+        records = json.loads(records_path.read_text(encoding="utf-8"))
+        embeddings = np.load(matrix_path, mmap_mode="r")
+        if embeddings.shape != (len(records["ids"]), self.dimensions):
+            raise ValueError(
+                f"{matrix_path} has shape {embeddings.shape}, expected "
+                f"({len(records['ids'])}, {self.dimensions})"
+            )
+        codes = scales = None
+        codes_path = self.directory / self.codes_file
+        if self.quantized and codes_path.exists():
+            codes = np.load(codes_path, mmap_mode="r")
+            if self.dtype == "int8":
+                scales = np.load(self.directory / SCALES_FILE)
+        self._set_state(
+            records["ids"], records["metadata"], records["contents"], embeddings, codes, scales
+        )
+        logging.info(f"Loaded {len(self.ids)} vectors ({self.dtype} scan) from {self.directory}")
+
+    def _set_state(
+        self,
+        ids: List[str],
+        metadata: List[Dict[str, Any]],
+        contents: List[str],
+        embeddings: np.ndarray,
+        codes: Optional[np.ndarray] = None,
+        scales: Optional[np.ndarray] = None,
+    ) -> None:
+        """Replace the records, encoding the scanned matrix if it is not given."""
+        if self.quantized and codes is None:
+            if self.dtype == "int8":
+                codes, scales = quantize_int8(embeddings)
+            else:
+                codes = np.asarray(embeddings, dtype=np.float16)
+        self.ids, self.metadata, self.contents = ids, metadata, contents
+        self.embeddings, self.codes, self.scales = embeddings, codes, scales
+        self._positions = {id_: i for i, id_ in enumerate(ids)}
+
+    def _save(self) -> None:
+        """Atomically write the matrices, then the records that describe them."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        arrays = {EMBEDDINGS_FILE: self.embeddings}
+        if self.quantized:
+            arrays[self.codes_file] = self.codes
+        if self.scales is not None:
+            arrays[SCALES_FILE] = self.scales
+        for name, array in arrays.items():
+            tmp_path = self.directory / f"{name}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, np.ascontiguousarray(array))
+            os.replace(tmp_path, self.directory / name)
+        records_tmp = self.directory / f"{RECORDS_FILE}.tmp"
+        records_tmp.write_text(
+            json.dumps(
+                {"ids": self.ids, "metadata": self.metadata, "contents": self.contents},
+                ensure_ascii=False,
+            ),
+            encoding="utf-8",
+        )
+        os.replace(records_tmp, self.directory / RECORDS_FILE)
+
+    def upsert(
+        self,
+        ids: List[str],
+        metadata: List[dict],
+        contents: List[str],
+        embeddings: np.ndarray,
+    ) -> None:
+        embeddings = np.asarray(embeddings)
+        if embeddings.ndim != 2 or embeddings.shape[1] != self.dimensions:
+            raise ValueError(
+                f"Expected embeddings of shape (n, {self.dimensions}), got {embeddings.shape}"
+            )
+        normalized = normalize_rows(embeddings)
+        with self._lock:
+            new_ids = list(self.ids)
+            new_metadata = list(self.metadata)
+            new_contents = list(self.contents)
+            positions = dict(self._positions)
+            updates: Dict[int, int] = {}
+            for row, (id_, meta, content) in enumerate(zip(ids, metadata, contents)):
+                id_ = str(id_)
+                position = positions.get(id_)
+                if position is None:
+                    position = positions[id_] = len(new_ids)
+                    new_ids.append(id_)
+                    new_metadata.append(meta)
+                    new_contents.append(content)
+                else:
+                    new_metadata[position] = meta
+                    new_contents[position] = content
+                updates[position] = row
+            matrix = np.empty((len(new_ids), self.dimensions), dtype=np.float32)
+            matrix[: len(self.ids)] = self.embeddings
+            targets = np.fromiter(updates.keys(), dtype=np.int64, count=len(updates))
+            sources = np.fromiter(updates.values(), dtype=np.int64, count=len(updates))
+            matrix[targets] = normalized[sources]
+            self._set_state(new_ids, new_metadata, new_contents, matrix)
+            self._save()
+
+    def _mask(
+        self,
+        metadata_filter: Union[dict, List[dict]] = None,
+        predicates: Optional[client.Predicates] = None,
+        time_range: Optional[Tuple[datetime, datetime]] = None,
+    ) -> Optional[np.ndarray]:
+        """Return a boolean mask of the records passing the filters, or None for no filter."""
+        if not (metadata_filter or predicates or time_range):
+            return None
+        uuid_range = client.UUIDTimeRange(*time_range) if time_range else None
+        return np.fromiter(
+            (
+                matches_filters(id_, meta, metadata_filter, predicates, uuid_range)
+                for id_, meta in zip(self.ids, self.metadata)
+            ),
+            dtype=bool,
+            count=len(self.ids),
+        )
+
+    def _row(
+        self,
+        position: int,
+        distance: Optional[float],
+        include_content: bool,
+        include_embedding: bool,
+    ) -> Tuple[Any, ...]:
+        """Build a result row for the record at `position`."""
+        return (
+            uuid.UUID(self.ids[position]),
+            self.metadata[position],
+            self.contents[position] if include_content else None,
+            np.array(self.embeddings[position]) if include_embedding else None,
+            distance,
+        )
+
+    def search(
+        self,
+        query_embeddings: np.ndarray,
+        limit: int,
+        metadata_filter: Union[dict, List[dict]] = None,
+        predicates: Optional[client.Predicates] = None,
+        time_range: Optional[Tuple[datetime, datetime]] = None,
+        include_content: bool = True,
+        include_embedding: bool = True,
+        rescore_factor: Optional[int] = None,
+    ) -> List[List[Tuple[Any, ...]]]:
+        queries = normalize_rows(np.atleast_2d(query_embeddings))
+        with self._lock:
+            mask = self._mask(metadata_filter, predicates, time_range)
+            candidates = np.arange(len(self.ids)) if mask is None else np.flatnonzero(mask)
+            if len(candidates) == 0:
+                return [[] for _ in queries]
+            # (n_candidates, n_queries) similarities in one product.
+            similarities = self._scan(None if mask is None else candidates, queries)
+            k = min(limit, len(candidates))
+            factor = rescore_factor or self.rescore_factor
+            n_rescored = min(len(candidates), k * factor) if self.quantized else k
+            results = []
+            for q in range(len(queries)):
+                top = self._top(similarities[:, q], n_rescored)
+                positions = candidates[top]
+                scores = similarities[top, q]
+                if self.quantized:
+                    # Exact pass on the float32 rows of the shortlisted candidates.
+                    scores = self.embeddings[positions] @ queries[q]
+                    best = self._top(scores, k)
+                    positions, scores = positions[best], scores[best]
+                results.append(
+                    [
+                        self._row(
+                            int(position), float(1.0 - score), include_content, include_embedding
+                        )
+                        for position, score in zip(positions, scores)
+                    ]
+                )
+            return results
+
+    def _scan(self, positions: Optional[np.ndarray], queries: np.ndarray) -> np.ndarray:
+        """Similarities of the rows at `positions` (all rows for None) with `queries`."""
+        select = (lambda a: a) if positions is None else (lambda a: a[positions])
+        if self.dtype == "int8":
+            return int8_similarities(select(self.codes), select(self.scales), queries)
+        matrix = select(self.codes if self.quantized else self.embeddings)
+        return matrix.astype(np.float32, copy=False) @ queries.T
+
+    @staticmethod
+    def _top(scores: np.ndarray, k: int) -> np.ndarray:
+        """Indices of the `k` highest scores, best first."""
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+        return top[np.argsort(-scores[top], kind="stable")]
+
+    def fetch(
+        self,
+        ids: List[str],
+        query_embedding: Optional[np.ndarray] = None,
+        metadata_filter: Union[dict, List[dict]] = None,
+        predicates: Optional[client.Predicates] = None,
+        time_range: Optional[Tuple[datetime, datetime]] = None,
+        include_content: bool = True,
+        include_embedding: bool = True,
+    ) -> List[Tuple[Any, ...]]:
+        with self._lock:
+            uuid_range = client.UUIDTimeRange(*time_range) if time_range else None
+            positions = [
+                position
+                for position in (self._positions.get(str(id_)) for id_ in ids)
+                if position is not None
+                and matches_filters(
+                    self.ids[position],
+                    self.metadata[position],
+                    metadata_filter,
+                    predicates,
+                    uuid_range,
+                )
+            ]
+            distances = [None] * len(positions)
+            if query_embedding is not None and positions:
+                query = normalize_rows(np.atleast_2d(query_embedding))[0]
+                similarities = self.embeddings[positions] @ query
+                distances = (1.0 - similarities).tolist()
+            return [
+                self._row(position, distance, include_content, include_embedding)
+                for position, distance in zip(positions, distances)
+            ]
+
+    def delete(
+        self,
+        ids: Optional[List[str]] = None,
+        metadata_filter: Optional[dict] = None,
+        delete_all: bool = False,
+    ) -> None:
+        with self._lock:
+            if delete_all:
+                keep = np.zeros(len(self.ids), dtype=bool)
+            elif ids:
+                removed = {str(id_) for id_ in ids}
+                keep = np.fromiter(
+                    (id_ not in removed for id_ in self.ids), dtype=bool, count=len(self.ids)
+                )
+            else:
+                keep = ~self._mask(metadata_filter=metadata_filter)
+            positions = np.flatnonzero(keep)
+            self._set_state(
+                [self.ids[i] for i in positions],
+                [self.metadata[i] for i in positions],
+                [self.contents[i] for i in positions],
+                np.asarray(self.embeddings[positions]),
+            )
+            self._save()
+
+    def fetch_ids(self, metadata_filter: Optional[dict] = None) -> Set[str]:
+        with self._lock:
+            if not metadata_filter:
+                return set(self.ids)
+            mask = self._mask(metadata_filter=metadata_filter)
+            return {self.ids[i] for i in np.flatnonzero(mask)}
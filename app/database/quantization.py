@@ -0,0 +1,100 @@
+"""
+quantization.py
+===================================================================
+Reduced-dimension and quantized embedding representations
+-------------------------------------------------------------------
+
+This module gathers the NumPy helpers used to store embeddings in fewer
+bytes than full-precision float32, and to estimate what that costs in
+recall before switching a deployment over.
+
+Main responsibilities:
+- Request shortened embeddings from models that support it
+  (`text-embedding-3-*` accept a `dimensions` parameter) and shorten
+  already computed ones the same way (truncate, then re-normalize).
+- Encode L2-normalized embeddings as float16, int8 (symmetric scalar
+  quantization with one scale per vector) or packed binary (sign bits),
+  and score queries against each encoding in bulk.
+- Report the storage cost per vector of every encoding.
+
+Quantized scores are only used to pick candidates; the full-precision
+vectors are kept alongside for an exact rescoring pass.
+
+Typical usage:
+--------------
+```python
+codes, scales = quantize_int8(embeddings)
+candidates = np.argsort(-int8_similarities(codes, scales, query))[:40]
+"""
+
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+QUANTIZATIONS = ("float32", "float16", "int8", "binary")
+
+
+def embedding_request_options(model: str, dimensions: int) -> Dict[str, Any]:
+    """
+    Return the extra embedding request arguments for `dimensions`.
+
+    `text-embedding-3-*` models return shortened embeddings when asked;
+    older models only have their native size and take no argument.
+    """
+    if model.startswith("text-embedding-3"):
+        return {"dimensions": dimensions}
+    return {}
+
+
+def truncate_embeddings(embeddings: np.ndarray, dimensions: int) -> np.ndarray:
+    """Keep the first `dimensions` components of each row and re-normalize it."""
+    shortened = np.asarray(embeddings, dtype=np.float32)[..., :dimensions]
+    norms = np.linalg.norm(shortened, axis=-1, keepdims=True)
+    return shortened / np.maximum(norms, np.finfo(np.float32).tiny)
+
+
+def quantize_int8(embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quantize rows to int8 with a symmetric per-row scale.
+
+    Returns:
+        (codes, scales): int8 codes of the same shape as `embeddings`, and
+        one float32 scale per row such that row ≈ codes * scale.
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    scales = np.abs(embeddings).max(axis=-1) / 127.0
+    scales = np.maximum(scales, np.finfo(np.float32).tiny)
+    codes = np.clip(np.rint(embeddings / scales[..., None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def int8_similarities(codes: np.ndarray, scales: np.ndarray, queries: np.ndarray) -> np.ndarray:
+    """Approximate dot products of int8-coded rows with float32 `queries` (n, n_queries)."""
+    return (codes.astype(np.float32) @ np.atleast_2d(queries).T) * scales[:, None]
+
+
+def binary_quantize(embeddings: np.ndarray) -> np.ndarray:
+    """Keep the sign bit of every component, packed 8 per byte."""
+    return np.packbits(np.asarray(embeddings) > 0, axis=-1)
+
+
+# Number of set bits of every byte value.
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+
+
+def hamming_distances(packed: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """Hamming distances between packed binary rows and one float32 query."""
+    return _POPCOUNT[np.bitwise_xor(packed, binary_quantize(query))].sum(axis=-1)
+
+
+def bytes_per_vector(quantization: str, dimensions: int) -> int:
+    """Storage needed per vector by an encoding (excluding per-row overhead)."""
+    if quantization == "float32":
+        return 4 * dimensions
+    if quantization == "float16":
+        return 2 * dimensions
+    if quantization == "int8":
+        return dimensions + 4  # codes plus the float32 scale
+    if quantization == "binary":
+        return (dimensions + 7) // 8
+    raise ValueError(f"Unknown quantization: {quantization}")
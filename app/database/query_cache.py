@@ -0,0 +1,111 @@
+"""
+query_cache.py
+===================================================================
+In-process LRU + TTL cache of query embeddings
+-------------------------------------------------------------------
+
+This module defines `QueryEmbeddingCache`, which sits in front of the
+embedding API on `VectorStore`'s query path. Users ask the same customs and
+port-fee questions over and over; a repeated question is answered from
+memory without any network call.
+
+Main responsibilities:
+- Map normalized query text to its float32 embedding (case is kept: the
+  embedding model is case-sensitive, and acronyms and legal references
+  such as "CNSS" or "Dahir" must not share a lowercase spelling's vector).
+- Bound the number of entries (least recently used entries are evicted
+  first) and expire entries after a configurable time to live.
+- Be safe to share between threads.
+- Report hit-rate statistics.
+
+Misses fall through to `VectorStore.get_embeddings`, which consults the
+shared persistent `EmbeddingCache` before calling the API, so the two form
+a memory → disk → API hierarchy.
+
+Typical usage:
+--------------
+```python
+cache = QueryEmbeddingCache(max_size=2048, ttl_seconds=3600)
+embedding = cache.get(query)
+if embedding is None:
+    embedding = embed(query)
+    cache.put(query, embedding)
+print(cache.stats())
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from app.database.embedding_cache import normalize_text
+
+
+class QueryEmbeddingCache:
+    """A thread-safe, size-bounded LRU cache with per-entry expiry."""
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: Optional[float] = 3600.0):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of cached queries.
+            ttl_seconds: Lifetime of an entry; None disables expiry.
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(query: str) -> str:
+        """Normalize a query's whitespace and Unicode form, like `EmbeddingCache`."""
+        return normalize_text(query)
+
+    def get(self, query: str) -> Optional[np.ndarray]:
+        """Return the cached embedding of `query`, or None on a miss or expiry."""
+        key = self.make_key(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created_at, embedding = entry
+                if self.ttl_seconds is None or time.monotonic() - created_at < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return embedding
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, query: str, embedding: np.ndarray) -> None:
+        """Cache the embedding of `query`, evicting the least recently used entry if full."""
+        key = self.make_key(query)
+        embedding = np.array(embedding, dtype=np.float32)
+        embedding.setflags(write=False)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), embedding)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry (statistics are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters, hit rate and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+            }
@@ -0,0 +1,133 @@
+"""
+search_results.py
+===================================================================
+Result containers for vector searches
+-------------------------------------------------------------------
+
+Search queries return rows shaped `(id, metadata, contents, embedding,
+distance)`; columns left out by a projection are returned as NULL so the
+shape never changes. This module turns those rows into either:
+
+- a pandas DataFrame with the metadata expanded into columns, built in one
+  pass over the rows (no per-row `pd.Series`), or
+- a list of `SearchResult` records, a `__slots__` class with no pandas
+  overhead, for latency-sensitive callers.
+
+It also re-ranks over-fetched ANN candidates by their exact distance
+(`rescore_results`), the second stage of two-stage search. Embeddings come
+back as pgvector `Vector` objects from psycopg2 and as arrays from the
+numpy backend; `embedding_array` reads both.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pgvector import Vector
+
+RESULT_COLUMNS = ["id", "metadata", "content", "embedding", "distance"]
+
+
+class SearchResult:
+    """A single search hit."""
+
+    __slots__ = ("id", "metadata", "content", "embedding", "distance")
+
+    def __init__(
+        self,
+        id: str,
+        metadata: Dict[str, Any],
+        content: Optional[str],
+        embedding: Optional[np.ndarray],
+        distance: float,
+    ):
+        self.id = id
+        self.metadata = metadata
+        self.content = content
+        self.embedding = embedding
+        self.distance = distance
+
+    def __repr__(self) -> str:
+        return f"SearchResult(id={self.id!r}, distance={self.distance:.4f})"
+
+
+def embedding_array(embedding: Any) -> np.ndarray:
+    """Return a result `embedding` (list, array or pgvector `Vector`) as a float32 array."""
+    if isinstance(embedding, Vector):
+        embedding = embedding.to_numpy()
+    return np.asarray(embedding, dtype=np.float32)
+
+
+def rescore_results(
+    rows: Sequence[Tuple[Any, ...]],
+    query_embedding: np.ndarray,
+    limit: int,
+    include_embedding: bool = True,
+) -> List[Tuple[Any, ...]]:
+    """
+    Re-rank candidate rows by exact cosine distance and keep the best `limit`.
+
+    Args:
+        rows: Candidate rows, with their full-precision `embedding`.
+        query_embedding: The query vector.
+        limit: Number of rows to keep.
+        include_embedding: Keep the `embedding` column (None otherwise).
+
+    Returns:
+        The best rows, nearest first, with their exact `distance`.
+    """
+    if not rows:
+        return []
+    embeddings = np.stack([embedding_array(row[3]) for row in rows])
+    query = np.asarray(query_embedding, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1) * np.linalg.norm(query)
+    distances = 1.0 - embeddings @ query / np.maximum(norms, np.finfo(np.float32).tiny)
+    k = min(limit, len(rows))
+    top = np.argpartition(distances, k - 1)[:k]
+    top = top[np.argsort(distances[top], kind="stable")]
+    return [
+        (*rows[i][:3], rows[i][3] if include_embedding else None, float(distances[i]))
+        for i in top
+    ]
+
+
+def results_to_records(rows: Sequence[Tuple[Any, ...]]) -> List[SearchResult]:
+    """Convert result rows to `SearchResult` records."""
+    return [
+        SearchResult(str(id_), metadata or {}, content, embedding, distance)
+        for id_, metadata, content, embedding, distance in rows
+    ]
+
+
+def results_to_dataframe(
+    rows: Sequence[Tuple[Any, ...]],
+    include_content: bool = True,
+    include_embedding: bool = True,
+) -> pd.DataFrame:
+    """
+    Create a pandas DataFrame from result rows, with metadata keys as columns.
+
+    Args:
+        rows: Result rows shaped (id, metadata, contents, embedding, distance).
+        include_content: Keep the `content` column.
+        include_embedding: Keep the `embedding` column.
+
+    Returns:
+        A DataFrame with `id` (as str), the kept columns, `distance`, and one
+        column per metadata key.
+    """
+    df = pd.DataFrame.from_records(rows, columns=RESULT_COLUMNS)
+    dropped = ["metadata"]
+    if not include_content:
+        dropped.append("content")
+    if not include_embedding:
+        dropped.append("embedding")
+
+    # Expand metadata column: one DataFrame built from the list of dicts.
+    metadata = pd.DataFrame([m or {} for m in df["metadata"]], index=df.index)
+    df = df.drop(columns=dropped).join(metadata.drop(columns=df.columns, errors="ignore"))
+
+    # Convert id to string for better readability
+    df["id"] = df["id"].astype(str)
+
+    return df
@@ -0,0 +1,260 @@
+"""
+vector_backend.py
+===================================================================
+Pluggable storage/search backends for VectorStore
+-------------------------------------------------------------------
+
+This module defines `VectorBackend`, the interface `VectorStore` delegates
+record storage and similarity search to when it is not talking to
+TimescaleDB, together with a Python evaluator of the Timescale Vector
+filter semantics so every backend filters exactly like the SQL path.
+
+Main responsibilities:
+- Declare the backend operations: `upsert`, `search` (one or many query
+  vectors), `fetch` (rows by id), `delete` and `fetch_ids`. Rows have the
+  same `(id, metadata, contents, embedding, distance)` shape as Timescale
+  Vector results.
+- Evaluate `metadata_filter` (JSONB containment, a list meaning OR),
+  `client.Predicates` (typed comparisons, `@>`, AND/OR/NOT, the special
+  `__uuid_timestamp` field) and `time_range` (UUID v1 timestamps) on
+  in-memory records.
+
+Typical usage:
+--------------
+```python
+vec = VectorStore(backend=NumpyBackend(".cache/vectors", dimensions=1536))
+results = vec.search("Droits de port", limit=5, metadata_filter={"category": "port"})
+"""
+
+import json
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+import numpy as np
+from timescale_vector import client
+
+# Epoch of UUID v1 timestamps (100 ns intervals since the Gregorian reform).
+UUID_EPOCH = datetime(1582, 10, 15, tzinfo=timezone.utc)
+
+_COMPARISONS = {
+    "=": lambda a, b: a == b,
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+}
+
+
+def uuid_timestamp(id_: Union[str, uuid.UUID]) -> datetime:
+    """Return the (UTC) timestamp of a UUID v1, like SQL `uuid_timestamp(id)`."""
+    id_ = id_ if isinstance(id_, uuid.UUID) else uuid.UUID(str(id_))
+    return UUID_EPOCH + timedelta(microseconds=id_.time // 10)
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Make a datetime comparable with UUID timestamps (naive means UTC)."""
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def _contains(value: Any, expected: Any) -> bool:
+    """JSONB containment (`value @> expected`)."""
+    if isinstance(expected, dict):
+        return isinstance(value, dict) and all(
+            key in value and _contains(value[key], item) for key, item in expected.items()
+        )
+    if isinstance(expected, (list, tuple)):
+        if not isinstance(value, list):
+            return False
+        return all(any(_contains(v, item) for v in value) for item in expected)
+    if isinstance(value, list):
+        # A top-level array contains a scalar it holds.
+        return expected in value
+    return value == expected
+
+
+def matches_metadata_filter(
+    metadata: Dict[str, Any], metadata_filter: Union[dict, List[dict]]
+) -> bool:
+    """Return whether `metadata` matches a dict filter, or any of a list of dict filters."""
+    filters = metadata_filter if isinstance(metadata_filter, list) else [metadata_filter]
+    return any(_contains(metadata, f) for f in filters)
+
+
+def _text(value: Any) -> str:
+    """Render a JSON value like `metadata->>'key'`."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return str(value)
+
+
+def _clause_matches(id_: str, metadata: Dict[str, Any], clause: Tuple[Any, ...]) -> bool:
+    """Evaluate one `(field, value)` or `(field, operator, value)` clause; NULL is False."""
+    if len(clause) == 2:
+        (field, value), operator = clause, "="
+    elif len(clause) == 3:
+        field, operator, value = clause
+    else:
+        raise ValueError("Invalid clause format")
+    if operator not in _COMPARISONS and operator != "@>":
+        raise ValueError(f"Invalid operator: {operator}")
+
+    if field == "__uuid_timestamp":
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        return _COMPARISONS[operator](uuid_timestamp(id_), _as_utc(value))
+    if operator == "@>" and isinstance(value, (list, tuple)):
+        if len(value) == 0:
+            raise ValueError("Invalid value. Empty lists and empty tuples are not supported.")
+        return _contains(metadata, {field: list(value)})
+
+    raw = metadata.get(field)
+    if raw is None:
+        return False
+    text = _text(raw)
+    try:
+        # Same casts as the SQL builder: ::int, ::numeric, ::timestamptz, text otherwise.
+        if isinstance(value, bool):
+            left = text
+            value = _text(value)
+        elif isinstance(value, int):
+            left = int(text)
+        elif isinstance(value, float):
+            left = float(text)
+        elif isinstance(value, datetime):
+            left = _as_utc(datetime.fromisoformat(text))
+            value = _as_utc(value)
+        else:
+            left = text
+        return _COMPARISONS[operator](left, value)
+    except (TypeError, ValueError):
+        return False
+
+
+def matches_predicates(id_: str, metadata: Dict[str, Any], predicates: client.Predicates) -> bool:
+    """Evaluate `client.Predicates` on one record, with the semantics of its SQL translation."""
+    results = [
+        matches_predicates(id_, metadata, clause)
+        if isinstance(clause, client.Predicates)
+        else _clause_matches(id_, metadata, clause)
+        for clause in predicates.clauses
+    ]
+    if not results:
+        return True
+    if predicates.operator == "NOT":
+        return not any(results)
+    if predicates.operator == "OR":
+        return any(results)
+    return all(results)
+
+
+def matches_time_range(id_: str, time_range: client.UUIDTimeRange) -> bool:
+    """Return whether the UUID timestamp of `id_` falls inside `time_range`."""
+    timestamp = uuid_timestamp(id_)
+    if time_range.start_date is not None:
+        start = _as_utc(time_range.start_date)
+        if timestamp < start or (timestamp == start and not time_range.start_inclusive):
+            return False
+    if time_range.end_date is not None:
+        end = _as_utc(time_range.end_date)
+        if timestamp > end or (timestamp == end and not time_range.end_inclusive):
+            return False
+    return True
+
+
+def matches_filters(
+    id_: str,
+    metadata: Dict[str, Any],
+    metadata_filter: Union[dict, List[dict]] = None,
+    predicates: Optional[client.Predicates] = None,
+    time_range: Optional[client.UUIDTimeRange] = None,
+) -> bool:
+    """Return whether one record passes all the given filters."""
+    if metadata_filter and not matches_metadata_filter(metadata, metadata_filter):
+        return False
+    if predicates and not matches_predicates(id_, metadata, predicates):
+        return False
+    if time_range and not matches_time_range(id_, time_range):
+        return False
+    return True
+
+
+class VectorBackend(ABC):
+    """Record storage and similarity search behind `VectorStore`."""
+
+    @abstractmethod
+    def upsert(
+        self,
+        ids: List[str],
+        metadata: List[dict],
+        contents: List[str],
+        embeddings: np.ndarray,
+    ) -> None:
+        """Insert records, replacing those whose id already exists."""
+
+    @abstractmethod
+    def search(
+        self,
+        query_embeddings: np.ndarray,
+        limit: int,
+        metadata_filter: Union[dict, List[dict]] = None,
+        predicates: Optional[client.Predicates] = None,
+        time_range: Optional[Tuple[datetime, datetime]] = None,
+        include_content: bool = True,
+        include_embedding: bool = True,
+        rescore_factor: Optional[int] = None,
+    ) -> List[List[Tuple[Any, ...]]]:
+        """
+        Return the `limit` nearest records of each query vector.
+
+        Args:
+            query_embeddings: A (n_queries, dim) array.
+            limit: The maximum number of results per query.
+            metadata_filter, predicates, time_range: Filters with the same
+                semantics as `VectorStore.search`.
+            include_content, include_embedding: Return those columns, or None.
+            rescore_factor: For approximate backends, number of candidates
+                re-ranked exactly per result (None: the backend default).
+
+        Returns:
+            One list of `(id, metadata, contents, embedding, distance)` rows
+            per query, ordered by cosine distance.
+        """
+
+    @abstractmethod
+    def fetch(
+        self,
+        ids: List[str],
+        query_embedding: Optional[np.ndarray] = None,
+        metadata_filter: Union[dict, List[dict]] = None,
+        predicates: Optional[client.Predicates] = None,
+        time_range: Optional[Tuple[datetime, datetime]] = None,
+        include_content: bool = True,
+        include_embedding: bool = True,
+    ) -> List[Tuple[Any, ...]]:
+        """
+        Return the rows of `ids` that pass the filters, in the order of `ids`.
+
+        `distance` is the cosine distance to `query_embedding`, or None
+        without one.
+        """
+
+    @abstractmethod
+    def delete(
+        self,
+        ids: Optional[List[str]] = None,
+        metadata_filter: Optional[dict] = None,
+        delete_all: bool = False,
+    ) -> None:
+        """Delete records by id, by metadata filter, or all of them."""
+
+    @abstractmethod
+    def fetch_ids(self, metadata_filter: Optional[dict] = None) -> Set[str]:
+        """Return the ids of every stored record, or of those matching `metadata_filter`."""
@@ -9,14 +9,41 @@ abstraction layer over Timescale Vector (pgvector + TimescaleDB) to manage
 embedding storage, similarity search, and metadata filtering.
 
 Main responsibilities:
-- Generate embeddings for raw text using OpenAI models.
-- Create and manage vector tables and ANN indexes (DiskANN).
-- Insert, update, and delete document embeddings with associated metadata.
-- Perform vector similarity searches with support for:
+- Generate embeddings for raw text using OpenAI models (or the offline
+  `local` stand-in, see `local_embeddings`), one text at a time
+  or in token-aware batches returned as a float32 matrix (optionally with
+  many batches in flight through `EmbeddingScheduler`), reusing vectors
+  from the persistent `EmbeddingCache` whenever possible.
+- Cache query embeddings in memory (LRU + TTL) so repeated questions skip
+  the embedding API on the search path.
+- Create and manage vector tables and ANN indexes (DiskANN), with tunable
+  build/query parameters and deferred index builds for bulk loads.
+- Request embeddings of the configured dimensionality (text-embedding-3
+  models can return shortened vectors) and optionally index them
+  compressed (halfvec or binary HNSW expression indexes), re-ranking the
+  candidates with the full-precision column.
+- Insert, update, and delete document embeddings with associated metadata,
+  including a binary COPY bulk-load path for large batches.
+- Perform vector similarity searches, one query at a time or many queries
+  in one embedding call and one database round trip, with support for:
   * Metadata filters (dict or list of dicts).
   * Complex predicates (>, <, ==, >=, <=) combined with AND/OR.
   * Time-based filtering (UUID-based).
-- Return results as pandas DataFrames for easier inspection and analysis.
+  Frequently filtered metadata keys can be promoted to typed, indexed
+  columns that filters then use, and filtered searches scan the filtered
+  rows exactly instead of using the ANN index when the planner expects few
+  of them.
+- Run hybrid searches that fuse French full-text ranking (tsvector + GIN)
+  and vector ranking with Reciprocal Rank Fusion in a single SQL query.
+- Rank lexical candidates in process with a memory-mapped `BM25Index`,
+  either on their own (`lexical_search`) or as the lexical side of hybrid
+  search.
+- Delegate storage and search to a pluggable `VectorBackend` instead of
+  TimescaleDB when configured, e.g. the in-process `NumpyBackend` (exact
+  search over a memory-mapped matrix, no Postgres needed).
+- Return results as pandas DataFrames for easier inspection and analysis,
+  or as lightweight `SearchResult` records, optionally without the
+  embedding and content columns.
 
 Typical usage:
 --------------
@@ -24,33 +51,104 @@ Typical usage:
 vec = VectorStore()
 vec.create_tables()
 vec.create_index()
+vec.create_metadata_indexes()  # typed columns for category, document_type, dates
 
 embedding = vec.get_embedding("example text")
+embeddings = vec.get_embeddings(["first text", "second text"])  # (2, dim) float32
 results = vec.search("shipping taxes", limit=5)
+batch = vec.search_many(["shipping taxes", "port fees"], limit=5)  # one result per query
+
+vec.create_text_search_index()
+results = vec.hybrid_search("Article 8 du décret n°2-77-862", limit=5)
+results = vec.lexical_search("Article 8 du décret n°2-77-862", limit=5)  # needs a BM25 index
 
 vec.upsert(my_dataframe)  # Insert new embeddings
 vec.delete(delete_all=True)  # Clear the store
 """
 
+import io
+import json
 import logging
+import re
+import threading
 import time
-from typing import Any, List, Optional, Tuple, Union
-from datetime import datetime
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+from datetime import date, datetime
 
+import numpy as np
 import pandas as pd
-from app.config.settings import get_settings
-from openai import OpenAI
+from app.config.settings import DiskAnnSettings, get_settings
+from app.database.bm25_index import BM25Index
+from app.database.embedding_cache import EmbeddingCache, normalize_text
+from app.database.embedding_scheduler import EmbeddingScheduler
+from app.database.local_embeddings import embedding_model, embeddings_client
+from app.database.numpy_backend import NumpyBackend
+from app.database.pg_copy import encode_copy_binary
+from app.database.quantization import embedding_request_options
+from app.database.query_cache import QueryEmbeddingCache
+from app.database.search_results import (
+    SearchResult,
+    rescore_results,
+    results_to_dataframe,
+    results_to_records,
+)
+from app.database.vector_backend import VectorBackend
+from app.utils.tokens import batch_by_tokens
 from timescale_vector import client
 
 
+# Comparison operators of `client.Predicates` a promoted column can serve.
+_COLUMN_OPERATORS = {
+    operator: sql
+    for operator, sql in client.Predicates.operators_mapping.items()
+    if operator != "@>"
+}
+
+# SQL type and extraction expression of each kind of promoted metadata column.
+_PROMOTED_TYPES = {
+    "text": ("text", "metadata->>{key}"),
+    "date": ("date", "metadata_date(metadata->>{key})"),
+}
+
+# Distinct filters whose planner row estimate is kept by `_exact_scan_preferred`.
+ROW_ESTIMATES_MAX_SIZE = 1024
+
+# Records encoded per COPY command by bulk upserts.
+COPY_BATCH_SIZE = 5000
+
+
+def diskann_query_params(
+    diskann: DiskAnnSettings, search_list_size: Optional[int], rescore: Optional[int]
+) -> Optional[client.DiskAnnIndexParams]:
+    """
+    Combine per-query DiskANN overrides with the configured defaults.
+
+    Returns:
+        The query parameters to pass to a search, or None to use the index defaults.
+    """
+    search_list_size = search_list_size or diskann.query_search_list_size
+    rescore = rescore if rescore is not None else diskann.query_rescore
+    if search_list_size is None and rescore is None:
+        return None
+    return client.DiskAnnIndexParams(search_list_size=search_list_size, rescore=rescore)
+
+
 class VectorStore:
     """A class for managing vector operations and database interactions."""
 
-    def __init__(self):
-        """Initialize the VectorStore with settings, OpenAI client, and Timescale Vector client."""
+    def __init__(self, backend: Optional[VectorBackend] = None):
+        """
+        Initialize the VectorStore with settings, OpenAI client, and Timescale Vector client.
+
+        Args:
+            backend: Storage/search backend to use instead of TimescaleDB
+                (default: chosen by `VectorStoreSettings.backend`).
+        """
         self.settings = get_settings()
-        self.openai_client = OpenAI(api_key=self.settings.openai.api_key)
-        self.embedding_model = self.settings.openai.embedding_model
+        self.openai_client = embeddings_client(self.settings)
+        self.embedding_model = embedding_model(self.settings)
         self.vector_settings = self.settings.vector_store
         self.vec_client = client.Sync(
             self.settings.database.service_url,
@@ -58,6 +156,53 @@ class VectorStore:
             self.vector_settings.embedding_dimensions,
             time_partition_interval=self.vector_settings.time_partition_interval,
         )
+        cache_settings = self.settings.embedding_cache
+        self.embedding_cache = (
+            EmbeddingCache(cache_settings.path, max_bytes=cache_settings.max_bytes)
+            if cache_settings.enabled
+            else None
+        )
+        query_cache_settings = self.settings.query_cache
+        self.query_cache = (
+            QueryEmbeddingCache(
+                max_size=query_cache_settings.max_size,
+                ttl_seconds=query_cache_settings.ttl_seconds,
+            )
+            if query_cache_settings.enabled
+            else None
+        )
+        self.lexical_index = self.load_lexical_index()
+        self.backend = backend if backend is not None else self._create_backend()
+        # Promoted metadata columns present in the table, looked up on first use.
+        self._promoted: Optional[Dict[str, str]] = None
+        # Planner row estimates of recent filters: key -> (time, rows).
+        self._row_estimates: "OrderedDict[str, Tuple[float, int]]" = OrderedDict()
+        self._row_estimates_lock = threading.Lock()
+        # Progress of the running `bulk_load` ("min_rows", "rows", "index_dropped").
+        self._bulk_load_state: Optional[Dict[str, Any]] = None
+
+    def _create_backend(self) -> Optional[VectorBackend]:
+        """Return the configured backend, or None to use TimescaleDB."""
+        backend = self.vector_settings.backend
+        if backend == "timescale":
+            return None
+        if backend == "numpy":
+            return NumpyBackend(
+                self.vector_settings.local_index_path,
+                self.vector_settings.embedding_dimensions,
+                dtype=self.vector_settings.local_index_dtype,
+                rescore_factor=self.vector_settings.quantized_rescore_factor,
+            )
+        raise ValueError(f"Unknown vector store backend: {backend}")
+
+    def load_lexical_index(self) -> Optional[BM25Index]:
+        """Load the BM25 index from `VectorStoreSettings.bm25_index_path`, if it was built."""
+        path = self.vector_settings.bm25_index_path
+        if not (path / "index.json").exists():
+            return None
+        lexical_index = BM25Index.load(path)
+        logging.info(f"Loaded BM25 index of {len(lexical_index)} documents from {path}")
+        return lexical_index
 
     def get_embedding(self, text: str) -> List[float]:
         """
@@ -69,46 +214,826 @@ class VectorStore:
         Returns:
             A list of floats representing the embedding.
         """
-        text = text.replace("\n", " ")
+        return self.get_embeddings([text])[0].tolist()
+
+    def get_query_embedding(self, query_text: str) -> np.ndarray:
+        """
+        Return the embedding of a search query, from the query cache when possible.
+
+        Args:
+            query_text: The query to embed.
+
+        Returns:
+            The query embedding as a float32 vector.
+        """
+        return self.get_query_embeddings([query_text])[0]
+
+    def get_query_embeddings(self, queries: List[str]) -> np.ndarray:
+        """
+        Embed many search queries, serving repeated ones from the query cache.
+
+        Misses are embedded together in one `get_embeddings` call, which
+        consults the persistent cache first when
+        `QueryCacheSettings.use_persistent_cache` is set.
+
+        Args:
+            queries: The queries to embed.
+
+        Returns:
+            A float32 array of shape (len(queries), embedding_dimensions).
+        """
+        if self.query_cache is None:
+            return self.get_embeddings(queries)
+        embeddings = np.empty(
+            (len(queries), self.vector_settings.embedding_dimensions), dtype=np.float32
+        )
+        missing = []
+        for i, query in enumerate(queries):
+            cached = self.query_cache.get(query)
+            if cached is None:
+                missing.append(i)
+            else:
+                embeddings[i] = cached
+        if missing:
+            new_embeddings = self.get_embeddings(
+                [queries[i] for i in missing],
+                use_cache=self.settings.query_cache.use_persistent_cache,
+            )
+            for i, embedding in zip(missing, new_embeddings):
+                embeddings[i] = embedding
+                self.query_cache.put(queries[i], embedding)
+        return embeddings
+
+    def get_embeddings(
+        self, texts: List[str], concurrent: bool = False, use_cache: bool = True
+    ) -> np.ndarray:
+        """
+        Generate embeddings for many texts with as few API requests as possible.
+
+        Texts are normalized (see `normalize_text`) and looked up in the
+        persistent embedding cache first; only misses are sent to the API,
+        packed into batches that respect the provider's per-request
+        input-count and token limits (see `OpenAISettings`).
+
+        Args:
+            texts: The input texts to generate embeddings for.
+            concurrent: Send batches concurrently through an `EmbeddingScheduler`
+                (rate-limited, with retries). Must not be called from a running
+                event loop; use `EmbeddingScheduler.embed` there instead.
+            use_cache: Read and populate the persistent embedding cache.
+
+        Returns:
+            A float32 array of shape (len(texts), embedding_dimensions) whose
+            rows follow the order of `texts`.
+        """
+        texts = [normalize_text(text) for text in texts]
+        dimensions = self.vector_settings.embedding_dimensions
+        embeddings = np.empty((len(texts), dimensions), dtype=np.float32)
+        cache = self.embedding_cache if use_cache else None
+
+        missing = list(range(len(texts)))
+        if cache is not None:
+            keys = [cache.make_key(self.embedding_model, dimensions, text) for text in texts]
+            missing = []
+            for i, vector in enumerate(cache.get_many(keys)):
+                if vector is None:
+                    missing.append(i)
+                else:
+                    embeddings[i] = vector
+
+        if missing:
+            # Embed each distinct missing text once.
+            unique_texts = list(dict.fromkeys(texts[i] for i in missing))
+            if concurrent:
+                new_embeddings = EmbeddingScheduler(
+                    embedding_model=self.embedding_model
+                ).run(unique_texts)
+            else:
+                new_embeddings = self._request_embeddings(unique_texts)
+            positions = {text: row for row, text in enumerate(unique_texts)}
+            for i in missing:
+                embeddings[i] = new_embeddings[positions[texts[i]]]
+            if cache is not None:
+                cache.put_many(
+                    [cache.make_key(self.embedding_model, dimensions, t) for t in unique_texts],
+                    new_embeddings,
+                )
+
+        if cache is not None:
+            logging.info(
+                f"Embedding cache: {len(texts) - len(missing)} hits, {len(missing)} misses"
+            )
+        return embeddings
+
+    def _request_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Embed `texts` with the API in sequential token-aware batches."""
+        embeddings = np.empty(
+            (len(texts), self.vector_settings.embedding_dimensions), dtype=np.float32
+        )
         start_time = time.time()
-        embedding = (
-            self.openai_client.embeddings.create(
-                input=[text],
+        n_requests = 0
+        for start, end, _ in batch_by_tokens(
+            texts,
+            max_inputs=self.settings.openai.embedding_batch_size,
+            max_tokens=self.settings.openai.embedding_batch_max_tokens,
+            model=self.embedding_model,
+        ):
+            response = self.openai_client.embeddings.create(
+                input=texts[start:end],
                 model=self.embedding_model,
+                **embedding_request_options(
+                    self.embedding_model, self.vector_settings.embedding_dimensions
+                ),
             )
-            .data[0]
-            .embedding
-        )
+            # The API tags each embedding with the index of its input.
+            for item in response.data:
+                embeddings[start + item.index] = item.embedding
+            n_requests += 1
         elapsed_time = time.time() - start_time
-        logging.info(f"Embedding generated in {elapsed_time:.3f} seconds")
-        return embedding
+        logging.info(
+            f"{len(texts)} embeddings generated in {elapsed_time:.3f} seconds "
+            f"({n_requests} requests)"
+        )
+        return embeddings
+
+    @property
+    def table(self) -> str:
+        """The quoted name of the embeddings table, for use in raw SQL."""
+        return '"' + self.vector_settings.table_name.replace('"', '""') + '"'
+
+    def _execute(
+        self,
+        query: str,
+        params: Optional[Any] = None,
+        query_params: Optional[client.QueryParams] = None,
+    ) -> List[Tuple[Any, ...]]:
+        """
+        Run a raw SQL statement on the Timescale Vector connection pool.
+
+        Args:
+            query: The SQL statement, with psycopg2 (`%s` / `%(name)s`) placeholders.
+            params: The statement parameters.
+            query_params: Index query parameters (e.g. `DiskAnnIndexParams`)
+                applied to the statement's transaction with `SET LOCAL`.
+
+        Returns:
+            The fetched rows, or an empty list for statements without results.
+        """
+        with self.vec_client.connect() as conn:
+            with conn.cursor() as cursor:
+                if query_params is not None:
+                    for statement in query_params.get_statements():
+                        cursor.execute(statement)
+                cursor.execute(query, params)
+                return cursor.fetchall() if cursor.description else []
+
+    def _where_clause(
+        self,
+        params: List[Any],
+        metadata_filter: Union[dict, List[dict]] = None,
+        predicates: Optional[client.Predicates] = None,
+        time_range: Optional[Tuple[datetime, datetime]] = None,
+    ) -> Tuple[str, List[Any]]:
+        """
+        Build a SQL filter with the same semantics as `search`.
+
+        Follows the Timescale Vector query builder and predicates, so the
+        clause has `$n` placeholders numbered after the existing `params`;
+        pass the final statement through `_to_pyformat` before running it.
+        Conditions on promoted metadata keys use their indexed columns.
+
+        Returns:
+            The WHERE clause (without the keyword) and the extended params.
+        """
+        params = list(params)
+        where_clauses = []
+        promoted = self._promoted_columns() if metadata_filter or predicates else {}
+        if metadata_filter:
+            where, params = self._metadata_filter_clause(params, metadata_filter, promoted)
+            where_clauses.append(where)
+        if predicates:
+            where, params = self._predicates_clause(params, predicates, promoted)
+            where_clauses.append(f"({where})")
+        if time_range:
+            where, params = client.UUIDTimeRange(*time_range).build_query(params)
+            where_clauses.append(where)
+        return " AND ".join(where_clauses) or "TRUE", params
+
+    def _metadata_filter_clause(
+        self, params: List[Any], metadata_filter: Union[dict, List[dict]], promoted: Dict[str, str]
+    ) -> Tuple[str, List[Any]]:
+        """
+        Translate a containment filter, comparing promoted text keys on their columns.
+
+        String values of promoted text keys become equalities on the column;
+        the rest of each dict stays a JSONB containment test.
+        """
+        filters = metadata_filter if isinstance(metadata_filter, list) else [metadata_filter]
+        if not any(promoted.get(key) == "text" for f in filters for key in f):
+            return self.vec_client.builder._where_clause_for_filter(params, metadata_filter)
+        alternatives = []
+        for metadata_dict in filters:
+            conditions, rest = [], {}
+            for key, value in metadata_dict.items():
+                if promoted.get(key) == "text" and isinstance(value, str):
+                    params = params + [value]
+                    conditions.append(f"{self._promoted_column(key)} = ${len(params)}")
+                else:
+                    rest[key] = value
+            if rest or not conditions:
+                params = params + [json.dumps(rest)]
+                conditions.append(f"metadata @> ${len(params)}::jsonb")
+            alternatives.append(" AND ".join(conditions))
+        return "(" + " OR ".join(f"({a})" for a in alternatives) + ")", params
+
+    def _predicates_clause(
+        self, params: List[Any], predicates: client.Predicates, promoted: Dict[str, str]
+    ) -> Tuple[str, List[Any]]:
+        """
+        Translate `predicates` like `Predicates.build_query`, using promoted columns.
+
+        Comparisons of a promoted text key with a string, or of a promoted
+        date key with a date or datetime, are made on the typed column (with
+        the same NULL semantics); other clauses are built by Timescale Vector.
+        """
+        if not predicates.clauses:
+            return "TRUE", params
+        conditions = []
+        for clause in predicates.clauses:
+            if isinstance(clause, client.Predicates):
+                where, params = self._predicates_clause(params, clause, promoted)
+                conditions.append(f"({where})")
+                continue
+            if len(clause) == 2:
+                (field, value), operator = clause, "="
+            elif len(clause) == 3:
+                field, operator, value = clause
+            else:
+                raise ValueError("Invalid clause format")
+            column_type = promoted.get(field)
+            if operator in _COLUMN_OPERATORS and (
+                (column_type == "text" and isinstance(value, str))
+                or (column_type == "date" and isinstance(value, date))
+            ):
+                params = params + [value]
+                conditions.append(
+                    f"{self._promoted_column(field)} {_COLUMN_OPERATORS[operator]} ${len(params)}"
+                )
+            else:
+                where, params = client.Predicates(clause).build_query(list(params))
+                conditions.append(where)
+        if predicates.operator == "NOT":
+            # Like Timescale Vector: all-NULL clauses pass the NOT filter.
+            return f"TRUE IS DISTINCT FROM ({' OR '.join(conditions)})", params
+        return f" {predicates.operator} ".join(conditions), params
+
+    @staticmethod
+    def _to_pyformat(query: str, params: List[Any]) -> Tuple[str, dict]:
+        """Translate `$n` placeholders to psycopg2 `%(n)s` placeholders."""
+        return (
+            re.sub(r"\$(\d+)", r"%(\1)s", query),
+            {str(i): param for i, param in enumerate(params, start=1)},
+        )
+
+    def fetch_ids(self, metadata_filter: Optional[dict] = None) -> Set[str]:
+        """
+        Return the ids of every record stored in the table.
+
+        Args:
+            metadata_filter: Only return the records whose metadata contains
+                these key/value pairs.
+        """
+        if self.backend is not None:
+            return self.backend.fetch_ids(metadata_filter)
+        if not metadata_filter:
+            return {row[0] for row in self._execute(f"SELECT id::text FROM {self.table}")}
+        return {
+            row[0]
+            for row in self._execute(
+                f"SELECT id::text FROM {self.table} WHERE metadata @> %s::jsonb",
+                (json.dumps(metadata_filter),),
+            )
+        }
+
+    def fetch(
+        self,
+        ids: List[str],
+        return_dataframe: bool = True,
+        include_content: bool = True,
+        include_embedding: bool = True,
+        as_records: bool = False,
+    ) -> Union[List[Tuple[Any, ...]], pd.DataFrame, List[SearchResult]]:
+        """
+        Load records by id, e.g. the context of a cached answer, without a search.
+
+        Args:
+            ids: Record ids; missing ones are skipped.
+            return_dataframe, include_content, include_embedding, as_records:
+                Result projection and format, as in `search`.
+
+        Returns:
+            The records in the order of `ids`, with a None `distance`.
+        """
+        if self.backend is not None:
+            results = self.backend.fetch(
+                ids, include_content=include_content, include_embedding=include_embedding
+            )
+        else:
+            query = f"""
+                SELECT id, metadata, {self._projection(include_content, include_embedding)},
+                       NULL::float8 AS distance
+                FROM unnest($1::uuid[]) WITH ORDINALITY AS c(record_id, ord)
+                JOIN {self.table} ON id = c.record_id
+                ORDER BY c.ord
+            """
+            query, params = self._to_pyformat(query, [[str(id_) for id_ in ids]])
+            results = self._execute(query, params)
+        return self._format_results(
+            results, return_dataframe, as_records, include_content, include_embedding
+        )
 
     def create_tables(self) -> None:
         """Create the necessary tables in the database"""
+        if self.backend is not None:
+            return
         self.vec_client.create_tables()
 
+    def create_text_search_index(self) -> None:
+        """
+        Add a full-text search column and its GIN index to the embeddings table.
+
+        The `contents_tsv` column is generated from `contents` with the
+        configured text search configuration (`french` by default), so it stays
+        in sync with every insert and update.
+        """
+        if self.backend is not None:
+            return
+        config = self.vector_settings.text_search_config
+        index_name = '"' + f"{self.vector_settings.table_name}_contents_tsv_idx".replace('"', '""') + '"'
+        self._execute(
+            f"ALTER TABLE {self.table} ADD COLUMN IF NOT EXISTS contents_tsv tsvector "
+            f"GENERATED ALWAYS AS (to_tsvector(%s::regconfig, coalesce(contents, ''))) STORED",
+            (config,),
+        )
+        self._execute(
+            f"CREATE INDEX IF NOT EXISTS {index_name} ON {self.table} USING GIN (contents_tsv)"
+        )
+
+    @staticmethod
+    def _quote(name: str) -> str:
+        """Quote an SQL identifier."""
+        return '"' + name.replace('"', '""') + '"'
+
+    def _promoted_column(self, key: str) -> str:
+        """The quoted name of the column a metadata key is promoted to."""
+        return self._quote(f"meta_{key}")
+
+    def _promoted_columns(self) -> Dict[str, str]:
+        """Return the promoted metadata keys (and their type) present in the table."""
+        if self._promoted is None:
+            rows = self._execute(
+                "SELECT column_name FROM information_schema.columns WHERE table_name = %s",
+                (self.vector_settings.table_name,),
+            )
+            self._set_promoted_columns(row[0] for row in rows)
+        return self._promoted
+
+    def _set_promoted_columns(self, columns: Iterable[str]) -> None:
+        """Record which configured metadata keys are promoted, from the table's `columns`."""
+        existing = set(columns)
+        self._promoted = {
+            key: column_type
+            for key, column_type in self.vector_settings.promoted_metadata.items()
+            if f"meta_{key}" in existing
+        }
+
+    def create_metadata_indexes(self) -> None:
+        """
+        Promote `VectorStoreSettings.promoted_metadata` keys to typed, indexed columns.
+
+        Each key gets a generated `meta_<key>` column (text, or date parsed
+        from ISO `YYYY-MM-DD` values, NULL otherwise) with a btree index, so
+        filters on it are index lookups with accurate planner estimates
+        instead of JSONB scans. A GIN index on `metadata` serves containment
+        filters on the other keys.
+        """
+        if self.backend is not None:
+            return
+        # make_date() is immutable, unlike a ::date cast, so it can feed a generated column.
+        self._execute(
+            """
+            CREATE OR REPLACE FUNCTION metadata_date(value text) RETURNS date
+            LANGUAGE plpgsql IMMUTABLE PARALLEL SAFE AS $$
+            BEGIN
+                IF value !~ '^\\d{4}-\\d{2}-\\d{2}' THEN
+                    RETURN NULL;
+                END IF;
+                RETURN make_date(
+                    substr(value, 1, 4)::int, substr(value, 6, 2)::int, substr(value, 9, 2)::int
+                );
+            EXCEPTION WHEN others THEN
+                RETURN NULL;
+            END
+            $$
+            """
+        )
+        table_name = self.vector_settings.table_name
+        for key, column_type in self.vector_settings.promoted_metadata.items():
+            if column_type not in _PROMOTED_TYPES:
+                raise ValueError(f"Unknown promoted metadata type: {column_type}")
+            sql_type, expression = _PROMOTED_TYPES[column_type]
+            literal = "'" + key.replace("'", "''") + "'"
+            self._execute(
+                f"ALTER TABLE {self.table} ADD COLUMN IF NOT EXISTS {self._promoted_column(key)} "
+                f"{sql_type} GENERATED ALWAYS AS ({expression.format(key=literal)}) STORED"
+            )
+            self._execute(
+                f"CREATE INDEX IF NOT EXISTS {self._quote(f'{table_name}_meta_{key}_idx')} "
+                f"ON {self.table} ({self._promoted_column(key)})"
+            )
+        self._execute(
+            f"CREATE INDEX IF NOT EXISTS {self._quote(f'{table_name}_metadata_idx')} "
+            f"ON {self.table} USING GIN (metadata jsonb_path_ops)"
+        )
+        self._execute(f"ANALYZE {self.table}")
+        with self._row_estimates_lock:
+            self._row_estimates.clear()
+        self._promoted = None
+
+    def _exact_scan_preferred(
+        self,
+        metadata_filter: Union[dict, List[dict]] = None,
+        predicates: Optional[client.Predicates] = None,
+        time_range: Optional[Tuple[datetime, datetime]] = None,
+    ) -> bool:
+        """
+        Decide whether a filtered search should scan the filtered rows exactly.
+
+        With `filtered_search="auto"`, the filter's row count is estimated by
+        the planner (from the statistics of the promoted columns when the
+        filter uses them): small subsets are cheaper to scan exactly, and an
+        exact scan cannot miss results the way a filtered ANN scan can. The
+        estimate of each distinct filter is cached for
+        `row_estimate_ttl_seconds`, so repeated filters skip the EXPLAIN.
+        """
+        preferred, explain, params, key = self._exact_scan_decision(
+            metadata_filter, predicates, time_range
+        )
+        if preferred is not None:
+            return preferred
+        query, query_params = self._to_pyformat(explain, params)
+        return self._record_row_estimate(key, self._execute(query, query_params)[0][0])
+
+    def _exact_scan_decision(
+        self,
+        metadata_filter: Union[dict, List[dict]] = None,
+        predicates: Optional[client.Predicates] = None,
+        time_range: Optional[Tuple[datetime, datetime]] = None,
+    ) -> Tuple[Optional[bool], str, List[Any], str]:
+        """
+        Decide `_exact_scan_preferred` without querying the database when possible.
+
+        Returns:
+            The decision (None when the planner must be asked), the EXPLAIN
+            statement to run otherwise (with `$n` placeholders), its params,
+            and the cache key to pass to `_record_row_estimate` with its plan.
+        """
+        strategy = self.vector_settings.filtered_search
+        if strategy not in ("auto", "ann", "exact"):
+            raise ValueError(f"Unknown filtered search strategy: {strategy}")
+        if not (metadata_filter or predicates or time_range) or strategy == "ann":
+            return False, "", [], ""
+        if strategy == "exact":
+            return True, "", [], ""
+        where, params = self._where_clause([], metadata_filter, predicates, time_range)
+        key = json.dumps([where, params], sort_keys=True, default=str)
+        now = time.monotonic()
+        with self._row_estimates_lock:
+            entry = self._row_estimates.get(key)
+            if entry is not None and now - entry[0] < self.vector_settings.row_estimate_ttl_seconds:
+                self._row_estimates.move_to_end(key)
+                return entry[1] <= self.vector_settings.exact_scan_max_rows, "", [], key
+        explain = f"EXPLAIN (FORMAT JSON) SELECT 1 FROM {self.table} WHERE {where}"
+        return None, explain, params, key
+
+    def _record_row_estimate(self, key: str, plan: Any) -> bool:
+        """Cache the row estimate of an EXPLAIN `plan` under `key` and return the decision."""
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimated_rows = plan[0]["Plan"]["Plan Rows"]
+        logging.info(f"Filter expected to match {estimated_rows} rows")
+        with self._row_estimates_lock:
+            self._row_estimates[key] = (time.monotonic(), estimated_rows)
+            self._row_estimates.move_to_end(key)
+            while len(self._row_estimates) > ROW_ESTIMATES_MAX_SIZE:
+                self._row_estimates.popitem(last=False)
+        return estimated_rows <= self.vector_settings.exact_scan_max_rows
+
+    def _exact_sql(self, vector: str, where: str, limit: str, columns: str) -> str:
+        """
+        Return a SELECT of the `limit` filtered rows nearest to `vector`, without the ANN index.
+
+        `OFFSET 0` keeps the filtered subquery from being flattened, so the
+        rows come from the metadata indexes and are sorted by exact distance.
+        Arguments are as in `_candidates_sql`.
+        """
+        return f"""
+            SELECT *
+            FROM (
+                SELECT {columns}, embedding <=> {vector} AS distance
+                FROM {self.table}
+                WHERE {where}
+                OFFSET 0
+            ) filtered
+            ORDER BY distance
+            LIMIT {limit}
+        """
+
+    def _quantized_index_name(self) -> str:
+        """The quoted name of the compressed HNSW index."""
+        settings = self.vector_settings
+        name = f"{settings.table_name}_embedding_{settings.quantization}_idx"
+        return '"' + name.replace('"', '""') + '"'
+
+    def _quantized_distance(self, vector: str) -> str:
+        """
+        SQL distance between the compressed `embedding` and `vector`.
+
+        The expression matches the one of the compressed index, so ORDER BY
+        on it uses the index.
+        """
+        dimensions = self.vector_settings.embedding_dimensions
+        if self.vector_settings.quantization == "halfvec":
+            return f"embedding::halfvec({dimensions}) <=> ({vector})::halfvec({dimensions})"
+        if self.vector_settings.quantization == "binary":
+            return f"binary_quantize(embedding)::bit({dimensions}) <~> binary_quantize({vector})"
+        raise ValueError(f"Unknown quantization: {self.vector_settings.quantization}")
+
+    def _candidates_sql(self, vector: str, where: str, limit: str, columns: str) -> str:
+        """
+        Return a SELECT of `limit` rows in ANN order, with their exact `distance`.
+
+        The order comes from the compressed index when quantization is
+        configured, from the index on `embedding` otherwise.
+
+        Args:
+            vector: SQL expression of the query vector (e.g. "$1::vector").
+            where: The filter, without the WHERE keyword.
+            limit: SQL expression of the number of rows.
+            columns: Select list of table columns.
+        """
+        if self.vector_settings.quantization:
+            order = self._quantized_distance(vector)
+        else:
+            order = f"embedding <=> {vector}"
+        return f"""
+            SELECT {columns}, embedding <=> {vector} AS distance
+            FROM {self.table}
+            WHERE {where}
+            ORDER BY {order}
+            LIMIT {limit}
+        """
+
+    def _nearest_sql(self, vector: str, where: str, limit: str, columns: str) -> str:
+        """
+        Return a SELECT of the `limit` rows nearest to `vector`, with `distance`.
+
+        Without quantization the ANN index on `embedding` is used directly.
+        With it, `quantized_rescore_factor * limit` candidates are taken from
+        the compressed index, then ordered by their exact full-precision
+        distance. Arguments are as in `_candidates_sql`.
+        """
+        if not self.vector_settings.quantization:
+            return self._candidates_sql(vector, where, limit, columns)
+        factor = int(self.vector_settings.quantized_rescore_factor)
+        return f"""
+            SELECT *
+            FROM ({self._candidates_sql(vector, where, f"({limit}) * {factor}", columns)}) candidates
+            ORDER BY distance
+            LIMIT {limit}
+        """
+
     def create_index(self) -> None:
         """Create the StreamingDiskANN index to speed up similarity search"""
-        self.vec_client.create_embedding_index(client.DiskAnnIndex())
+        if self.backend is not None:
+            return
+        if self.vector_settings.quantization:
+            dimensions = self.vector_settings.embedding_dimensions
+            column, operators = {
+                "halfvec": (f"(embedding::halfvec({dimensions}))", "halfvec_cosine_ops"),
+                "binary": (f"(binary_quantize(embedding)::bit({dimensions}))", "bit_hamming_ops"),
+            }[self.vector_settings.quantization]
+            self._execute(
+                f"CREATE INDEX IF NOT EXISTS {self._quantized_index_name()} "
+                f"ON {self.table} USING hnsw ({column} {operators})"
+            )
+            return
+        diskann = self.vector_settings.diskann
+        build_params = {
+            "num_neighbors": diskann.num_neighbors,
+            "search_list_size": diskann.search_list_size,
+            "max_alpha": diskann.max_alpha,
+            "storage_layout": diskann.storage_layout,
+            "num_bits_per_dimension": diskann.num_bits_per_dimension,
+        }
+        self.vec_client.create_embedding_index(
+            client.DiskAnnIndex(**{k: v for k, v in build_params.items() if v is not None})
+        )
 
     def drop_index(self) -> None:
         """Drop the StreamingDiskANN index in the database"""
+        if self.backend is not None:
+            return
+        if self.vector_settings.quantization:
+            self._execute(f"DROP INDEX IF EXISTS {self._quantized_index_name()}")
         self.vec_client.drop_embedding_index()
 
-    def upsert(self, df: pd.DataFrame) -> None:
+    @contextmanager
+    def bulk_load(self, min_rows: Optional[int] = None) -> Iterator["VectorStore"]:
+        """
+        Defer index maintenance while loading many records.
+
+        Once `min_rows` rows have been written through `upsert(bulk=True)` /
+        `copy_upsert` (or at the first write into an empty table), the ANN
+        index is dropped, and it is built once on exit (also when loading
+        fails, so the table stays searchable) instead of being updated on
+        every insert. Smaller loads, such as an incremental re-ingestion that
+        writes few or no rows, keep the index and never rebuild it.
+
+        Args:
+            min_rows: Rows written before the index is dropped
+                (default: `VectorStoreSettings.bulk_load_min_rows`).
+
+        Example:
+            with vector_store.bulk_load():
+                vector_store.upsert(df, bulk=True)
+        """
+        if self.backend is not None:
+            yield self
+            return
+        if min_rows is None:
+            min_rows = self.vector_settings.bulk_load_min_rows
+        empty = not self._execute(f"SELECT EXISTS (SELECT 1 FROM {self.table})")[0][0]
+        state = {"min_rows": 0 if empty else min_rows, "rows": 0, "index_dropped": False}
+        self._bulk_load_state = state
+        start_time = time.time()
+        try:
+            yield self
+        finally:
+            self._bulk_load_state = None
+            elapsed = time.time() - start_time
+            if state["index_dropped"]:
+                logging.info(
+                    f"{state['rows']} rows loaded in {elapsed:.3f} seconds, building index"
+                )
+                index_start_time = time.time()
+                self.create_index()
+                logging.info(f"Index built in {time.time() - index_start_time:.3f} seconds")
+            else:
+                logging.info(
+                    f"{state['rows']} rows loaded in {elapsed:.3f} seconds, index kept"
+                )
+
+    def _defer_index(self, rows: int) -> None:
+        """Count rows written by a running `bulk_load`, dropping the index past its threshold."""
+        state = self._bulk_load_state
+        if state is None:
+            return
+        state["rows"] += rows
+        if not state["index_dropped"] and rows and state["rows"] >= state["min_rows"]:
+            logging.info("Dropping the index until the end of the bulk load")
+            self.drop_index()
+            state["index_dropped"] = True
+
+    def _query_params(
+        self,
+        search_list_size: Optional[int],
+        rescore: Optional[int],
+        limit: int = 0,
+        rescore_factor: Optional[int] = None,
+    ) -> Optional[client.QueryParams]:
+        """
+        Return index query parameters from per-query overrides and settings.
+
+        With a compressed HNSW index, `search_list_size` is its `ef_search`,
+        at least the number of candidates fetched for `limit` results
+        (`rescore_factor` of them per result in a two-stage search).
+        """
+        if self.vector_settings.quantization:
+            candidates = limit * (rescore_factor or self.vector_settings.quantized_rescore_factor)
+            return client.HNSWIndexParams(ef_search=search_list_size or max(40, candidates))
+        return diskann_query_params(self.vector_settings.diskann, search_list_size, rescore)
+
+    def upsert(self, df: pd.DataFrame, bulk: bool = False) -> None:
         """
         Insert or update records in the database from a pandas DataFrame.
 
         Args:
             df: A pandas DataFrame containing the data to insert or update.
                 Expected columns: id, metadata, contents, embedding
+            bulk: Stream the records with binary COPY into a staging table and
+                merge them with a single INSERT ... ON CONFLICT (see `copy_upsert`).
         """
+        if bulk or self.backend is not None:
+            self.copy_upsert(
+                df["id"].tolist(),
+                df["metadata"].tolist(),
+                df["contents"].tolist(),
+                np.stack(df["embedding"].to_numpy()).astype(np.float32, copy=False),
+            )
+            return
         records = df.to_records(index=False)
         self.vec_client.upsert(list(records))
         logging.info(
             f"Inserted {len(df)} records into {self.vector_settings.table_name}"
         )
 
+    def copy_upsert(
+        self,
+        ids: List[str],
+        metadata: List[dict],
+        contents: List[str],
+        embeddings: np.ndarray,
+        batch_size: int = COPY_BATCH_SIZE,
+    ) -> None:
+        """
+        Bulk-load records with binary COPY, then merge them into the table.
+
+        Records are copied in batches of `batch_size` into a temporary staging
+        table, then inserted into the embeddings table with one
+        `INSERT ... ON CONFLICT (id) DO UPDATE`, all in a single transaction.
+        When `ids` holds duplicates, the last record of each id wins, as with
+        row-by-row upserts.
+
+        Args:
+            ids: Record ids.
+            metadata: Metadata dicts, one per record.
+            contents: Record texts.
+            embeddings: A (n, embedding_dimensions) float32 array.
+            batch_size: Number of records encoded per COPY command.
+        """
+        start_time = time.time()
+        ids, metadata, contents, embeddings = self._last_records(ids, metadata, contents, embeddings)
+        if self.backend is not None:
+            self.backend.upsert(ids, metadata, contents, embeddings)
+            logging.info(
+                f"Inserted {len(ids)} records into the {self.vector_settings.backend} backend "
+                f"in {time.time() - start_time:.3f} seconds"
+            )
+            return
+        self._defer_index(len(ids))
+        with self.vec_client.connect() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(self._staging_table_sql())
+                for start in range(0, len(ids), batch_size):
+                    end = start + batch_size
+                    payload = encode_copy_binary(
+                        ids[start:end], metadata[start:end], contents[start:end], embeddings[start:end]
+                    )
+                    cursor.copy_expert(
+                        "COPY embeddings_staging FROM STDIN (FORMAT BINARY)", io.BytesIO(payload)
+                    )
+                cursor.execute(self._merge_staging_sql())
+        elapsed_time = time.time() - start_time
+        logging.info(
+            f"Bulk-loaded {len(ids)} records into {self.vector_settings.table_name} "
+            f"in {elapsed_time:.3f} seconds"
+        )
+
+    @staticmethod
+    def _last_records(
+        ids: List[str], metadata: List[dict], contents: List[str], embeddings: np.ndarray
+    ) -> Tuple[List[str], List[dict], List[str], np.ndarray]:
+        """Keep only the last record of each id, in their original order."""
+        last = {str(id_): i for i, id_ in enumerate(ids)}
+        if len(last) == len(ids):
+            return ids, metadata, contents, embeddings
+        keep = sorted(last.values())
+        return (
+            [ids[i] for i in keep],
+            [metadata[i] for i in keep],
+            [contents[i] for i in keep],
+            embeddings[keep],
+        )
+
+    def _staging_table_sql(self) -> str:
+        """CREATE statement of the transaction's staging table for binary COPY."""
+        return (
+            "CREATE TEMP TABLE IF NOT EXISTS embeddings_staging "
+            "(id uuid, metadata jsonb, contents text, "
+            f"embedding vector({self.vector_settings.embedding_dimensions})) ON COMMIT DROP"
+        )
+
+    def _merge_staging_sql(self) -> str:
+        """Statement upserting the staging table into the embeddings table."""
+        return (
+            f"INSERT INTO {self.table} (id, metadata, contents, embedding) "
+            "SELECT id, metadata, contents, embedding "
+            "FROM embeddings_staging "
+            "ON CONFLICT (id) DO UPDATE SET metadata = EXCLUDED.metadata, "
+            "contents = EXCLUDED.contents, embedding = EXCLUDED.embedding"
+        )
+
     def search(
         self,
         query_text: str,
@@ -117,7 +1042,14 @@ class VectorStore:
         predicates: Optional[client.Predicates] = None,
         time_range: Optional[Tuple[datetime, datetime]] = None,
         return_dataframe: bool = True,
-    ) -> Union[List[Tuple[Any, ...]], pd.DataFrame]:
+        query_embedding: Optional[np.ndarray] = None,
+        search_list_size: Optional[int] = None,
+        rescore: Optional[int] = None,
+        include_content: bool = True,
+        include_embedding: bool = True,
+        as_records: bool = False,
+        rescore_factor: Optional[int] = None,
+    ) -> Union[List[Tuple[Any, ...]], pd.DataFrame, List[SearchResult]]:
         """
         Query the vector database for similar embeddings based on input text.
 
@@ -135,9 +1067,29 @@ class VectorStore:
                 - | is used to combine multiple predicates with OR operator.
             time_range: A tuple of (start_date, end_date) to filter results by time.
             return_dataframe: Whether to return results as a DataFrame (default: True).
+            query_embedding: A precomputed embedding of `query_text`, e.g. from
+                `get_embeddings`; skips the embedding request when given.
+            search_list_size: DiskANN query-time candidate list size (overrides
+                `DiskAnnSettings.query_search_list_size`); larger is slower
+                but more accurate.
+            rescore: Number of DiskANN candidates re-ranked with full-precision
+                vectors (overrides `DiskAnnSettings.query_rescore`).
+            include_content: Fetch the `contents` column (default: True).
+            include_embedding: Fetch the `embedding` column (default: True).
+                Leaving columns out shrinks the transferred rows; they are
+                returned as None (and dropped from DataFrames).
+            as_records: Return a list of lightweight `SearchResult` records
+                instead of a DataFrame or tuples.
+            rescore_factor: Two-stage search: fetch `rescore_factor * limit`
+                candidates in ANN order (compressed index when quantization
+                is configured), re-rank them exactly against their
+                full-precision vectors in NumPy and keep the best `limit`
+                (overrides `VectorStoreSettings.rescore_factor`; larger is
+                slower but closer to exact search).
 
         Returns:
-            Either a list of tuples or a pandas DataFrame containing the search results.
+            A list of tuples, a pandas DataFrame or a list of `SearchResult`
+            containing the search results.
 
         Basic Examples:
             Basic search:
@@ -157,7 +1109,8 @@ class VectorStore:
             Search with time range:
                 vector_store.search("Recent updates", time_range=(datetime(2024, 1, 1), datetime(2024, 1, 31)))
         """
-        query_embedding = self.get_embedding(query_text)
+        if query_embedding is None:
+            query_embedding = self.get_query_embedding(query_text)
 
         start_time = time.time()
 
@@ -175,43 +1128,559 @@ class VectorStore:
             start_date, end_date = time_range
             search_args["uuid_time_filter"] = client.UUIDTimeRange(start_date, end_date)
 
-        results = self.vec_client.search(query_embedding, **search_args)
+        rescore_factor = rescore_factor or self.vector_settings.rescore_factor
+        query_params = self._query_params(search_list_size, rescore, limit, rescore_factor)
+        if query_params:
+            search_args["query_params"] = query_params
+
+        if self.backend is not None:
+            results = self.backend.search(
+                np.atleast_2d(query_embedding),
+                limit,
+                metadata_filter,
+                predicates,
+                time_range,
+                include_content,
+                include_embedding,
+                rescore_factor=rescore_factor,
+            )[0]
+        else:
+            exact = self._exact_scan_preferred(metadata_filter, predicates, time_range)
+            if not exact and self._client_search_supported(
+                metadata_filter, predicates, include_content, include_embedding, rescore_factor
+            ):
+                results = self.vec_client.search(query_embedding, **search_args)
+            else:
+                query, params = self._search_sql(
+                    query_embedding,
+                    limit,
+                    metadata_filter,
+                    predicates,
+                    time_range,
+                    include_content,
+                    include_embedding,
+                    rescore_factor,
+                    exact,
+                )
+                query, params = self._to_pyformat(query, params)
+                results = self._execute(query, params, None if exact else query_params)
+                if rescore_factor and not exact:
+                    results = rescore_results(results, query_embedding, limit, include_embedding)
         elapsed_time = time.time() - start_time
 
         logging.info(f"Vector search completed in {elapsed_time:.3f} seconds")
 
-        if return_dataframe:
-            return self._create_dataframe_from_results(results)
+        return self._format_results(
+            results, return_dataframe, as_records, include_content, include_embedding
+        )
+
+    def _client_search_supported(
+        self,
+        metadata_filter: Union[dict, List[dict]],
+        predicates: Optional[client.Predicates],
+        include_content: bool,
+        include_embedding: bool,
+        rescore_factor: Optional[int],
+    ) -> bool:
+        """Whether the Timescale Vector client's own `search` can run an ANN search."""
+        return (
+            include_content
+            and include_embedding
+            and not rescore_factor
+            and not self.vector_settings.quantization
+            and not (metadata_filter or predicates)
+        )
+
+    def _search_sql(
+        self,
+        query_embedding: np.ndarray,
+        limit: int,
+        metadata_filter: Union[dict, List[dict]],
+        predicates: Optional[client.Predicates],
+        time_range: Optional[Tuple[datetime, datetime]],
+        include_content: bool,
+        include_embedding: bool,
+        rescore_factor: Optional[int],
+        exact: bool,
+    ) -> Tuple[str, List[Any]]:
+        """
+        Build the statement of a single `search`, with `$n` placeholders, and its params.
+
+        With `exact`, the filtered rows are scanned exactly (`_exact_sql`).
+        Otherwise, with `rescore_factor`, `rescore_factor * limit` candidates
+        are selected with their embedding, for `rescore_results`, and without
+        it the `limit` nearest rows (`_nearest_sql`).
+        """
+        if exact:
+            select, rows = self._exact_sql, limit
+        elif rescore_factor:
+            select, rows = self._candidates_sql, limit * rescore_factor
+            include_embedding = True
         else:
-            return results
+            select, rows = self._nearest_sql, limit
+        params: List[Any] = [query_embedding, rows]
+        where, params = self._where_clause(params, metadata_filter, predicates, time_range)
+        query = select(
+            "$1::vector",
+            where,
+            "$2",
+            f"id, metadata, {self._projection(include_content, include_embedding)}",
+        )
+        return query, params
 
-    def _create_dataframe_from_results(
+    def hybrid_search(
         self,
-        results: List[Tuple[Any, ...]],
-    ) -> pd.DataFrame:
+        query_text: str,
+        limit: int = 5,
+        lexical_weight: Optional[float] = None,
+        candidates: Optional[int] = None,
+        rrf_k: Optional[int] = None,
+        lexical_source: Optional[str] = None,
+        metadata_filter: Union[dict, List[dict]] = None,
+        predicates: Optional[client.Predicates] = None,
+        time_range: Optional[Tuple[datetime, datetime]] = None,
+        return_dataframe: bool = True,
+        search_list_size: Optional[int] = None,
+        rescore: Optional[int] = None,
+        include_content: bool = True,
+        include_embedding: bool = True,
+        as_records: bool = False,
+    ) -> Union[List[Tuple[Any, ...]], pd.DataFrame, List[SearchResult]]:
         """
-        Create a pandas DataFrame from the search results.
+        Combine full-text and vector search with Reciprocal Rank Fusion in one query.
+
+        The `candidates` nearest neighbours (ANN index) and the `candidates`
+        best full-text matches (`contents_tsv @@ websearch_to_tsquery`, ranked
+        with `ts_rank_cd`) are fused inside a single SQL statement with
+
+            score = (1 - w) / (k + rank_vector) + w / (k + rank_lexical)
+
+        so exact terms such as "Article 8" or "n°2-77-862" are found even when
+        their embedding is not close. Requires `create_text_search_index`,
+        or a BM25 index when `lexical_source` is "bm25": the lexical ranking
+        is then computed in process and only the ranked ids are sent.
 
         Args:
-            results: A list of tuples containing the search results.
+            query_text: The input text to search for.
+            limit: The maximum number of results to return.
+            lexical_weight: Weight w of the full-text ranking, between 0 and 1
+                (default: `VectorStoreSettings.hybrid_lexical_weight`).
+            candidates: Number of candidates taken from each ranking
+                (default: `VectorStoreSettings.hybrid_candidates`).
+            rrf_k: The RRF constant k (default: `VectorStoreSettings.hybrid_rrf_k`).
+            lexical_source: "database" (tsvector) or "bm25" (in-process index)
+                (default: `VectorStoreSettings.hybrid_lexical_source`).
+            metadata_filter, predicates, time_range: Filters applied to both
+                rankings, with the same semantics as in `search`.
+            return_dataframe, search_list_size, rescore, include_content,
+            include_embedding, as_records: As in `search`.
 
         Returns:
-            A pandas DataFrame containing the formatted search results.
+            The fused results ordered by RRF score; `distance` is the vector distance.
+
+        Raises:
+            ValueError: If `lexical_source` is unknown, or "bm25" without a BM25 index.
+
+        Example:
+            vector_store.hybrid_search("Article 8 du décret n°2-77-862", lexical_weight=0.7)
         """
-        # Convert results to DataFrame
-        df = pd.DataFrame(
-            results, columns=["id", "metadata", "content", "embedding", "distance"]
+        lexical_weight = (
+            self.vector_settings.hybrid_lexical_weight if lexical_weight is None else lexical_weight
         )
+        candidates = candidates or self.vector_settings.hybrid_candidates
+        rrf_k = rrf_k or self.vector_settings.hybrid_rrf_k
+        lexical_source = lexical_source or self.vector_settings.hybrid_lexical_source
+        if lexical_source not in ("database", "bm25"):
+            raise ValueError(f"Unknown lexical source: {lexical_source}")
+        query_embedding = self.get_query_embedding(query_text)
 
-        # Expand metadata column
-        df = pd.concat(
-            [df.drop(["metadata"], axis=1), df["metadata"].apply(pd.Series)], axis=1
+        start_time = time.time()
+        filtered = bool(metadata_filter or predicates or time_range)
+        if self.backend is not None:
+            if lexical_source != "bm25":
+                raise ValueError(
+                    f"The {self.vector_settings.backend} backend needs lexical_source='bm25'"
+                )
+            results = self._local_hybrid_search(
+                query_text,
+                query_embedding,
+                limit,
+                lexical_weight,
+                max(candidates, limit),
+                rrf_k,
+                metadata_filter,
+                predicates,
+                time_range,
+                include_content,
+                include_embedding,
+            )
+            logging.info(f"Hybrid search completed in {time.time() - start_time:.3f} seconds")
+            return self._format_results(
+                results, return_dataframe, as_records, include_content, include_embedding
+            )
+        if lexical_source == "bm25":
+            lexical_query, _ = self._lexical_candidates(
+                query_text, None if filtered else max(candidates, limit)
+            )
+            lexical_cte = f"""
+                SELECT id, row_number() OVER (ORDER BY ord) AS rank
+                FROM (
+                    SELECT id, c.ord
+                    FROM unnest($2::uuid[]) WITH ORDINALITY AS c(candidate_id, ord)
+                    JOIN {self.table} ON id = c.candidate_id
+                    WHERE {{lexical_where}}
+                    ORDER BY c.ord
+                    LIMIT $4
+                ) l
+            """
+        else:
+            lexical_query = query_text
+            lexical_cte = f"""
+                SELECT id, row_number() OVER (ORDER BY score DESC) AS rank
+                FROM (
+                    SELECT id, ts_rank_cd(contents_tsv, query) AS score
+                    FROM {self.table}, websearch_to_tsquery($3::regconfig, $2) AS query
+                    WHERE contents_tsv @@ query AND {{lexical_where}}
+                    ORDER BY score DESC
+                    LIMIT $4
+                ) l
+            """
+        params: List[Any] = [
+            query_embedding,
+            lexical_query,
+            self.vector_settings.text_search_config,
+            max(candidates, limit),
+            lexical_weight,
+            rrf_k,
+            limit,
+        ]
+        semantic_where, params = self._where_clause(params, metadata_filter, predicates, time_range)
+        lexical_where, params = self._where_clause(params, metadata_filter, predicates, time_range)
+        lexical_cte = lexical_cte.format(lexical_where=lexical_where)
+        query = f"""
+            WITH semantic AS (
+                SELECT id, row_number() OVER (ORDER BY distance) AS rank
+                FROM ({self._nearest_sql("$1::vector", semantic_where, "$4", "id")}) s
+            ),
+            lexical AS ({lexical_cte}),
+            fused AS (
+                SELECT id,
+                       (1 - $5) * COALESCE(1.0 / ($6 + semantic.rank), 0)
+                       + $5 * COALESCE(1.0 / ($6 + lexical.rank), 0) AS score
+                FROM semantic FULL OUTER JOIN lexical USING (id)
+            )
+            SELECT t.id, t.metadata, {self._projection(include_content, include_embedding)},
+                   t.embedding <=> $1::vector AS distance
+            FROM fused JOIN {self.table} t ON t.id = fused.id
+            ORDER BY fused.score DESC
+            LIMIT $7
+        """
+        query, params = self._to_pyformat(query, params)
+        results = self._execute(
+            query, params, self._query_params(search_list_size, rescore, max(candidates, limit))
+        )
+        elapsed_time = time.time() - start_time
+        logging.info(f"Hybrid search completed in {elapsed_time:.3f} seconds")
+
+        return self._format_results(
+            results, return_dataframe, as_records, include_content, include_embedding
         )
 
-        # Convert id to string for better readability
-        df["id"] = df["id"].astype(str)
+    def _local_hybrid_search(
+        self,
+        query_text: str,
+        query_embedding: np.ndarray,
+        limit: int,
+        lexical_weight: float,
+        candidates: int,
+        rrf_k: int,
+        metadata_filter: Union[dict, List[dict]],
+        predicates: Optional[client.Predicates],
+        time_range: Optional[Tuple[datetime, datetime]],
+        include_content: bool,
+        include_embedding: bool,
+    ) -> List[Tuple[Any, ...]]:
+        """Run `hybrid_search` on the backend, fusing the two rankings in Python."""
+        semantic = self.backend.search(
+            np.atleast_2d(query_embedding),
+            candidates,
+            metadata_filter,
+            predicates,
+            time_range,
+            include_content=False,
+            include_embedding=False,
+        )[0]
+        filtered = bool(metadata_filter or predicates or time_range)
+        lexical_ids, _ = self._lexical_candidates(query_text, None if filtered else candidates)
+        lexical = self.backend.fetch(
+            lexical_ids,
+            metadata_filter=metadata_filter,
+            predicates=predicates,
+            time_range=time_range,
+            include_content=False,
+            include_embedding=False,
+        )[:candidates]
+
+        scores: dict = {}
+        for weight, rows in ((1 - lexical_weight, semantic), (lexical_weight, lexical)):
+            for rank, row in enumerate(rows, start=1):
+                id_ = str(row[0])
+                scores[id_] = scores.get(id_, 0.0) + weight / (rrf_k + rank)
+        fused = sorted(scores, key=scores.get, reverse=True)[:limit]
+        return self.backend.fetch(
+            fused,
+            query_embedding=query_embedding,
+            include_content=include_content,
+            include_embedding=include_embedding,
+        )
 
-        return df
+    def _lexical_candidates(
+        self, query_text: str, limit: Optional[int]
+    ) -> Tuple[List[str], np.ndarray]:
+        """
+        Rank record ids for `query_text` with the BM25 index.
+
+        Args:
+            query_text: The query text.
+            limit: Number of ids to return; None returns every matching id
+                (needed when a filter may discard some of them).
+
+        Returns:
+            (ids, scores) in decreasing BM25 score order.
+
+        Raises:
+            ValueError: If no BM25 index was built.
+        """
+        if self.lexical_index is None:
+            raise ValueError(
+                f"No BM25 index at {self.vector_settings.bm25_index_path}; "
+                "build it with app.services.ingestion.build_lexical_index"
+            )
+        return self.lexical_index.search(query_text, limit=limit or len(self.lexical_index))
+
+    def lexical_search(
+        self,
+        query_text: str,
+        limit: int = 5,
+        metadata_filter: Union[dict, List[dict]] = None,
+        predicates: Optional[client.Predicates] = None,
+        time_range: Optional[Tuple[datetime, datetime]] = None,
+        return_dataframe: bool = True,
+        include_content: bool = True,
+        include_embedding: bool = True,
+        as_records: bool = False,
+    ) -> Union[List[Tuple[Any, ...]], pd.DataFrame, List[SearchResult]]:
+        """
+        Search with the in-process BM25 index only, without any embedding request.
+
+        Documents are ranked in memory; the database is only used to fetch
+        the rows of the best ids (and to apply filters), in one query.
+
+        Args:
+            query_text: The input text to search for.
+            limit: The maximum number of results to return.
+            metadata_filter, predicates, time_range: Filters with the same
+                semantics as in `search`.
+            return_dataframe, include_content, include_embedding, as_records:
+                Result projection and format, as in `search`.
+
+        Returns:
+            The results in BM25 order; `distance` is the negated BM25 score.
+
+        Raises:
+            ValueError: If no BM25 index was built.
+
+        Example:
+            vector_store.lexical_search("décret n°2-77-862 article 8", limit=3)
+        """
+        start_time = time.time()
+        filtered = bool(metadata_filter or predicates or time_range)
+        ids, scores = self._lexical_candidates(query_text, None if filtered else limit)
+        if self.backend is not None:
+            distances = dict(zip(ids, (-float(score) for score in scores)))
+            rows = self.backend.fetch(
+                ids,
+                metadata_filter=metadata_filter,
+                predicates=predicates,
+                time_range=time_range,
+                include_content=include_content,
+                include_embedding=include_embedding,
+            )[:limit]
+            results = [row[:4] + (distances[str(row[0])],) for row in rows]
+            logging.info(f"Lexical search completed in {time.time() - start_time:.3f} seconds")
+            return self._format_results(
+                results, return_dataframe, as_records, include_content, include_embedding
+            )
+        params: List[Any] = [ids, [-float(score) for score in scores], limit]
+        where, params = self._where_clause(params, metadata_filter, predicates, time_range)
+        query = f"""
+            SELECT id, metadata, {self._projection(include_content, include_embedding)},
+                   c.distance
+            FROM unnest($1::uuid[], $2::float8[]) WITH ORDINALITY AS c(candidate_id, distance, ord)
+            JOIN {self.table} ON id = c.candidate_id
+            WHERE {where}
+            ORDER BY c.ord
+            LIMIT $3
+        """
+        query, params = self._to_pyformat(query, params)
+        results = self._execute(query, params)
+        elapsed_time = time.time() - start_time
+        logging.info(f"Lexical search completed in {elapsed_time:.3f} seconds")
+
+        return self._format_results(
+            results, return_dataframe, as_records, include_content, include_embedding
+        )
+
+    def search_many(
+        self,
+        queries: List[str],
+        limit: int = 5,
+        metadata_filter: Union[dict, List[dict]] = None,
+        predicates: Optional[client.Predicates] = None,
+        time_range: Optional[Tuple[datetime, datetime]] = None,
+        return_dataframe: bool = True,
+        search_list_size: Optional[int] = None,
+        rescore: Optional[int] = None,
+        include_content: bool = True,
+        include_embedding: bool = True,
+        as_records: bool = False,
+        rescore_factor: Optional[int] = None,
+    ) -> List[Union[List[Tuple[Any, ...]], pd.DataFrame, List[SearchResult]]]:
+        """
+        Run many similarity searches with one embedding call and one database round trip.
+
+        All queries are embedded together (through the query cache and
+        `get_embeddings`), then answered by a single SQL statement that joins
+        the list of query vectors `LATERAL` against the embeddings table, so
+        each query still uses the ANN index.
+
+        Args:
+            queries: The input texts to search for.
+            limit: The maximum number of results per query.
+            metadata_filter, predicates, time_range: Filters applied to every
+                query, with the same semantics as in `search`.
+            return_dataframe: Whether to return each result as a DataFrame (default: True).
+            search_list_size, rescore: DiskANN query parameter overrides, as in `search`.
+            include_content, include_embedding, as_records: Result projection
+                and format, as in `search`.
+            rescore_factor: Two-stage search with exact NumPy re-ranking, as in `search`.
+
+        Returns:
+            One result per query, in the order of `queries`.
+
+        Example:
+            results = vector_store.search_many(["Droit de port ?", "Taxe sur les tapis ?"], limit=3)
+        """
+        if not queries:
+            return []
+        query_embeddings = self.get_query_embeddings(queries)
+
+        start_time = time.time()
+        rescore_factor = rescore_factor or self.vector_settings.rescore_factor
+        if self.backend is not None:
+            grouped = self.backend.search(
+                query_embeddings,
+                limit,
+                metadata_filter,
+                predicates,
+                time_range,
+                include_content,
+                include_embedding,
+                rescore_factor=rescore_factor,
+            )
+            logging.info(
+                f"Batched vector search of {len(queries)} queries completed in "
+                f"{time.time() - start_time:.3f} seconds"
+            )
+            return [
+                self._format_results(
+                    results, return_dataframe, as_records, include_content, include_embedding
+                )
+                for results in grouped
+            ]
+        if self._exact_scan_preferred(metadata_filter, predicates, time_range):
+            rescore_factor = None
+            select = self._exact_sql
+        else:
+            select = self._candidates_sql if rescore_factor else self._nearest_sql
+        n_rows = limit * rescore_factor if rescore_factor else limit
+        params: List[Any] = [list(query_embeddings), n_rows]
+        where, params = self._where_clause(params, metadata_filter, predicates, time_range)
+        query = f"""
+            SELECT q.ord, r.id, r.metadata, r.contents, r.embedding, r.distance
+            FROM unnest($1::vector[]) WITH ORDINALITY AS q(query_embedding, ord)
+            CROSS JOIN LATERAL ({select(
+                "q.query_embedding",
+                where,
+                "$2",
+                f"id, metadata, "
+                f"{self._projection(include_content, include_embedding or bool(rescore_factor))}",
+            )}) r
+            ORDER BY q.ord, r.distance
+        """
+        query, params = self._to_pyformat(query, params)
+        rows = self._execute(
+            query, params, self._query_params(search_list_size, rescore, limit, rescore_factor)
+        )
+        elapsed_time = time.time() - start_time
+        logging.info(
+            f"Batched vector search of {len(queries)} queries completed in {elapsed_time:.3f} seconds"
+        )
+
+        grouped: List[List[Tuple[Any, ...]]] = [[] for _ in queries]
+        for row in rows:
+            grouped[row[0] - 1].append(tuple(row[1:]))
+        if rescore_factor:
+            grouped = [
+                rescore_results(results, query_embedding, limit, include_embedding)
+                for results, query_embedding in zip(grouped, query_embeddings)
+            ]
+        return [
+            self._format_results(
+                results, return_dataframe, as_records, include_content, include_embedding
+            )
+            for results in grouped
+        ]
+
+    @staticmethod
+    def _projection(include_content: bool, include_embedding: bool) -> str:
+        """Return the contents/embedding select list, with NULLs for left-out columns."""
+        return ", ".join(
+            [
+                "contents" if include_content else "NULL::text AS contents",
+                "embedding" if include_embedding else "NULL::vector AS embedding",
+            ]
+        )
+
+    def _format_results(
+        self,
+        results: List[Tuple[Any, ...]],
+        return_dataframe: bool,
+        as_records: bool,
+        include_content: bool = True,
+        include_embedding: bool = True,
+    ) -> Union[List[Tuple[Any, ...]], pd.DataFrame, List[SearchResult]]:
+        """Convert raw result rows to the format requested by the caller."""
+        if as_records:
+            return results_to_records(results)
+        if return_dataframe:
+            return results_to_dataframe(results, include_content, include_embedding)
+        return results
+
+    @staticmethod
+    def _create_dataframe_from_results(
+        results: List[Tuple[Any, ...]],
+    ) -> pd.DataFrame:
+        """
+        Create a pandas DataFrame from the search results.
+
+        Args:
+            results: A list of tuples containing the search results.
+
+        Returns:
+            A pandas DataFrame containing the formatted search results.
+        """
+        return results_to_dataframe(results)
 
     def delete(
         self,
@@ -244,7 +1713,10 @@ class VectorStore:
                 "Provide exactly one of: ids, metadata_filter, or delete_all"
             )
 
-        if delete_all:
+        if self.backend is not None:
+            self.backend.delete(ids=ids, metadata_filter=metadata_filter, delete_all=delete_all)
+            logging.info(f"Deleted records from the {self.vector_settings.backend} backend")
+        elif delete_all:
             self.vec_client.delete_all()
             logging.info(f"Deleted all records from {self.vector_settings.table_name}")
         elif ids:
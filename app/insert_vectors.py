@@ -1,44 +1,31 @@
-import json
-import pandas as pd
-from app.database.vector_store import VectorStore
-from timescale_vector.client import uuid_from_time
-from datetime import datetime
+import argparse
 
+from app.database.vector_store import VectorStore
+from app.services.ingestion import StreamingIngestor, build_lexical_index
+
+parser = argparse.ArgumentParser(description="Stream a CSV corpus into the vector store")
+parser.add_argument("csv_path", nargs="?", default="../data/Rdataset.csv")
+parser.add_argument(
+    "--restart", action="store_true", help="ignore the checkpoint and start from the first row"
+)
+parser.add_argument(
+    "--skip-lexical-index", action="store_true", help="do not rebuild the BM25 index"
+)
+args = parser.parse_args()
 
 # Initialize VectorStore
 vec = VectorStore()
 
-# Read the CSV file
-df = pd.read_csv("../data/Rdataset.csv", sep=";")
-
-def prepare_record(row):
-    content = row["content"]
-    embedding = vec.get_embedding(content)
-
-    # Parse metadata if it's a string
-    metadata = row["metadata"]
-    if isinstance(metadata, str):
-        try:
-            metadata = json.loads(metadata)
-        except Exception:
-            metadata = {"raw": metadata}
-
-    return pd.Series(
-        {
-            "id": str(uuid_from_time(datetime.now())),
-            "metadata": metadata,
-            "contents": content,
-            "embedding": embedding,
-        }
-    )
-# Apply transformation
-records_df = df.apply(prepare_record, axis=1)
-
-
-
-# Create tables and insert data
+# Create tables and insert data; large loads drop the DiskAnnIndex and build it once at the end
 vec.create_tables()
-vec.create_index()  # DiskAnnIndex
-vec.upsert(records_df)
-
-print(f"✅ {len(records_df)} documents inserted into the vector store")
+vec.create_text_search_index()  # french tsvector + GIN for hybrid search
+vec.create_metadata_indexes()  # typed, indexed columns for filtered search
+with vec.bulk_load():
+    counts = StreamingIngestor(vec).run(args.csv_path, resume=not args.restart)
+if not args.skip_lexical_index:
+    build_lexical_index(args.csv_path)  # in-process BM25 for lexical/hybrid search
+
+print(
+    f"✅ {counts['upserted']} documents inserted, {counts['unchanged']} unchanged, "
+    f"{counts['deleted']} deleted"
+)
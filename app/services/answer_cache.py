@@ -0,0 +1,359 @@
+"""
+answer_cache.py
+===================================================================
+Semantic cache of synthesized answers
+-------------------------------------------------------------------
+
+This module defines `SemanticAnswerCache`, which stores every synthesized
+answer under the embedding of its question, so a paraphrase of a question
+already answered is served without a vector search or an LLM call.
+
+Main responsibilities:
+- Match a new question to the nearest cached one by cosine similarity of
+  their embeddings (one matrix-vector product over the cached questions)
+  and return the stored `SynthesizedResponse` and context ids when the
+  similarity reaches a configurable threshold. Only answers retrieved with
+  the same search arguments (limit, metadata filter, predicates, time
+  range; see `search_scope`) are candidates.
+- Remember which documents every answer was built from, and drop the
+  answers that used a document when that document is re-ingested or
+  deleted (`invalidate`, called by the ingestion pipeline).
+- Bound the number of entries (least recently used first) and expire
+  entries after a time to live.
+- Persist entries in SQLite (WAL, see `SQLiteCache`), shared by the
+  serving processes and the ingestion job; each process keeps the question matrix in memory and
+  reloads it only when entries were added or removed. Hits do not write:
+  access times are kept in memory and flushed with the next `store`, which
+  is when least recently used entries are evicted.
+- Count hits and misses for the current process.
+
+`answer_question` wires the cache in front of `VectorStore.search` and
+`Synthesizer.generate_response`.
+
+Typical usage:
+--------------
+```python
+cache = SemanticAnswerCache(".cache/answers.sqlite", similarity_threshold=0.95)
+answer = answer_question(vec, "Quel est le droit sur les passagers ?", cache=cache)
+print(answer.cached, answer.response.answer, cache.stats())
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from app.config.settings import AnswerCacheSettings
+from app.database.embedding_cache import SQLiteCache
+from app.database.vector_store import VectorStore
+from app.services.synthesizer import SynthesizedResponse, Synthesizer
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class CachedAnswer(BaseModel):
+    """An answer with the ids of the documents it was built from."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    question: str
+    response: SynthesizedResponse
+    context_ids: List[str]
+    similarity: float = 1.0
+    cached: bool = False
+    # The search results given to the synthesizer (None for cached answers).
+    context: Optional[pd.DataFrame] = Field(default=None, exclude=True)
+
+
+def search_scope(limit: int, **search_kwargs: Any) -> str:
+    """Return a hash of the search arguments an answer was retrieved with."""
+    payload = json.dumps({"limit": limit, **search_kwargs}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class SemanticAnswerCache(SQLiteCache):
+    """A persistent answer cache looked up by question embedding."""
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        similarity_threshold: float = 0.95,
+        max_entries: int = 5000,
+        ttl_seconds: Optional[float] = None,
+    ):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: Location of the SQLite file; parent directories are created.
+            similarity_threshold: Minimum cosine similarity between a question
+                and a cached one for the cached answer to be returned.
+            max_entries: Maximum number of cached answers.
+            ttl_seconds: Lifetime of an entry; None disables expiry.
+        """
+        super().__init__(path)
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.evictions = 0
+        # In-memory copy of the question embeddings and search scopes,
+        # reloaded when entries are added or removed.
+        self._entry_ids = np.empty(0, dtype=np.int64)
+        self._scopes = np.empty(0, dtype=object)
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._loaded_version: Optional[Tuple[int, int]] = None
+        # Inserts and deletes through this connection (PRAGMA data_version
+        # only reflects the other connections' commits).
+        self._writes = 0
+        # Access times of hits, written with the next `store`.
+        self._pending_access: Dict[int, float] = {}
+
+    @classmethod
+    def from_settings(cls, settings: AnswerCacheSettings) -> "SemanticAnswerCache":
+        """Create the cache described by `settings`."""
+        return cls(
+            settings.path,
+            similarity_threshold=settings.similarity_threshold,
+            max_entries=settings.max_entries,
+            ttl_seconds=settings.ttl_seconds,
+        )
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS answers ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, question TEXT NOT NULL, "
+            "embedding BLOB NOT NULL, response TEXT NOT NULL, context_ids TEXT NOT NULL, "
+            "created_at REAL NOT NULL, last_access REAL NOT NULL, "
+            "scope TEXT NOT NULL DEFAULT '')"
+        )
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(answers)")}
+        if "scope" not in columns:
+            conn.execute("ALTER TABLE answers ADD COLUMN scope TEXT NOT NULL DEFAULT ''")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS answer_documents ("
+            "answer_id INTEGER NOT NULL, document_id TEXT NOT NULL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS answer_documents_document_id "
+            "ON answer_documents (document_id)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS answers_last_access ON answers (last_access)")
+        # data_version is per connection: reload the matrix from the new one.
+        self._loaded_version = None
+
+    def _refresh(self, conn: sqlite3.Connection) -> None:
+        """Reload the question matrix if this or another process changed the table."""
+        version = (conn.execute("PRAGMA data_version").fetchone()[0], self._writes)
+        if version == self._loaded_version:
+            return
+        rows = conn.execute("SELECT id, embedding, scope FROM answers ORDER BY id").fetchall()
+        self._entry_ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        self._scopes = np.array([row[2] for row in rows], dtype=object)
+        if rows:
+            self._matrix = np.stack([np.frombuffer(row[1], dtype=np.float32) for row in rows])
+        else:
+            self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._loaded_version = version
+
+    @staticmethod
+    def _normalize(embedding: np.ndarray) -> np.ndarray:
+        embedding = np.asarray(embedding, dtype=np.float32).ravel()
+        return embedding / max(float(np.linalg.norm(embedding)), np.finfo(np.float32).tiny)
+
+    def lookup(self, query_embedding: np.ndarray, scope: str = "") -> Optional[CachedAnswer]:
+        """
+        Return the cached answer of the most similar question, if similar enough.
+
+        Args:
+            query_embedding: The embedding of the new question.
+            scope: The `search_scope` of the new question; only answers stored
+                with the same scope match.
+
+        Returns:
+            The cached answer (`cached=True`, with its `similarity`), or None.
+        """
+        query = self._normalize(query_embedding)
+        with self._lock:
+            conn = self._connect()
+            self._refresh(conn)
+            if len(self._entry_ids) == 0 or self._matrix.shape[1] != len(query):
+                self.misses += 1
+                return None
+            similarities = np.where(self._scopes == scope, self._matrix @ query, -np.inf)
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+            entry_id = int(self._entry_ids[best])
+            row = None
+            if similarity >= self.similarity_threshold:
+                row = conn.execute(
+                    "SELECT question, response, context_ids, created_at FROM answers WHERE id = ?",
+                    (entry_id,),
+                ).fetchone()
+            now = time.time()
+            if row is not None and self.ttl_seconds is not None and now - row[3] > self.ttl_seconds:
+                self._delete(conn, [entry_id])
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._pending_access[entry_id] = now
+            self.hits += 1
+        return CachedAnswer(
+            question=row[0],
+            response=SynthesizedResponse.model_validate_json(row[1]),
+            context_ids=json.loads(row[2]),
+            similarity=similarity,
+            cached=True,
+        )
+
+    def store(
+        self,
+        question: str,
+        query_embedding: np.ndarray,
+        response: SynthesizedResponse,
+        context_ids: List[str],
+        scope: str = "",
+    ) -> None:
+        """
+        Cache the answer to `question`, evicting least recently used entries if full.
+
+        Args:
+            question: The question as asked.
+            query_embedding: Its embedding.
+            response: The synthesized answer.
+            context_ids: Ids of the documents given to the synthesizer.
+            scope: The `search_scope` of the search that retrieved them.
+        """
+        embedding = self._normalize(query_embedding)
+        context_ids = [str(id_) for id_ in context_ids]
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            try:
+                with self._transaction(conn):
+                    conn.executemany(
+                        "UPDATE answers SET last_access = ? WHERE id = ?",
+                        [(at, entry_id) for entry_id, at in self._pending_access.items()],
+                    )
+                    cursor = conn.execute(
+                        "INSERT INTO answers (question, embedding, response, context_ids, "
+                        "created_at, last_access, scope) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            question,
+                            embedding.tobytes(),
+                            response.model_dump_json(),
+                            json.dumps(context_ids),
+                            now,
+                            now,
+                            scope,
+                        ),
+                    )
+                    conn.executemany(
+                        "INSERT INTO answer_documents (answer_id, document_id) VALUES (?, ?)",
+                        [(cursor.lastrowid, id_) for id_ in dict.fromkeys(context_ids)],
+                    )
+                    stale = self._least_recently_used(conn, "answers", "id", self.max_entries)
+                    self._delete(conn, stale)
+                    self.evictions += len(stale)
+            finally:
+                self._writes += 1
+            self._pending_access.clear()
+
+    def _delete(self, conn: sqlite3.Connection, entry_ids: List[int]) -> None:
+        """Delete answers and their document links."""
+        self._writes += 1
+        for entry_id in entry_ids:
+            self._pending_access.pop(entry_id, None)
+        for placeholders, chunk in self._chunks(entry_ids):
+            conn.execute(f"DELETE FROM answer_documents WHERE answer_id IN ({placeholders})", chunk)
+            conn.execute(f"DELETE FROM answers WHERE id IN ({placeholders})", chunk)
+
+    def invalidate(self, document_ids: List[str]) -> int:
+        """
+        Drop every answer built from any of `document_ids`.
+
+        Args:
+            document_ids: Ids of re-ingested or deleted documents.
+
+        Returns:
+            The number of answers dropped.
+        """
+        document_ids = list(dict.fromkeys(str(id_) for id_ in document_ids))
+        with self._lock:
+            conn = self._connect()
+            with self._transaction(conn):
+                stale = set()
+                for placeholders, chunk in self._chunks(document_ids):
+                    stale.update(
+                        row[0]
+                        for row in conn.execute(
+                            "SELECT answer_id FROM answer_documents "
+                            f"WHERE document_id IN ({placeholders})",
+                            chunk,
+                        )
+                    )
+                self._delete(conn, sorted(stale))
+        if stale:
+            logging.info(f"Invalidated {len(stale)} cached answers")
+        return len(stale)
+
+    def clear(self) -> None:
+        """Remove every cached answer (statistics are kept)."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM answer_documents")
+            conn.execute("DELETE FROM answers")
+            self._writes += 1
+            self._pending_access.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters for this process and the number of entries."""
+        with self._lock:
+            entries = self._connect().execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        return {**self._counters(), "evictions": self.evictions, "entries": entries}
+
+
+def answer_question(
+    vec: VectorStore,
+    question: str,
+    cache: Optional[SemanticAnswerCache] = None,
+    limit: int = 5,
+    **search_kwargs: Any,
+) -> CachedAnswer:
+    """
+    Answer `question` from the cache, or by search and synthesis.
+
+    Answers the synthesizer flags as lacking context are not cached, so they
+    are retried once new documents are ingested.
+
+    Args:
+        vec: The vector store to search.
+        question: The user's question.
+        cache: The answer cache (None disables caching).
+        limit: Number of documents given to the synthesizer.
+        **search_kwargs: Extra arguments for `VectorStore.search` (filters...);
+            answers are only reused for the same `limit` and arguments.
+
+    Returns:
+        The answer and the ids of the documents it is based on (and, when it
+        was not cached, the search results).
+    """
+    query_embedding = vec.get_query_embedding(question)
+    scope = search_scope(limit, **search_kwargs)
+    if cache is not None:
+        cached = cache.lookup(query_embedding, scope)
+        if cached is not None:
+            return cached
+
+    results = vec.search(question, limit=limit, query_embedding=query_embedding, **search_kwargs)
+    response = Synthesizer.generate_response(question=question, context=results)
+    context_ids = [str(id_) for id_ in results["id"]]
+    if cache is not None and response.enough_context:
+        cache.store(question, query_embedding, response, context_ids, scope)
+    return CachedAnswer(
+        question=question, response=response, context_ids=context_ids, context=results
+    )
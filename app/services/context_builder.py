@@ -0,0 +1,161 @@
+"""
+context_builder.py
+===================================================================
+Token-budgeted context packing for the Synthesizer
+-------------------------------------------------------------------
+
+This module defines `ContextBuilder`, which turns the ranked chunks
+returned by a search into the compact context block sent to the LLM.
+
+Main responsibilities:
+- Clean every chunk: strip the CSV quote padding and markdown emphasis,
+  and collapse runs of spaces and blank lines.
+- Remove duplicates and overlapping chunks (a chunk contained in a
+  higher-ranked one, or sharing most of its word shingles with it),
+  keeping the higher-ranked copy.
+- Count tokens with the local tokenizer (`app.utils.tokens`) and keep
+  chunks in rank order until the prompt budget is spent, so the
+  lowest-ranked chunks are dropped first; the first chunk that does not
+  fit is truncated to the remaining budget when enough of it is left.
+- Serialize the kept chunks as numbered plain-text blocks (`[1] ...`),
+  which costs far fewer tokens than indented JSON with escaped accents.
+
+Typical usage:
+--------------
+```python
+builder = ContextBuilder()
+packed = builder.build(results)  # results: DataFrame from VectorStore.search
+print(packed.tokens, packed.dropped)
+messages.append({"role": "assistant", "content": packed.text})
+"""
+
+import hashlib
+import logging
+import re
+from typing import List, Optional, Set
+
+import pandas as pd
+from app.config.settings import ContextSettings, get_settings
+from app.utils.tokens import count_tokens, truncate_to_tokens
+from pydantic import BaseModel
+
+# Shingle size (in words) used to detect overlapping chunks.
+SHINGLE_SIZE = 5
+
+_EMPHASIS = re.compile(r"\*\*|^#+\s*", re.MULTILINE)
+_SPACES = re.compile(r"[ \t\u00a0]+")
+_BLANK_LINES = re.compile(r"\s*\n\s*")
+
+
+def clean_chunk(text: str) -> str:
+    """Strip quote padding, markdown emphasis and redundant whitespace from a chunk."""
+    text = str(text).strip().strip('"').strip()
+    text = _EMPHASIS.sub("", text)
+    text = _SPACES.sub(" ", text)
+    return _BLANK_LINES.sub("\n", text).strip()
+
+
+def _shingles(text: str) -> Set[str]:
+    """Return the word `SHINGLE_SIZE`-grams of a cleaned chunk (lowercased)."""
+    words = text.lower().split()
+    if len(words) <= SHINGLE_SIZE:
+        return {" ".join(words)}
+    return {" ".join(words[i : i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+class PackedContext(BaseModel):
+    """The serialized context and what was kept of the search results."""
+
+    text: str
+    ids: List[str]
+    tokens: int
+    original_tokens: int
+    duplicates: int
+    dropped: int
+
+
+class ContextBuilder:
+    """Build a deduplicated, token-budgeted context from ranked search results."""
+
+    def __init__(self, settings: Optional[ContextSettings] = None):
+        self.settings = settings or get_settings().context
+
+    def _deduplicate(self, chunks: List[str]) -> List[int]:
+        """Return the indices of the chunks to keep, in rank order."""
+        kept: List[int] = []
+        kept_shingles: List[Set[str]] = []
+        seen_hashes = set()
+        for i, chunk in enumerate(chunks):
+            if not chunk:
+                continue
+            digest = hashlib.sha256(" ".join(chunk.lower().split()).encode("utf-8")).digest()
+            if digest in seen_hashes:
+                continue
+            shingles = _shingles(chunk)
+            overlapping = any(
+                chunk in chunks[j]
+                or len(shingles & other) / len(shingles) >= self.settings.overlap_threshold
+                for j, other in zip(kept, kept_shingles)
+            )
+            if overlapping:
+                continue
+            seen_hashes.add(digest)
+            kept.append(i)
+            kept_shingles.append(shingles)
+        return kept
+
+    def build(
+        self, context: pd.DataFrame, max_tokens: Optional[int] = None
+    ) -> PackedContext:
+        """
+        Pack ranked search results into a context block within the token budget.
+
+        Args:
+            context: Search results, best first, with a `content` column (and
+                optionally `id`).
+            max_tokens: Token budget of the context (default:
+                `ContextSettings.max_tokens`).
+
+        Returns:
+            The serialized context and statistics on what was kept.
+        """
+        max_tokens = max_tokens or self.settings.max_tokens
+        model = self.settings.tokenizer_model
+        raw = [str(content) for content in context.get("content", pd.Series(dtype=str))]
+        ids = [str(id_) for id_ in context["id"]] if "id" in context else [""] * len(raw)
+        original_tokens = sum(count_tokens(text, model) for text in raw)
+
+        chunks = [clean_chunk(text) for text in raw]
+        kept = self._deduplicate(chunks)
+
+        blocks: List[str] = []
+        kept_ids: List[str] = []
+        used = 0
+        for i in kept:
+            block = f"[{len(blocks) + 1}] {chunks[i]}"
+            # Blocks are joined by a blank line, about one token.
+            block_tokens = count_tokens(block, model) + (1 if blocks else 0)
+            if used + block_tokens > max_tokens:
+                remaining = max_tokens - used - (1 if blocks else 0)
+                if remaining >= self.settings.min_chunk_tokens:
+                    blocks.append(truncate_to_tokens(block, remaining, model))
+                    kept_ids.append(ids[i])
+                break
+            blocks.append(block)
+            kept_ids.append(ids[i])
+            used += block_tokens
+
+        text = "\n\n".join(blocks)
+        packed = PackedContext(
+            text=text,
+            ids=kept_ids,
+            tokens=count_tokens(text, model) if text else 0,
+            original_tokens=original_tokens,
+            duplicates=len(chunks) - len(kept),
+            dropped=len(kept) - len(blocks),
+        )
+        logging.info(
+            f"Packed {len(blocks)} of {len(chunks)} chunks into {packed.tokens} tokens "
+            f"(from {original_tokens}; {packed.duplicates} duplicates, {packed.dropped} dropped)"
+        )
+        return packed
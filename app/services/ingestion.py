@@ -0,0 +1,413 @@
+"""
+ingestion.py
+===================================================================
+Streaming, resumable ingestion into the vector store
+-------------------------------------------------------------------
+
+This module defines `StreamingIngestor`, which loads a `;`-separated CSV
+(`doc_id;content;metadata`) into `VectorStore` without ever holding the
+whole corpus in memory.
+
+Main responsibilities:
+- Read the CSV in chunks and run parse → embed → upsert as three stages
+  connected by bounded queues, so peak memory depends on the chunk size and
+  queue depth, not on the corpus size.
+- Write a checkpoint (number of committed rows) after every upserted batch,
+  atomically, and resume from it after a crash.
+- Stop every stage and re-raise the original error as soon as one fails.
+- Give every record a deterministic id derived from its `doc_id` and a hash
+  of its content, whose time component is the document's date (so time
+  partitions and `time_range` filters follow the legislation's dates), and
+  diff the source against the stored ids: unchanged
+  rows are neither embedded nor upserted, and rows of the same source file
+  (`source_file` metadata key) that disappeared from it (or whose content
+  changed) are deleted at the end of the run, so ingesting several CSVs
+  into one table never deletes the records of the others.
+- Drop the cached answers and responses built from records that were
+  re-ingested or deleted (`SemanticAnswerCache.invalidate`,
+  `ResponseCache.invalidate`).
+- Build the in-process BM25 index over the same records and ids
+  (`build_lexical_index`), for `VectorStore.lexical_search` and BM25-based
+  hybrid search.
+
+Typical usage:
+--------------
+```python
+ingestor = StreamingIngestor(VectorStore())
+ingestor.run("../data/rag_dataset.csv", resume=True)
+build_lexical_index("../data/rag_dataset.csv")
+"""
+
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+import pandas as pd
+from app.config.settings import get_settings
+from app.database.bm25_index import BM25Index
+from app.database.embedding_cache import normalize_text
+from app.database.vector_store import VectorStore
+from app.services.answer_cache import SemanticAnswerCache
+from app.services.response_cache import ResponseCache
+from timescale_vector.client import uuid_from_time
+
+# Marks the end of a stage's output.
+_DONE = object()
+
+# Time component of the ids of records without a document date (UUID v1
+# needs one): a sentinel older than any document of the corpus, so undated
+# records fall outside every plausible `time_range` and sit in their own
+# time partition instead of sharing one with real documents. Must be
+# timezone-aware: uuid_from_time reads naive datetimes as local time.
+RECORD_TIME = datetime(1900, 1, 1, tzinfo=timezone.utc)
+
+
+def content_hash(content: str) -> str:
+    """Return the SHA-256 hex digest of the normalized content."""
+    return hashlib.sha256(normalize_text(content).encode("utf-8")).hexdigest()
+
+
+def document_time(metadata: Dict[str, Any], date_keys: Sequence[str]) -> datetime:
+    """
+    Return the time to encode in a record's id: the document's date.
+
+    The first of `date_keys` holding an ISO date (`YYYY-MM-DD`, possibly
+    followed by a time, which is ignored) gives midnight UTC of that day.
+    Records without a usable date fall back to `RECORD_TIME` (1900-01-01),
+    so they are only returned by time ranges reaching back to it.
+    """
+    for key in date_keys:
+        value = metadata.get(key)
+        if not isinstance(value, str):
+            continue
+        try:
+            day = date.fromisoformat(value.strip()[:10])
+        except ValueError:
+            continue
+        return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+    return RECORD_TIME
+
+
+def record_id(doc_id: str, content: str, time: datetime = RECORD_TIME) -> str:
+    """
+    Derive a stable record id from a document id, its content and its date.
+
+    The id is a time-based UUID (as Timescale Vector expects) whose time is
+    `time` and whose node and clock sequence come from a hash of `doc_id`
+    and the content hash, so the same chunk always maps to the same id and
+    any content (or date) change yields a new one.
+
+    Args:
+        doc_id: The chunk's identifier in the source CSV.
+        content: The chunk's text.
+        time: The timezone-aware time component (see `document_time`).
+
+    Returns:
+        The record id as a string.
+    """
+    digest = hashlib.sha256(
+        f"{doc_id}\x00{content_hash(content)}".encode("utf-8")
+    ).digest()
+    node = int.from_bytes(digest[:6], "big")
+    clock_seq = int.from_bytes(digest[6:8], "big") & 0x3FFF
+    return str(uuid_from_time(time, node=node, clock_seq=clock_seq))
+
+
+def chunk_record_ids(chunk: pd.DataFrame, date_keys: Sequence[str]) -> List[str]:
+    """Return the record ids of the rows of a CSV chunk."""
+    metadata = chunk["metadata"] if "metadata" in chunk else [None] * len(chunk)
+    return [
+        record_id(str(doc_id), str(content), document_time(parse_metadata(raw), date_keys))
+        for doc_id, content, raw in zip(chunk["doc_id"], chunk["content"], metadata)
+    ]
+
+
+def parse_metadata(metadata: Any) -> Dict[str, Any]:
+    """Parse the CSV metadata column, keeping unparsable values under `raw`."""
+    if isinstance(metadata, str):
+        try:
+            return json.loads(metadata)
+        except Exception:
+            return {"raw": metadata}
+    if isinstance(metadata, dict):
+        return metadata
+    return {}
+
+
+def build_lexical_index(
+    csv_path: Union[str, Path],
+    directory: Optional[Union[str, Path]] = None,
+    chunk_size: Optional[int] = None,
+) -> BM25Index:
+    """
+    Build and save the BM25 index of a CSV corpus, keyed by record id.
+
+    Args:
+        csv_path: The `;`-separated CSV with `doc_id` and `content` columns.
+        directory: Where to save the index
+            (default: `VectorStoreSettings.bm25_index_path`).
+        chunk_size: Rows read at a time (default: `IngestionSettings.chunk_size`).
+            Ids are derived as during ingestion (`IngestionSettings.document_date_keys`).
+
+    Returns:
+        The built index.
+    """
+    settings = get_settings()
+    directory = directory or settings.vector_store.bm25_index_path
+    start_time = time.time()
+    ids: Dict[str, str] = {}
+    for chunk in pd.read_csv(
+        csv_path, sep=";", chunksize=chunk_size or settings.ingestion.chunk_size
+    ):
+        chunk_ids = chunk_record_ids(chunk, settings.ingestion.document_date_keys)
+        for id_, content in zip(chunk_ids, chunk["content"]):
+            ids.setdefault(id_, str(content))
+    index = BM25Index.build(list(ids), list(ids.values()))
+    index.save(directory)
+    logging.info(
+        f"Built BM25 index of {len(index)} documents in {time.time() - start_time:.3f} seconds"
+    )
+    return index
+
+
+class StreamingIngestor:
+    """Stream a CSV corpus into a VectorStore with checkpointing."""
+
+    def __init__(self, vector_store: VectorStore):
+        self.vec = vector_store
+        self.settings = vector_store.settings.ingestion
+        answer_cache_settings = vector_store.settings.answer_cache
+        self.answer_cache = (
+            SemanticAnswerCache.from_settings(answer_cache_settings)
+            if answer_cache_settings.enabled
+            else None
+        )
+        response_cache_settings = vector_store.settings.response_cache
+        self.response_cache = (
+            ResponseCache.from_settings(response_cache_settings)
+            if response_cache_settings.enabled
+            else None
+        )
+
+    def checkpoint_path(self, csv_path: Path) -> Path:
+        """Return where the checkpoint for `csv_path` is stored."""
+        return Path(self.settings.checkpoint_dir) / f"{csv_path.stem}.checkpoint.json"
+
+    def _load_checkpoint(self, csv_path: Path) -> int:
+        """Return the number of rows already committed for `csv_path`."""
+        path = self.checkpoint_path(csv_path)
+        if not path.exists():
+            return 0
+        checkpoint = json.loads(path.read_text(encoding="utf-8"))
+        if checkpoint.get("source_size") != csv_path.stat().st_size:
+            logging.warning(f"{csv_path} changed since the last checkpoint, starting over")
+            return 0
+        return int(checkpoint["rows_committed"])
+
+    def _save_checkpoint(self, csv_path: Path, rows_committed: int) -> None:
+        """Atomically record that the first `rows_committed` rows are stored."""
+        path = self.checkpoint_path(csv_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps(
+                {
+                    "source": str(csv_path.resolve()),
+                    "source_size": csv_path.stat().st_size,
+                    "rows_committed": rows_committed,
+                    "updated_at": datetime.now().isoformat(),
+                }
+            ),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, path)
+
+    def _read_chunks(
+        self, csv_path: Path, skip_rows: int, stored_ids: Set[str], seen_ids: Set[str]
+    ) -> Iterator[Tuple[pd.DataFrame, int]]:
+        """
+        Yield (chunk, end_row) pairs holding the rows that need to be stored.
+
+        Every row's id is added to `seen_ids`; rows before `skip_rows`, rows
+        already in `stored_ids` and duplicates are filtered out of the chunk.
+        """
+        end_row = 0
+        for chunk in pd.read_csv(csv_path, sep=";", chunksize=self.settings.chunk_size):
+            start_row, end_row = end_row, end_row + len(chunk)
+            ids = chunk_record_ids(chunk, self.settings.document_date_keys)
+            keep = []
+            for offset, id_ in enumerate(ids):
+                is_new = id_ not in seen_ids and id_ not in stored_ids
+                keep.append(is_new and start_row + offset >= skip_rows)
+                seen_ids.add(id_)
+            chunk = chunk.assign(id=ids)[keep]
+            if end_row > skip_rows:
+                yield chunk, end_row
+
+    def _prepare_records(self, chunk: pd.DataFrame, source_file: str) -> pd.DataFrame:
+        """Parse and embed one chunk into the records expected by `VectorStore.upsert`."""
+        contents = chunk["content"].tolist()
+        metadata = []
+        for doc_id, content, raw in zip(chunk["doc_id"], contents, chunk["metadata"]):
+            meta = parse_metadata(raw)
+            meta["source_file"] = source_file
+            meta["source_id"] = str(doc_id)
+            meta["content_hash"] = content_hash(content)
+            metadata.append(meta)
+        embeddings = self.vec.get_embeddings(contents, concurrent=self.settings.concurrent)
+        return pd.DataFrame(
+            {
+                "id": chunk["id"].tolist(),
+                "metadata": metadata,
+                "contents": contents,
+                "embedding": list(embeddings),
+            }
+        )
+
+    def run(
+        self, csv_path: Union[str, Path], resume: bool = True, delete_removed: bool = True
+    ) -> Dict[str, int]:
+        """
+        Ingest `csv_path`, resuming from its checkpoint when `resume` is True.
+
+        Only rows whose (doc_id, content) pair is not stored yet are embedded
+        and upserted.
+
+        Args:
+            csv_path: The `;`-separated CSV with `doc_id`, `content` and
+                `metadata` columns.
+            resume: Continue after the last committed batch instead of
+                starting from the first row.
+            delete_removed: After a complete pass, delete the records stored
+                from this file (same `source_file`, the CSV's name) whose id no
+                longer appears in it (removed or changed chunks). Records of
+                other files, and records stored before they were tagged with
+                their `source_file`, are never deleted.
+
+        Returns:
+            Counts of "upserted", "unchanged" and "deleted" records.
+        """
+        csv_path = Path(csv_path)
+        skip_rows = self._load_checkpoint(csv_path) if resume else 0
+        if skip_rows:
+            logging.info(f"Resuming {csv_path} after {skip_rows} committed rows")
+        stored_ids = self.vec.fetch_ids()
+        seen_ids: Set[str] = set()
+
+        stop = threading.Event()
+        errors: list = []
+        parsed: queue.Queue = queue.Queue(maxsize=self.settings.queue_size)
+        embedded: queue.Queue = queue.Queue(maxsize=self.settings.queue_size)
+
+        def put(q: queue.Queue, item: Any) -> bool:
+            """Put `item` on `q` unless the pipeline is stopping."""
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def read_stage() -> None:
+            try:
+                for item in self._read_chunks(csv_path, skip_rows, stored_ids, seen_ids):
+                    if not put(parsed, item):
+                        return
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+            finally:
+                put(parsed, _DONE)
+
+        def embed_stage() -> None:
+            try:
+                while True:
+                    item = self._next(parsed, stop)
+                    if item is _DONE or item is None:
+                        break
+                    chunk, end_row = item
+                    records = (
+                        self._prepare_records(chunk, csv_path.name) if len(chunk) else chunk
+                    )
+                    if not put(embedded, (records, end_row)):
+                        return
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+            finally:
+                put(embedded, _DONE)
+
+        workers = [
+            threading.Thread(target=read_stage, name="ingest-read", daemon=True),
+            threading.Thread(target=embed_stage, name="ingest-embed", daemon=True),
+        ]
+        for worker in workers:
+            worker.start()
+
+        start_time = time.time()
+        rows_upserted = 0
+        try:
+            while True:
+                item = self._next(embedded, stop)
+                if item is _DONE or item is None:
+                    break
+                records, end_row = item
+                if len(records):
+                    self.vec.upsert(records, bulk=True)
+                    self._invalidate_caches(records["id"].tolist())
+                self._save_checkpoint(csv_path, end_row)
+                rows_upserted += len(records)
+                logging.info(f"Committed rows up to {end_row} of {csv_path.name}")
+        except BaseException:
+            stop.set()
+            raise
+        finally:
+            for worker in workers:
+                worker.join(timeout=5)
+
+        if errors:
+            raise errors[0]
+
+        deleted = 0
+        if delete_removed:
+            source_ids = self.vec.fetch_ids({"source_file": csv_path.name})
+            stale_ids = list(source_ids - seen_ids)
+            if stale_ids:
+                self.vec.delete(ids=stale_ids)
+                self._invalidate_caches(stale_ids)
+            deleted = len(stale_ids)
+        # A complete pass makes the checkpoint obsolete.
+        self.checkpoint_path(csv_path).unlink(missing_ok=True)
+
+        elapsed_time = time.time() - start_time
+        counts = {
+            "upserted": rows_upserted,
+            "unchanged": len(seen_ids & stored_ids),
+            "deleted": deleted,
+        }
+        logging.info(f"Ingested {csv_path.name} in {elapsed_time:.3f} seconds: {counts}")
+        return counts
+
+    def _invalidate_caches(self, ids: List[str]) -> None:
+        """Drop the cached answers and responses built from records `ids`."""
+        for cache in (self.answer_cache, self.response_cache):
+            if cache is not None:
+                cache.invalidate(ids)
+
+    @staticmethod
+    def _next(q: queue.Queue, stop: threading.Event) -> Optional[Any]:
+        """Return the next item of `q`, or None once the pipeline is stopping."""
+        while True:
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                if stop.is_set():
+                    return None
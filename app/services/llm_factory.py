@@ -1,11 +1,121 @@
-from typing import Any, Dict, List, Type
+import asyncio
+import json
+import logging
+import threading
+import time
+import weakref
+from typing import Any, Dict, Iterator, List, Optional, Type
 
 import instructor
-from anthropic import Anthropic
-from openai import OpenAI
+from anthropic import Anthropic, AsyncAnthropic
+from openai import AsyncOpenAI, OpenAI
 from pydantic import BaseModel
 
 from app.config.settings import get_settings
+from app.utils.tokens import count_tokens
+from app.services.local_llm import AsyncLocalLLMClient, LocalLLMClient
+
+_CLIENT_INITIALIZERS = {
+    "openai": lambda s: instructor.from_openai(OpenAI(api_key=s.api_key)),
+    "anthropic": lambda s: instructor.from_anthropic(Anthropic(api_key=s.api_key)),
+    "llama": lambda s: instructor.from_openai(
+        OpenAI(base_url=s.base_url, api_key=s.api_key),
+        mode=instructor.Mode.JSON,
+    ),
+    "local": LocalLLMClient.from_settings,
+}
+
+_ASYNC_CLIENT_INITIALIZERS = {
+    "openai": lambda s: instructor.from_openai(AsyncOpenAI(api_key=s.api_key)),
+    "anthropic": lambda s: instructor.from_anthropic(AsyncAnthropic(api_key=s.api_key)),
+    "llama": lambda s: instructor.from_openai(
+        AsyncOpenAI(base_url=s.base_url, api_key=s.api_key),
+        mode=instructor.Mode.JSON,
+    ),
+    "local": AsyncLocalLLMClient.from_settings,
+}
+
+# Process-wide clients, so every LLMFactory of a provider shares one
+# HTTP connection pool (keep-alive connections, no TLS handshake per call).
+# Async clients are bound to the event loop they were created in.
+_clients: Dict[str, Any] = {}
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, Any]]" = (
+    weakref.WeakKeyDictionary()
+)
+_clients_lock = threading.Lock()
+
+# Shortest prompt prefix (tokens) each provider caches: OpenAI caches prompts
+# from 1024 tokens; Anthropic ignores cache breakpoints before 1024 tokens
+# (2048 on Haiku models).
+PROMPT_CACHE_MIN_TOKENS = {"openai": 1024, "anthropic": 1024}
+# (provider, prefix tokens) pairs already reported as too short to cache.
+_uncached_prefixes: set = set()
+
+
+def get_client(provider: str) -> Any:
+    """Return the shared instructor client of `provider`, creating it on first use."""
+    with _clients_lock:
+        if provider not in _clients:
+            if provider not in _CLIENT_INITIALIZERS:
+                raise ValueError(f"Unsupported LLM provider: {provider}")
+            _clients[provider] = _CLIENT_INITIALIZERS[provider](getattr(get_settings(), provider))
+        return _clients[provider]
+
+
+def get_async_client(provider: str) -> Any:
+    """Return the shared async instructor client of `provider` for the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        clients = _async_clients.setdefault(loop, {})
+        if provider not in clients:
+            if provider not in _ASYNC_CLIENT_INITIALIZERS:
+                raise ValueError(f"Unsupported LLM provider: {provider}")
+            clients[provider] = _ASYNC_CLIENT_INITIALIZERS[provider](
+                getattr(get_settings(), provider)
+            )
+        return clients[provider]
+
+
+class CompletionUsage(BaseModel):
+    """Token usage of a completion, as reported by the provider."""
+
+    prompt_tokens: int = 0
+    # Prompt tokens served from the provider's prompt cache, and (anthropic)
+    # written to it.
+    cached_tokens: int = 0
+    cache_write_tokens: int = 0
+    completion_tokens: int = 0
+
+    @classmethod
+    def from_completion(cls, completion: Any) -> "CompletionUsage":
+        """Read the usage of a raw OpenAI or Anthropic completion."""
+        usage = getattr(completion, "usage", None)
+        if usage is None:
+            return cls()
+        if hasattr(usage, "input_tokens"):
+            # Anthropic counts cached prompt tokens apart from input_tokens.
+            cached = getattr(usage, "cache_read_input_tokens", None) or 0
+            written = getattr(usage, "cache_creation_input_tokens", None) or 0
+            return cls(
+                prompt_tokens=usage.input_tokens + cached + written,
+                cached_tokens=cached,
+                cache_write_tokens=written,
+                completion_tokens=usage.output_tokens,
+            )
+        details = getattr(usage, "prompt_tokens_details", None)
+        return cls(
+            prompt_tokens=usage.prompt_tokens or 0,
+            cached_tokens=getattr(details, "cached_tokens", None) or 0,
+            completion_tokens=usage.completion_tokens or 0,
+        )
+
+
+class CompletionTiming(BaseModel):
+    """Latency of a streamed completion, in seconds."""
+
+    # Until the first partial object, i.e. the first parseable tokens.
+    time_to_first_token: Optional[float] = None
+    total: float = 0.0
 
 
 class LLMFactory:
@@ -13,33 +123,182 @@ class LLMFactory:
         self.provider = provider
         self.settings = getattr(get_settings(), provider)
         self.client = self._initialize_client()
+        # Timing of the last completed `create_completion_stream` call.
+        self.last_timing: Optional[CompletionTiming] = None
+        # Token usage of the last `create_completion(_async)` call.
+        self.last_usage: Optional[CompletionUsage] = None
 
     def _initialize_client(self) -> Any:
-        client_initializers = {
-            "openai": lambda s: instructor.from_openai(OpenAI(api_key=s.api_key)),
-            "anthropic": lambda s: instructor.from_anthropic(
-                Anthropic(api_key=s.api_key)
-            ),
-            "llama": lambda s: instructor.from_openai(
-                OpenAI(base_url=s.base_url, api_key=s.api_key),
-                mode=instructor.Mode.JSON,
-            ),
-        }
+        return get_client(self.provider)
 
-        initializer = client_initializers.get(self.provider)
-        if initializer:
-            return initializer(self.settings)
-        raise ValueError(f"Unsupported LLM provider: {self.provider}")
+    def _arrange_messages(
+        self, messages: List[Dict[str, Any]], response_model: Optional[Type[BaseModel]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Order messages so that every request starts with the same prefix.
 
-    def create_completion(
+        System messages (the static instructions) are moved ahead of the
+        others, keeping their order and content untouched, so providers can
+        reuse the cached prefill of that prefix. For anthropic, which only
+        caches up to explicit breakpoints, the last system block is marked
+        with `cache_control`.
+
+        Providers only cache prefixes of at least `PROMPT_CACHE_MIN_TOKENS`
+        tokens. The static prefix (system messages and response schema) is
+        measured, and when it is shorter nothing can be cached: no
+        breakpoint is added and this is logged once. The Synthesizer's
+        prefix (about 800 tokens) is below that minimum, so its requests
+        get no cache reads until the instructions grow.
+        """
+        system = [message for message in messages if message["role"] == "system"]
+        others = [message for message in messages if message["role"] != "system"]
+        if system and not self._prefix_cacheable(system, response_model):
+            return system + others
+        if self.provider == "anthropic" and system:
+            content = system[-1]["content"]
+            blocks = content if isinstance(content, list) else [{"type": "text", "text": content}]
+            blocks = blocks[:-1] + [{**blocks[-1], "cache_control": {"type": "ephemeral"}}]
+            system[-1] = {**system[-1], "content": blocks}
+        return system + others
+
+    def _prefix_cacheable(
+        self, system: List[Dict[str, Any]], response_model: Optional[Type[BaseModel]]
+    ) -> bool:
+        """Whether the static prefix reaches the provider's prompt caching minimum."""
+        minimum = PROMPT_CACHE_MIN_TOKENS.get(self.provider)
+        if minimum is None:
+            return True
+        prefix = [json.dumps(message["content"], ensure_ascii=False) for message in system]
+        if response_model is not None:
+            prefix.append(json.dumps(response_model.model_json_schema(), ensure_ascii=False))
+        tokens = count_tokens("\n".join(prefix), "gpt-4o")
+        if tokens >= minimum:
+            return True
+        if (self.provider, tokens) not in _uncached_prefixes:
+            _uncached_prefixes.add((self.provider, tokens))
+            logging.info(
+                f"{self.provider} prompt prefix of about {tokens} tokens is below the "
+                f"{minimum}-token caching minimum; it will not be cached"
+            )
+        return False
+
+    def _record_usage(self, completion: Any) -> None:
+        """Keep and log the token usage of a raw completion."""
+        usage = CompletionUsage.from_completion(completion)
+        self.last_usage = usage
+        logging.info(
+            f"{self.provider} completion: {usage.prompt_tokens} prompt tokens "
+            f"({usage.cached_tokens} cached, {usage.cache_write_tokens} written to cache), "
+            f"{usage.completion_tokens} completion tokens"
+        )
+
+    def _completion_params(
         self, response_model: Type[BaseModel], messages: List[Dict[str, str]], **kwargs
-    ) -> Any:
-        completion_params = {
+    ) -> Dict[str, Any]:
+        return {
             "model": kwargs.get("model", self.settings.default_model),
             "temperature": kwargs.get("temperature", self.settings.temperature),
             "max_retries": kwargs.get("max_retries", self.settings.max_retries),
             "max_tokens": kwargs.get("max_tokens", self.settings.max_tokens),
             "response_model": response_model,
-            "messages": messages,
+            "messages": self._arrange_messages(messages, response_model),
         }
-        return self.client.chat.completions.create(**completion_params)
+
+    def create_completion(
+        self, response_model: Type[BaseModel], messages: List[Dict[str, str]], **kwargs
+    ) -> Any:
+        completion_params = self._completion_params(response_model, messages, **kwargs)
+        response, completion = self.client.chat.completions.create_with_completion(
+            **completion_params
+        )
+        self._record_usage(completion)
+        return response
+
+    async def create_completion_async(
+        self, response_model: Type[BaseModel], messages: List[Dict[str, str]], **kwargs
+    ) -> Any:
+        """Async `create_completion`, on the provider's shared async client."""
+        completion_params = self._completion_params(response_model, messages, **kwargs)
+        client = get_async_client(self.provider)
+        response, completion = await client.chat.completions.create_with_completion(
+            **completion_params
+        )
+        self._record_usage(completion)
+        return response
+
+    async def create_completions_batch(
+        self,
+        response_model: Type[BaseModel],
+        messages_list: List[List[Dict[str, str]]],
+        max_concurrency: Optional[int] = None,
+        return_exceptions: bool = False,
+        **kwargs,
+    ) -> List[Any]:
+        """
+        Run many structured completions concurrently.
+
+        At most `max_concurrency` requests are in flight at once, all on the
+        provider's shared connection pool.
+
+        Args:
+            response_model: The pydantic model to generate.
+            messages_list: One list of chat messages per completion.
+            max_concurrency: Requests in flight (default: `LLMSettings.max_concurrency`).
+            return_exceptions: Return failures in place of their result
+                instead of raising the first one.
+            **kwargs: Overrides of the model, temperature, max_retries and max_tokens.
+
+        Returns:
+            The completions, in the order of `messages_list`.
+        """
+        slots = asyncio.Semaphore(max_concurrency or self.settings.max_concurrency)
+
+        async def complete(messages: List[Dict[str, str]]) -> Any:
+            async with slots:
+                return await self.create_completion_async(response_model, messages, **kwargs)
+
+        start_time = time.perf_counter()
+        results = await asyncio.gather(
+            *(complete(messages) for messages in messages_list),
+            return_exceptions=return_exceptions,
+        )
+        logging.info(
+            f"{len(messages_list)} {self.provider} completions in "
+            f"{time.perf_counter() - start_time:.3f} seconds"
+        )
+        return results
+
+    def create_completion_stream(
+        self, response_model: Type[BaseModel], messages: List[Dict[str, str]], **kwargs
+    ) -> Iterator[Any]:
+        """
+        Stream a structured completion as partial `response_model` objects.
+
+        Every yielded object has the fields parsed so far (the others are
+        None, and the last string field may be cut mid-word); the last one
+        is complete. Time to first token and total latency are logged and
+        kept in `last_timing` once the stream is exhausted.
+
+        Args:
+            response_model: The pydantic model to generate.
+            messages: The chat messages.
+            **kwargs: Overrides of the model, temperature, max_retries and max_tokens.
+        """
+        completion_params = self._completion_params(response_model, messages, **kwargs)
+        start_time = time.perf_counter()
+        timing = CompletionTiming()
+        for partial in self.client.chat.completions.create_partial(**completion_params):
+            if timing.time_to_first_token is None:
+                timing.time_to_first_token = time.perf_counter() - start_time
+            yield partial
+        timing.total = time.perf_counter() - start_time
+        self.last_timing = timing
+        first_token = (
+            f"{timing.time_to_first_token:.3f}"
+            if timing.time_to_first_token is not None
+            else "n/a"
+        )
+        logging.info(
+            f"Streamed {self.provider} completion: first token after {first_token} seconds, "
+            f"total {timing.total:.3f} seconds"
+        )
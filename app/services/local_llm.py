@@ -0,0 +1,210 @@
+"""
+local_llm.py
+===================================================================
+Deterministic offline stand-in for the structured-completion clients
+-------------------------------------------------------------------
+
+This module defines `LocalLLMClient` and `AsyncLocalLLMClient`, which
+expose the part of the instructor client interface used by `LLMFactory`
+(`chat.completions.create`, `create_with_completion` and
+`create_partial`) and return canned structured responses, so synthesis
+can be benchmarked or load-tested without network access or API spend.
+
+Main responsibilities:
+- Build a valid instance of any pydantic `response_model` from its field
+  types: strings are filled from the last non-system message (the
+  retrieved context for the Synthesizer), lists of strings with its first
+  sentences, booleans with whether that message has content, numbers
+  with 0. The same messages always give the same response.
+- Simulate the provider latency: a time to first token, then generation
+  at `tokens_per_second` over the response's estimated token count.
+- Report token usage shaped like the OpenAI SDK one, so
+  `CompletionUsage` and `LLMFactory` logging work unchanged.
+
+Selected with `LLM_PROVIDER=local` (see `ProviderSettings`), or with
+`LLMFactory("local")`.
+
+Typical usage:
+--------------
+```python
+llm = LLMFactory("local")
+response = llm.create_completion(response_model=SynthesizedResponse, messages=messages)
+"""
+
+import asyncio
+import json
+import re
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Tuple, Type, Union, get_args, get_origin
+
+from app.config.settings import LocalSettings
+from app.utils.tokens import count_tokens
+from pydantic import BaseModel
+
+# Tokenizer used to estimate prompt and completion sizes.
+TOKENIZER_MODEL = "gpt-4o"
+# Words per streamed partial response.
+STREAM_CHUNK_WORDS = 8
+
+_SENTENCES = re.compile(r"(?<=[.!?;:])\s+|\n+")
+
+
+def _source_text(messages: List[Dict[str, Any]]) -> str:
+    """Return the content of the last non-system message, as plain text."""
+    for message in reversed(messages):
+        if message["role"] == "system":
+            continue
+        content = message["content"]
+        if isinstance(content, list):
+            content = " ".join(block.get("text", "") for block in content)
+        return str(content)
+    return ""
+
+
+def _canned_value(annotation: Any, sentences: List[str]) -> Any:
+    """Return a value of type `annotation` built from `sentences`."""
+    origin = get_origin(annotation)
+    if origin is Union:
+        options = [arg for arg in get_args(annotation) if arg is not type(None)]
+        return _canned_value(options[0], sentences) if options else None
+    if origin in (list, List):
+        (item,) = get_args(annotation) or (str,)
+        if item is str:
+            return sentences[:3]
+        return [_canned_value(item, sentences)]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return canned_response(annotation, sentences)
+    if annotation is bool:
+        return bool(sentences)
+    if annotation in (int, float):
+        return annotation(0)
+    return " ".join(sentences[:2])
+
+
+def canned_response(response_model: Type[BaseModel], sentences: List[str]) -> BaseModel:
+    """Return a valid `response_model` whose fields are filled from `sentences`."""
+    return response_model.model_validate(
+        {
+            name: _canned_value(field.annotation, sentences)
+            for name, field in response_model.model_fields.items()
+        }
+    )
+
+
+class _Completions:
+    def __init__(self, owner: "LocalLLMClient"):
+        self._owner = owner
+
+    def _generate(
+        self, response_model: Type[BaseModel], messages: List[Dict[str, Any]]
+    ) -> Tuple[BaseModel, SimpleNamespace, float]:
+        """Return the response, its raw completion and the simulated generation time."""
+        source = _source_text(messages)
+        # Markdown headings ("# Informations extraites :") are not content.
+        sentences = [
+            s.strip() for s in _SENTENCES.split(source) if s.strip() and not s.startswith("#")
+        ]
+        response = canned_response(response_model, sentences)
+        prompt_tokens = sum(
+            count_tokens(json.dumps(message["content"], ensure_ascii=False), TOKENIZER_MODEL)
+            for message in messages
+        )
+        completion_tokens = count_tokens(response.model_dump_json(), TOKENIZER_MODEL)
+        completion = SimpleNamespace(
+            model=self._owner.model,
+            usage=SimpleNamespace(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                prompt_tokens_details=SimpleNamespace(cached_tokens=0),
+            ),
+        )
+        return response, completion, completion_tokens / self._owner.tokens_per_second
+
+    def create_with_completion(
+        self, response_model: Type[BaseModel], messages: List[Dict[str, Any]], **kwargs: Any
+    ) -> Tuple[BaseModel, SimpleNamespace]:
+        response, completion, generation = self._generate(response_model, messages)
+        time.sleep(self._owner.latency_seconds + generation)
+        return response, completion
+
+    def create(
+        self, response_model: Type[BaseModel], messages: List[Dict[str, Any]], **kwargs: Any
+    ) -> BaseModel:
+        return self.create_with_completion(response_model, messages, **kwargs)[0]
+
+    def create_partial(
+        self, response_model: Type[BaseModel], messages: List[Dict[str, Any]], **kwargs: Any
+    ) -> Iterator[BaseModel]:
+        """Yield the response field by field, long strings a few words at a time."""
+        response, _, generation = self._generate(response_model, messages)
+        time.sleep(self._owner.latency_seconds)
+        partials = list(self._partials(response))
+        for partial in partials:
+            time.sleep(generation / len(partials))
+            yield partial
+
+    @staticmethod
+    def _partials(response: BaseModel) -> Iterator[BaseModel]:
+        """Return partial copies of `response` (missing fields are None), the last one complete."""
+        fields = dict.fromkeys(type(response).model_fields)
+        for name in fields:
+            value = getattr(response, name)
+            if isinstance(value, str):
+                words = value.split(" ")
+                for end in range(STREAM_CHUNK_WORDS, len(words), STREAM_CHUNK_WORDS):
+                    fields[name] = " ".join(words[:end])
+                    yield type(response).model_construct(**fields)
+            fields[name] = value
+            yield type(response).model_construct(**fields)
+
+
+class _AsyncCompletions(_Completions):
+    async def create_with_completion(
+        self, response_model: Type[BaseModel], messages: List[Dict[str, Any]], **kwargs: Any
+    ) -> Tuple[BaseModel, SimpleNamespace]:
+        response, completion, generation = self._generate(response_model, messages)
+        await asyncio.sleep(self._owner.latency_seconds + generation)
+        return response, completion
+
+    async def create(
+        self, response_model: Type[BaseModel], messages: List[Dict[str, Any]], **kwargs: Any
+    ) -> BaseModel:
+        return (await self.create_with_completion(response_model, messages, **kwargs))[0]
+
+
+class LocalLLMClient:
+    """An offline instructor client stand-in returning canned structured responses."""
+
+    def __init__(
+        self, model: str = "local", latency_seconds: float = 0.0, tokens_per_second: float = 100.0
+    ):
+        """
+        Args:
+            model: Model name reported in the completions.
+            latency_seconds: Simulated time to first token.
+            tokens_per_second: Simulated generation speed.
+        """
+        self.model = model
+        self.latency_seconds = latency_seconds
+        self.tokens_per_second = tokens_per_second
+        self.chat = SimpleNamespace(completions=self._completions_resource())
+
+    @classmethod
+    def from_settings(cls, settings: LocalSettings) -> "LocalLLMClient":
+        """Create the client described by `settings`."""
+        return cls(
+            settings.default_model,
+            latency_seconds=settings.completion_latency_seconds,
+            tokens_per_second=settings.tokens_per_second,
+        )
+
+    def _completions_resource(self) -> _Completions:
+        return _Completions(self)
+
+
+class AsyncLocalLLMClient(LocalLLMClient):
+    """Async `LocalLLMClient`, for `LLMFactory.create_completion_async` and batches."""
+
+    def _completions_resource(self) -> _Completions:
+        return _AsyncCompletions(self)
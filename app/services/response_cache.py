@@ -0,0 +1,259 @@
+"""
+response_cache.py
+===================================================================
+Persistent cache of synthesized responses
+-------------------------------------------------------------------
+
+This module defines `ResponseCache`, a local SQLite store of structured LLM
+responses used by `Synthesizer` so that asking the same question over the
+same retrieved chunks (evaluation reruns, repeated user questions) does
+not pay for the same completion twice.
+
+Main responsibilities:
+- Address entries by SHA-256 of (normalized question, ordered context ids
+  and content hashes, provider, model, temperature, prompt version), so any
+  change of context, model or prompt misses instead of returning a stale
+  response. Only deterministic (temperature 0) completions are cached.
+- Store responses as JSON and return them as the caller's pydantic model.
+- Bound the number of entries (least recently used first) and expire
+  entries after a time to live.
+- Invalidate explicitly: the responses built from given documents (when
+  they are re-ingested or deleted), those of other prompt versions, or all.
+- Count hits and misses for the current process.
+- Allow concurrent use from several processes (WAL journal, busy timeout,
+  short write transactions) and from several threads of one process
+  (connection handling shared with the other caches, see `SQLiteCache`).
+
+Typical usage:
+--------------
+```python
+cache = ResponseCache(".cache/responses.sqlite")
+key = cache.make_key(question, ids, contents, "openai", "gpt-4o", 0.0, prompt_hash)
+response = cache.get(key, SynthesizedResponse)
+if response is None:
+    response = llm.create_completion(...)
+    cache.put(key, response, ids, prompt_hash)
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Type, TypeVar, Union
+
+from app.config.settings import ResponseCacheSettings
+from app.database.embedding_cache import SQLiteCache, normalize_text
+from pydantic import BaseModel
+
+ResponseModel = TypeVar("ResponseModel", bound=BaseModel)
+
+
+class ResponseCache(SQLiteCache):
+    """An on-disk LRU cache of structured LLM responses backed by SQLite."""
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        max_entries: int = 10_000,
+        ttl_seconds: Optional[float] = None,
+    ):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: Location of the SQLite file; parent directories are created.
+            max_entries: Maximum number of cached responses.
+            ttl_seconds: Lifetime of an entry; None disables expiry.
+        """
+        super().__init__(path)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+    @classmethod
+    def from_settings(cls, settings: ResponseCacheSettings) -> "ResponseCache":
+        """Create the cache described by `settings`."""
+        return cls(
+            settings.path, max_entries=settings.max_entries, ttl_seconds=settings.ttl_seconds
+        )
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key BLOB PRIMARY KEY, response TEXT NOT NULL, prompt_hash TEXT NOT NULL, "
+            "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS response_documents ("
+            "key BLOB NOT NULL, document_id TEXT NOT NULL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS response_documents_document_id "
+            "ON response_documents (document_id)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS response_documents_key ON response_documents (key)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)"
+        )
+
+    @staticmethod
+    def make_key(
+        question: str,
+        ids: Sequence[str],
+        contents: Sequence[str],
+        provider: str,
+        model: str,
+        temperature: float,
+        prompt_hash: str,
+    ) -> bytes:
+        """
+        Return the cache key of a response.
+
+        Args:
+            question: The user's question (normalized here).
+            ids: Ids of the retrieved chunks, in rank order.
+            contents: Their contents (hashed here), in the same order.
+            provider, model, temperature: The completion settings.
+            prompt_hash: Version of the prompt (instructions and response schema).
+        """
+        context = [
+            [str(id_), hashlib.sha256(normalize_text(str(content)).encode("utf-8")).hexdigest()]
+            for id_, content in zip(ids, contents)
+        ]
+        payload = json.dumps(
+            [normalize_text(question), context, provider, model, temperature, prompt_hash],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).digest()
+
+    def get(self, key: bytes, response_model: Type[ResponseModel]) -> Optional[ResponseModel]:
+        """
+        Look up a response and mark it as recently used.
+
+        Args:
+            key: A key built with `make_key`.
+            response_model: The pydantic model to parse the response into.
+
+        Returns:
+            The cached response, or None (missing, expired or unparsable).
+        """
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            now = time.time()
+            if row is not None and self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                self._delete(conn, [key])
+                row = None
+            response = None
+            if row is not None:
+                try:
+                    response = response_model.model_validate_json(row[0])
+                except ValueError:
+                    # Written for an older version of the response model.
+                    self._delete(conn, [key])
+            if response is None:
+                self.misses += 1
+                return None
+            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return response
+
+    def put(
+        self, key: bytes, response: BaseModel, document_ids: Sequence[str], prompt_hash: str
+    ) -> None:
+        """
+        Store a response, then evict least recently used entries if over `max_entries`.
+
+        Args:
+            key: A key built with `make_key`.
+            response: The response to cache.
+            document_ids: Ids of the chunks the response was built from.
+            prompt_hash: The prompt version in the key.
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            with self._transaction(conn):
+                conn.execute("DELETE FROM response_documents WHERE key = ?", (key,))
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses "
+                    "(key, response, prompt_hash, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                    (key, response.model_dump_json(), prompt_hash, now, now),
+                )
+                conn.executemany(
+                    "INSERT INTO response_documents (key, document_id) VALUES (?, ?)",
+                    [(key, str(id_)) for id_ in dict.fromkeys(document_ids)],
+                )
+                stale = self._least_recently_used(conn, "responses", "key", self.max_entries)
+                self._delete(conn, stale)
+        if stale:
+            logging.info(f"Evicted {len(stale)} responses from {self.path}")
+
+    def _delete(self, conn: sqlite3.Connection, keys: List[bytes]) -> None:
+        """Delete responses and their document links."""
+        for placeholders, chunk in self._chunks(keys):
+            conn.execute(f"DELETE FROM response_documents WHERE key IN ({placeholders})", chunk)
+            conn.execute(f"DELETE FROM responses WHERE key IN ({placeholders})", chunk)
+
+    def invalidate(self, document_ids: Sequence[str]) -> int:
+        """
+        Drop every response built from any of `document_ids`.
+
+        Args:
+            document_ids: Ids of re-ingested or deleted documents.
+
+        Returns:
+            The number of responses dropped.
+        """
+        document_ids = list(dict.fromkeys(str(id_) for id_ in document_ids))
+        with self._lock:
+            conn = self._connect()
+            with self._transaction(conn):
+                stale = set()
+                for placeholders, chunk in self._chunks(document_ids):
+                    stale.update(
+                        row[0]
+                        for row in conn.execute(
+                            "SELECT key FROM response_documents "
+                            f"WHERE document_id IN ({placeholders})",
+                            chunk,
+                        )
+                    )
+                self._delete(conn, list(stale))
+        if stale:
+            logging.info(f"Invalidated {len(stale)} cached responses")
+        return len(stale)
+
+    def invalidate_prompts(self, current_prompt_hash: str) -> int:
+        """Drop the responses of every prompt version but `current_prompt_hash`."""
+        with self._lock:
+            conn = self._connect()
+            with self._transaction(conn):
+                stale = [
+                    row[0]
+                    for row in conn.execute(
+                        "SELECT key FROM responses WHERE prompt_hash != ?", (current_prompt_hash,)
+                    )
+                ]
+                self._delete(conn, stale)
+        if stale:
+            logging.info(f"Invalidated {len(stale)} cached responses of older prompts")
+        return len(stale)
+
+    def clear(self) -> None:
+        """Remove every cached response."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM response_documents")
+            conn.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters for this process and the number of entries."""
+        with self._lock:
+            entries = self._connect().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {**self._counters(), "entries": entries}
@@ -1,7 +1,13 @@
-from typing import List
+import hashlib
+import json
+import threading
+from typing import Iterator, List, Optional
 import pandas as pd
 from pydantic import BaseModel, Field
+from app.config.settings import get_settings
+from app.services.context_builder import ContextBuilder
 from app.services.llm_factory import LLMFactory
+from app.services.response_cache import ResponseCache
 
 
 class SynthesizedResponse(BaseModel):
@@ -31,49 +37,180 @@ class Synthesizer:
     Examinez la question de l'utilisateur :
     """
 
+    _response_cache: Optional[ResponseCache] = None
+    _response_cache_lock = threading.Lock()
+
     @staticmethod
-    def generate_response(question: str, context: pd.DataFrame) -> SynthesizedResponse:
+    def generate_response(
+        question: str, context: pd.DataFrame, use_cache: bool = True
+    ) -> SynthesizedResponse:
         """Generates a synthesized response based on the question and context.
 
+        At temperature 0, responses are looked up in and saved to the
+        persistent response cache, keyed by the question, the retrieved
+        chunks, the model and the prompt version.
+
         Args:
             question: The user's question.
             context: The relevant context retrieved from the knowledge base.
+            use_cache: Whether to use the response cache.
 
         Returns:
             A SynthesizedResponse containing thought process and answer.
         """
-        context_str = Synthesizer.dataframe_to_json(
-            context, columns_to_keep=["content"]
+        llm = LLMFactory(get_settings().providers.llm)
+        key = Synthesizer._cache_key(llm, question, context) if use_cache else None
+        if key is not None:
+            cached = Synthesizer.response_cache().get(key, SynthesizedResponse)
+            if cached is not None:
+                return cached
+        response = llm.create_completion(
+            response_model=SynthesizedResponse,
+            messages=Synthesizer.build_messages(question, context),
         )
+        if key is not None:
+            Synthesizer._cache_response(key, response, context)
+        return response
 
-        messages = [
-            {"role": "system", "content": Synthesizer.SYSTEM_PROMPT},
-            {"role": "user", "content": f"# Question de l'utilisateur :\n{question}"},
-            {
-                "role": "assistant",
-                "content": f"# Informations extraites :\n{context_str}",
-            },
-        ]
+    @staticmethod
+    async def generate_responses(
+        questions: List[str],
+        contexts: List[pd.DataFrame],
+        provider: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+    ) -> List[SynthesizedResponse]:
+        """Generates synthesized responses for many questions concurrently.
+
+        Args:
+            questions: The users' questions.
+            contexts: The context retrieved for each question.
+            provider: The LLMFactory provider ("openai", "anthropic", "llama" or
+                "local"; default: `ProviderSettings.llm`).
+            max_concurrency: Completions in flight at once
+                (default: the provider's `max_concurrency` setting).
 
-        llm = LLMFactory("openai")
-        return llm.create_completion(
+        Returns:
+            One SynthesizedResponse per question, in order.
+        """
+        llm = LLMFactory(provider or get_settings().providers.llm)
+        keys = [
+            Synthesizer._cache_key(llm, question, context)
+            for question, context in zip(questions, contexts)
+        ]
+        responses: List[Optional[SynthesizedResponse]] = [
+            Synthesizer.response_cache().get(key, SynthesizedResponse) if key else None
+            for key in keys
+        ]
+        missing = [i for i, response in enumerate(responses) if response is None]
+        generated = await llm.create_completions_batch(
             response_model=SynthesizedResponse,
-            messages=messages,
+            messages_list=[
+                Synthesizer.build_messages(questions[i], contexts[i]) for i in missing
+            ],
+            max_concurrency=max_concurrency,
+        )
+        for i, response in zip(missing, generated):
+            responses[i] = response
+            if keys[i] is not None:
+                Synthesizer._cache_response(keys[i], response, contexts[i])
+        return responses
+
+    @staticmethod
+    def prompt_hash() -> str:
+        """Returns the version of the prompt: instructions, response schema and context packing."""
+        payload = json.dumps(
+            [
+                Synthesizer.SYSTEM_PROMPT,
+                SynthesizedResponse.model_json_schema(),
+                get_settings().context.model_dump(),
+            ],
+            sort_keys=True,
+            ensure_ascii=False,
         )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
 
     @staticmethod
-    def dataframe_to_json(
-            context: pd.DataFrame,
-            columns_to_keep: List[str],
-    ) -> str:
+    def response_cache() -> Optional[ResponseCache]:
+        """Returns the shared response cache, or None when it is disabled.
+
+        Responses of other prompt versions are dropped when the cache is opened.
         """
-        Convert the context DataFrame to a JSON string.
+        settings = get_settings().response_cache
+        if not settings.enabled:
+            return None
+        with Synthesizer._response_cache_lock:
+            if Synthesizer._response_cache is None:
+                cache = ResponseCache.from_settings(settings)
+                cache.invalidate_prompts(Synthesizer.prompt_hash())
+                Synthesizer._response_cache = cache
+        return Synthesizer._response_cache
+
+    @staticmethod
+    def _cache_key(llm: LLMFactory, question: str, context: pd.DataFrame) -> Optional[bytes]:
+        """Returns the response cache key, or None when the response is not cacheable."""
+        if llm.settings.temperature != 0 or Synthesizer.response_cache() is None:
+            return None
+        return ResponseCache.make_key(
+            question,
+            Synthesizer._context_ids(context),
+            context["content"].astype(str).tolist(),
+            llm.provider,
+            llm.settings.default_model,
+            llm.settings.temperature,
+            Synthesizer.prompt_hash(),
+        )
+
+    @staticmethod
+    def _cache_response(key: bytes, response: SynthesizedResponse, context: pd.DataFrame) -> None:
+        Synthesizer.response_cache().put(
+            key, response, Synthesizer._context_ids(context), Synthesizer.prompt_hash()
+        )
+
+    @staticmethod
+    def _context_ids(context: pd.DataFrame) -> List[str]:
+        if "id" not in context:
+            return [""] * len(context)
+        return context["id"].astype(str).tolist()
+
+    @staticmethod
+    def stream_response(
+        question: str, context: pd.DataFrame, provider: Optional[str] = None
+    ) -> Iterator[SynthesizedResponse]:
+        """Streams a synthesized response as it is generated.
+
+        Yields partial responses whose fields fill in as tokens arrive (missing
+        fields are None), so `answer` can be displayed incrementally; the last
+        one is complete. Time to first token and total latency are logged.
 
         Args:
-            context (pd.DataFrame): The context DataFrame.
-            columns_to_keep (List[str]): The columns to include in the output.
+            question: The user's question.
+            context: The relevant context retrieved from the knowledge base.
+            provider: The LLMFactory provider ("openai", "anthropic", "llama" or
+                "local"; default: `ProviderSettings.llm`).
 
-        Returns:
-            str: A JSON string representation of the selected columns.
+        Yields:
+            Partial SynthesizedResponse objects.
+        """
+        llm = LLMFactory(provider or get_settings().providers.llm)
+        yield from llm.create_completion_stream(
+            response_model=SynthesizedResponse,
+            messages=Synthesizer.build_messages(question, context),
+        )
+
+    @staticmethod
+    def build_messages(question: str, context: pd.DataFrame) -> List[dict]:
+        """Builds the chat messages for a question and its context.
+
+        The context is cleaned, deduplicated and cut to the token budget of
+        `ContextSettings` by `ContextBuilder`, most relevant chunks first.
         """
-        return context[columns_to_keep].to_json(orient="records", indent=2)
\ No newline at end of file
+        context_str = ContextBuilder().build(context).text
+
+        return [
+            {"role": "system", "content": Synthesizer.SYSTEM_PROMPT},
+            {"role": "user", "content": f"# Question de l'utilisateur :\n{question}"},
+            {
+                "role": "assistant",
+                "content": f"# Informations extraites :\n{context_str}",
+            },
+        ]
@@ -1,34 +1,49 @@
 from datetime import datetime
 from app.database.vector_store import VectorStore
-from app.services.synthesizer import Synthesizer
+from app.services.answer_cache import SemanticAnswerCache, answer_question
 from timescale_vector import client
 
 # Initialize VectorStore
 vec = VectorStore()
+answer_cache_settings = vec.settings.answer_cache
+cache = (
+    SemanticAnswerCache.from_settings(answer_cache_settings)
+    if answer_cache_settings.enabled
+    else None
+)
 
 # --------------------------------------------------------------
 # question
 # --------------------------------------------------------------
 
 relevant_question = "Entrez vos questions ici "
-results = vec.search(relevant_question, limit=5)
 
-# Save to CSV
-results.to_csv("search_results_.csv", index=False)
 # --------------------------------------------------------------
-# response
+# response (served from the answer cache for already answered questions)
 # --------------------------------------------------------------
-response = Synthesizer.generate_response(question=relevant_question, context=results)
+answer = answer_question(vec, relevant_question, cache=cache, limit=5)
+response = answer.response
+# Cached answers carry no search results: load the records they were built from
+results = answer.context
+if results is None:
+    results = vec.fetch(answer.context_ids)
+
+# Save to CSV
+results.to_csv("search_results_.csv", index=False)
 
 print(f"\n{response.answer}")
 print("\nThought process:")
 for thought in response.thought_process:
     print(f"- {thought}")
 print(f"\nContext: {response.enough_context}")
+print(f"Context ids: {answer.context_ids}")
+if cache is not None:
+    print(f"Cached: {answer.cached} (similarity {answer.similarity:.3f}), {cache.stats()}")
 
 
 # --------------------------------------------------------------
-# Time-based filtering
+# Time-based filtering (on the document date encoded in the ids:
+# effective_date, else date_created)
 # --------------------------------------------------------------
 
 
@@ -0,0 +1,114 @@
+"""
+tokens.py
+===================================================================
+Token counting and token-aware batching helpers
+-------------------------------------------------------------------
+
+Embedding and completion providers limit requests both by the number of
+inputs and by the number of tokens. This module offers a local token
+counter (using `tiktoken` when it is installed, and a conservative
+character-based estimate otherwise), a helper that cuts a text to a token
+budget, and a helper that packs texts into batches that respect both
+limits while preserving input order.
+"""
+
+import logging
+from functools import lru_cache
+from typing import Iterator, Sequence, Tuple
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional dependency
+    tiktoken = None
+
+# French legal text averages roughly 3.5 characters per token with the
+# cl100k/o200k vocabularies; 3 keeps the estimate on the safe side.
+CHARS_PER_TOKEN_ESTIMATE = 3
+
+
+@lru_cache(maxsize=8)
+def _get_encoding(model: str):
+    """Return a cached tiktoken encoding for `model`, or None if unavailable."""
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # tiktoken downloads its BPE files on first use; offline, estimate instead.
+        logging.warning(f"Could not load tiktoken encoding for {model}, estimating tokens: {e}")
+        return None
+
+
+def count_tokens(text: str, model: str = "text-embedding-3-small") -> int:
+    """
+    Count the tokens of `text` for the given model.
+
+    Args:
+        text: The text to measure.
+        model: The model whose tokenizer should be used.
+
+    Returns:
+        The exact token count when `tiktoken` is available, otherwise an
+        upper-bound estimate based on the text length.
+    """
+    encoding = _get_encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return len(text) // CHARS_PER_TOKEN_ESTIMATE + 1
+
+
+def truncate_to_tokens(
+    text: str, max_tokens: int, model: str = "text-embedding-3-small"
+) -> str:
+    """
+    Cut `text` to at most `max_tokens` tokens for the given model.
+
+    Without `tiktoken`, the text is cut at the character length matching the
+    estimate of `count_tokens`, so the result never exceeds the budget by
+    that estimate either.
+    """
+    if max_tokens <= 0:
+        return ""
+    encoding = _get_encoding(model)
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+    return text[: (max_tokens - 1) * CHARS_PER_TOKEN_ESTIMATE]
+
+
+def batch_by_tokens(
+    texts: Sequence[str],
+    max_inputs: int,
+    max_tokens: int,
+    model: str = "text-embedding-3-small",
+) -> Iterator[Tuple[int, int, int]]:
+    """
+    Split `texts` into contiguous batches that respect request limits.
+
+    Args:
+        texts: The texts to split, in order.
+        max_inputs: Maximum number of inputs per batch.
+        max_tokens: Maximum total number of tokens per batch.
+        model: The model whose tokenizer should be used for counting.
+
+    Yields:
+        Tuples of (start, end, token_count) so that `texts[start:end]` is a
+        batch. A single text larger than `max_tokens` forms its own batch.
+    """
+    start = 0
+    batch_tokens = 0
+    for i, text in enumerate(texts):
+        n_tokens = count_tokens(text, model)
+        batch_size = i - start
+        if batch_size and (
+            batch_size >= max_inputs or batch_tokens + n_tokens > max_tokens
+        ):
+            yield start, i, batch_tokens
+            start, batch_tokens = i, 0
+        batch_tokens += n_tokens
+    if start < len(texts):
+        yield start, len(texts), batch_tokens
+
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+benchmark.py
+
+Mesure reproductible du débit de l'ingestion, de la recherche et de la
+synthèse, sans accès réseau ni coût d'API : par défaut, les embeddings et
+les complétions sont servis par les fournisseurs « local » (embeddings par
+hachage déterministes, réponses structurées pré-construites, latences
+simulées ; voir `LocalSettings`).
+
+Le benchmark écrit dans une table dédiée (BENCH_TABLE) et dans .cache/benchmark,
+et désactive tous les caches, pour ne jamais toucher aux données réelles et
+pour que chaque exécution refasse le même travail. On mesure :
+- ingestion : lignes/s de `StreamingIngestor` (table vidée au préalable),
+- recherche : latences p50/p95/p99 et requêtes/s de `search`, puis de
+  `search_many` par lots de BATCH_SIZE questions,
+- synthèse : réponses/s de `Synthesizer.generate_responses` (complétions
+  concurrentes).
+
+Les fournisseurs restent surchargeables (EMBEDDING_PROVIDER, LLM_PROVIDER),
+tout comme le backend (VECTOR_STORE_BACKEND=numpy évite Postgres).
+
+Usage:
+    python benchmark.py
+"""
+
+from __future__ import annotations
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List
+
+os.environ.setdefault("EMBEDDING_PROVIDER", "local")
+os.environ.setdefault("LLM_PROVIDER", "local")
+
+import numpy as np
+import pandas as pd
+from app.config.settings import get_settings
+from app.database.vector_store import VectorStore
+from app.services.ingestion import StreamingIngestor
+from app.services.synthesizer import Synthesizer
+
+# ---------------- config ----------------
+CORPUS_PATH = "data/Rdataset.csv"
+GROUNDTRUTH_PATH = "groundtruth1.json"
+OUT_CSV = "benchmark_results.csv"
+BENCH_TABLE = "embeddings_benchmark"
+BENCH_DIR = Path(".cache/benchmark")
+K = 5
+SEARCH_ROUNDS = 3
+BATCH_SIZE = 16
+# ----------------------------------------
+
+
+def load_questions(path: str) -> List[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        gt = json.load(f)
+    return [str(q).strip() for qlist in gt.values() for q in qlist if q and str(q).strip()]
+
+
+def isolate_settings() -> None:
+    """Table, fichiers et caches propres au benchmark."""
+    settings = get_settings()
+    settings.vector_store.table_name = BENCH_TABLE
+    settings.vector_store.local_index_path = BENCH_DIR / "vectors"
+    settings.ingestion.checkpoint_dir = BENCH_DIR / "ingest"
+    settings.embedding_cache.enabled = False
+    settings.query_cache.enabled = False
+    settings.answer_cache.enabled = False
+    settings.response_cache.enabled = False
+
+
+def latency_record(stage: str, latencies: List[float], items: int, elapsed: float) -> Dict:
+    ms = np.array(latencies) * 1000
+    return {
+        "stage": stage,
+        "items": items,
+        "seconds": elapsed,
+        "items_per_second": items / elapsed if elapsed else 0.0,
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+    }
+
+
+def bench_ingest(vec: VectorStore) -> Dict:
+    vec.create_tables()
+    vec.create_text_search_index()
+    vec.create_metadata_indexes()
+    vec.delete(delete_all=True)
+    start = time.perf_counter()
+    with vec.bulk_load():
+        counts = StreamingIngestor(vec).run(CORPUS_PATH, resume=False)
+    elapsed = time.perf_counter() - start
+    return latency_record("ingest", [elapsed], counts["upserted"], elapsed)
+
+
+def bench_search(vec: VectorStore, questions: List[str]) -> Dict:
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(SEARCH_ROUNDS):
+        for question in questions:
+            query_start = time.perf_counter()
+            vec.search(question, limit=K)
+            latencies.append(time.perf_counter() - query_start)
+    return latency_record("search", latencies, len(latencies), time.perf_counter() - start)
+
+
+def bench_search_many(vec: VectorStore, questions: List[str]) -> Dict:
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(SEARCH_ROUNDS):
+        for i in range(0, len(questions), BATCH_SIZE):
+            batch_start = time.perf_counter()
+            vec.search_many(questions[i : i + BATCH_SIZE], limit=K)
+            latencies.append(time.perf_counter() - batch_start)
+    items = SEARCH_ROUNDS * len(questions)
+    return latency_record("search_many", latencies, items, time.perf_counter() - start)
+
+
+def bench_synthesis(vec: VectorStore, questions: List[str]) -> Dict:
+    contexts = vec.search_many(questions, limit=K)
+    start = time.perf_counter()
+    asyncio.run(Synthesizer.generate_responses(questions, contexts))
+    elapsed = time.perf_counter() - start
+    return latency_record("synthesis", [elapsed / len(questions)], len(questions), elapsed)
+
+
+def main():
+    isolate_settings()
+    settings = get_settings()
+    questions = load_questions(GROUNDTRUTH_PATH)
+    print(
+        f"embeddings={settings.providers.embeddings} llm={settings.providers.llm} "
+        f"backend={settings.vector_store.backend} table={BENCH_TABLE}, {len(questions)} questions"
+    )
+
+    vec = VectorStore()
+    records = [
+        bench_ingest(vec),
+        bench_search(vec, questions),
+        bench_search_many(vec, questions),
+        bench_synthesis(vec, questions),
+    ]
+    for r in records:
+        print(
+            f"{r['stage']:<12} {r['items']:>6} items in {r['seconds']:8.3f} s  "
+            f"{r['items_per_second']:9.1f}/s  p50={r['p50_ms']:.1f} ms  "
+            f"p95={r['p95_ms']:.1f} ms  p99={r['p99_ms']:.1f} ms"
+        )
+
+    pd.DataFrame(records).to_csv(OUT_CSV, index=False, encoding="utf-8")
+    print(f"\nDetailed results saved to {OUT_CSV}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+eval_quantization.py
+
+Mesure de la perte de recall due aux embeddings raccourcis et quantifiés,
+en comparant chaque représentation à la recherche exacte en float32 sur
+toutes les dimensions (la référence).
+
+Pour chaque nombre de dimensions (troncature + renormalisation, ce que fait
+le paramètre `dimensions` de text-embedding-3) et chaque encodage (float32,
+float16, int8, binaire), on calcule :
+- recall@k sans rescoring (les k premiers candidats de l'encodage),
+- recall@k avec rescoring exact des RESCORE_FACTOR * k meilleurs candidats,
+- octets par vecteur et facteur de compression.
+
+Les embeddings du corpus et des questions passent par le cache d'embeddings,
+donc une seconde exécution ne refait aucun appel à l'API.
+
+Usage:
+    python eval_quantization.py
+"""
+
+from __future__ import annotations
+import json
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+from app.database.quantization import (
+    binary_quantize,
+    bytes_per_vector,
+    hamming_distances,
+    int8_similarities,
+    quantize_int8,
+    truncate_embeddings,
+)
+from app.database.vector_store import VectorStore
+
+# ---------------- config ----------------
+CORPUS_PATH = "data/Rdataset.csv"
+GROUNDTRUTH_PATH = "groundtruth1.json"
+OUT_CSV = "quantization_eval_results.csv"
+DIMENSIONS = [1536, 1024, 512, 256]
+ENCODINGS = ["float32", "float16", "int8", "binary"]
+K = 5
+RESCORE_FACTOR = 4
+# ----------------------------------------
+
+
+def load_questions(path: str) -> List[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        gt = json.load(f)
+    return [str(q).strip() for qlist in gt.values() for q in qlist if q and str(q).strip()]
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices des k meilleurs scores (par ligne), du meilleur au moins bon."""
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
+
+def encoded_scores(corpus: np.ndarray, queries: np.ndarray, encoding: str) -> np.ndarray:
+    """Similarités (n_queries, n_docs) calculées sur l'encodage compressé."""
+    if encoding == "float32":
+        return queries @ corpus.T
+    if encoding == "float16":
+        return queries @ corpus.astype(np.float16).astype(np.float32).T
+    if encoding == "int8":
+        codes, scales = quantize_int8(corpus)
+        return int8_similarities(codes, scales, queries).T
+    if encoding == "binary":
+        packed = binary_quantize(corpus)
+        return -np.stack([hamming_distances(packed, q) for q in queries]).astype(np.float32)
+    raise ValueError(encoding)
+
+
+def recall(found: np.ndarray, expected: np.ndarray) -> float:
+    return float(np.mean([len(set(f) & set(e)) / len(e) for f, e in zip(found, expected)]))
+
+
+def main():
+    corpus_texts = pd.read_csv(CORPUS_PATH, sep=";")["content"].astype(str).tolist()
+    questions = load_questions(GROUNDTRUTH_PATH)
+    print(f"{len(corpus_texts)} chunks, {len(questions)} questions")
+
+    vec = VectorStore()
+    full_dims = vec.vector_settings.embedding_dimensions
+    corpus_full = truncate_embeddings(vec.get_embeddings(corpus_texts), full_dims)
+    queries_full = truncate_embeddings(vec.get_embeddings(questions), full_dims)
+    expected = top_k(queries_full @ corpus_full.T, K)
+
+    records: List[Dict] = []
+    for dims in [d for d in DIMENSIONS if d <= full_dims]:
+        corpus = truncate_embeddings(corpus_full, dims)
+        queries = truncate_embeddings(queries_full, dims)
+        for encoding in ENCODINGS:
+            scores = encoded_scores(corpus, queries, encoding)
+            shortlist = top_k(scores, min(K * RESCORE_FACTOR, len(corpus_texts)))
+            # rescoring exact avec les vecteurs complets (toutes dimensions, float32)
+            exact = np.einsum("qd,qkd->qk", queries_full, corpus_full[shortlist])
+            rescored = np.take_along_axis(shortlist, top_k(exact, K), axis=1)
+            size = bytes_per_vector(encoding, dims)
+            records.append({
+                "dimensions": dims,
+                "encoding": encoding,
+                "bytes_per_vector": size,
+                "compression": bytes_per_vector("float32", full_dims) / size,
+                f"recall@{K}": recall(shortlist[:, :K], expected),
+                f"recall@{K}_rescored": recall(rescored, expected),
+            })
+            print(
+                f"{dims:>5}d {encoding:<8} {size:>6} B/vec  "
+                f"recall@{K}={records[-1][f'recall@{K}']:.3f}  "
+                f"rescored={records[-1][f'recall@{K}_rescored']:.3f}"
+            )
+
+    pd.DataFrame(records).to_csv(OUT_CSV, index=False, encoding="utf-8")
+    print(f"\nDetailed results saved to {OUT_CSV}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,7 @@ GROUNDTRUTH_PATH = "groundtruth.json"
 OUT_CSV = "top1_eval_results.csv"
 SAMPLE_SIZE =50   # ex: 50 or None pour tout
 SEED = 42
+RESCORE_FACTOR = None  # ex: 4 pour la recherche en deux étapes (rescoring exact), None sinon
 # ----------------------------------------
 
 def load_groundtruth(path):
@@ -75,13 +76,28 @@ def run_evaluation(vec: VectorStore, queries, sample_size=None, seed=42):
         random.Random(seed).shuffle(queries)
         queries = queries[:sample_size]
 
+    # run every search with one batched embedding call and one database round trip,
+    # fetching only ids, metadata and distances
+    search_args = dict(
+        limit=1, include_content=False, include_embedding=False, rescore_factor=RESCORE_FACTOR
+    )
+    try:
+        all_results = vec.search_many([q["question"] for q in queries], **search_args)
+    except Exception as e:
+        # fall back to one search per question, so failing questions are recorded as errors
+        print(f"Batched search failed ({e}), searching question by question")
+        all_results = None
+
     records = []
     for i, q in enumerate(queries, start=1):
         question = q["question"]
         expected = q["expected_doc_id"]
 
         try:
-            results = vec.search(question, limit=1)  # return DataFrame per your implementation
+            if all_results is not None:
+                results = all_results[i - 1]  # DataFrame per query, in order
+            else:
+                results = vec.search(question, **search_args)
         except Exception as e:
             print(f"[{i}/{len(queries)}] ERROR for question: {e}")
             retrieved_id = None
@@ -23,6 +23,7 @@ OUT_CSV = "topk_eval_results.csv"
 KS = [1, 3, 5]        # valeurs de k à évaluer (peuvent être modifiées)
 SAMPLE_SIZE = 50    # mettre un entier pour échantillonner (ex: 50), ou None pour tout
 SEED = 42
+RESCORE_FACTOR = None  # ex: 4 pour la recherche en deux étapes (rescoring exact), None sinon
 # ----------------------------------------
 
 def load_groundtruth(path: str) -> Dict[str, List[str]]:
@@ -117,6 +118,18 @@ def run_evaluation(vec: VectorStore, queries: List[Dict[str, str]], ks: List[int
         queries = queries[:sample_size]
 
     max_k = max(ks)
+    # run every search with one batched embedding call and one database round trip,
+    # fetching only ids, metadata and distances
+    search_args = dict(
+        limit=max_k, include_content=False, include_embedding=False, rescore_factor=RESCORE_FACTOR
+    )
+    try:
+        all_results = vec.search_many([q["question"] for q in queries], **search_args)
+    except Exception as e:
+        # fall back to one search per question, so failing questions are recorded as errors
+        print(f"Batched search failed ({e}), searching question by question")
+        all_results = None
+
     records = []
 
     for i, q in enumerate(queries, start=1):
@@ -124,7 +137,10 @@ def run_evaluation(vec: VectorStore, queries: List[Dict[str, str]], ks: List[int
         expected = q["expected_doc_id"]
 
         try:
-            results = vec.search(question, limit=max_k)
+            if all_results is not None:
+                results = all_results[i - 1]
+            else:
+                results = vec.search(question, **search_args)
         except Exception as e:
             print(f"[{i}/{len(queries)}] ERROR for question: {e}")
             ids, dists = [], []